@@ -1,18 +1,15 @@
-from boto3.dynamodb.conditions import Key
-import boto3
-import uuid
-import os  # Para acceder a las variables de entorno
-from datetime import datetime, timedelta
+import metrics
+import runtime
+import storage
+from token_utils import validate_token
 
+@runtime.handler('TABLE_NAME_TOKENS')
 def lambda_handler(event, context):
     try:
         # Obtener artist_id y token del evento
         artist_id = event.get('artist_id')
         token = event.get('token')
 
-        # Imprimir los valores recibidos
-        print(f"Recibido artist_id: {artist_id}, token: {token}")
-
         if not artist_id or not token:
             print("Faltan parámetros artist_id o token.")
             return {
@@ -20,97 +17,10 @@ def lambda_handler(event, context):
                 'body': 'Faltan parámetros artist_id o token'
             }
 
-        table_name = os.environ['TABLE_NAME_TOKENS']
-        print(f"Usando la tabla DynamoDB: {table_name}")
-
-        # Cliente DynamoDB
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
-
-        # Buscar el token en DynamoDB
-        print(f"Consultando DynamoDB para artist_id: {artist_id} y token: {token}")
-        response = table.query(
-            KeyConditionExpression=Key('artist_id').eq(artist_id) & Key('token').eq(token)
-        )
-
-        # Imprimir la respuesta de la consulta
-        print(f"Respuesta de la consulta: {response}")
-
-        # Validar si el token existe
-        if not response.get('Items'):
-            print(f"Token no encontrado para artist_id: {artist_id} y token: {token}")
-            return {
-                'statusCode': 403,
-                'body': 'Token no existe'
-            }
-
-        # Extraer la información del registro
-        item = response['Items'][0]
-        print(f"Registro encontrado: {item}")
-
-        token_expiry = item['token_expiry']
-        refresh_token = item['refresh_token']
-        refresh_token_expiry = item['refresh_token_expiry']
-
-        # Validar expiración del Access Token
-        now = datetime.now()
-        token_expiry_dt = datetime.fromisoformat(token_expiry)
-
-        print(f"Token expiración: {token_expiry_dt}, Fecha actual: {now}")
-
-        if now > token_expiry_dt:
-            # El token ha expirado, validar el Refresh Token
-            refresh_token_expiry_dt = datetime.fromisoformat(refresh_token_expiry)
-            print(f"Refresh token expiración: {refresh_token_expiry_dt}")
-
-            if now > refresh_token_expiry_dt:
-                print("Refresh token expirado.")
-                return {
-                    'statusCode': 403,
-                    'body': 'Refresh Token expirado. Por favor, inicia sesión nuevamente.'
-                }
-
-            # Generar un nuevo Access Token
-            new_token = str(uuid.uuid4())
-            new_token_expiry = datetime.now() + timedelta(minutes=60)
-
-            # Imprimir los detalles del nuevo token
-            print(f"Generando nuevo token: {new_token}, expiración: {new_token_expiry}")
-
-            # Eliminar el registro antiguo
-            table.delete_item(
-                Key={
-                    'artist_id': artist_id,
-                    'token': token  # Eliminar el token actual (Sort Key)
-                }
-            )
-
-            # Crear un nuevo registro con el nuevo token
-            table.put_item(
-                Item={
-                    'artist_id': artist_id,
-                    'token': new_token,  # Nuevo token como Sort Key
-                    'token_expiry': new_token_expiry.isoformat(),
-                    'refresh_token': refresh_token,
-                    'refresh_token_expiry': refresh_token_expiry
-                }
-            )
-
-            return {
-                'statusCode': 200,
-                'body': {
-                    'message': 'Token renovado',
-                    'new_token': new_token,
-                    'expires_in': new_token_expiry.isoformat()
-                }
-            }
-
-        # El token es válido
-        print("Token válido.")
-        return {
-            'statusCode': 200,
-            'body': 'Token válido'
-        }
+        # La lógica de validación vive en token_utils para que los handlers
+        # protegidos puedan usarla directamente sin invocar este Lambda
+        with metrics.phase('auth'):
+            return validate_token(storage.tokens(), artist_id, token)
 
     except Exception as e:
         # Imprimir el error para ayudar en la depuración
@@ -119,3 +29,50 @@ def lambda_handler(event, context):
             'statusCode': 500,
             'body': 'Error interno del servidor'
         }
+
+
+# Construye la política IAM que devuelve el authorizer. El recurso cubre todos los
+# métodos del stage para que el resultado en cache sirva a todas las rutas protegidas.
+def build_policy(artist_id, effect, method_arn, context=None):
+    arn_prefix = method_arn.split('/')[0]
+    stage = method_arn.split('/')[1]
+    return {
+        'principalId': artist_id or 'anonymous',
+        'policyDocument': {
+            'Version': '2012-10-17',
+            'Statement': [{
+                'Action': 'execute-api:Invoke',
+                'Effect': effect,
+                'Resource': f"{arn_prefix}/{stage}/*/*"
+            }]
+        },
+        'context': context or {}
+    }
+
+
+# Authorizer de tipo REQUEST para API Gateway. La identidad es el par de encabezados
+# Authorization y X-Artist-Id, así que API Gateway guarda el resultado en cache por
+# token y artist_id durante resultTtlInSeconds.
+@runtime.handler('TABLE_NAME_TOKENS')
+def authorizer_handler(event, context):
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    token = headers.get('authorization')
+    artist_id = headers.get('x-artist-id')
+    method_arn = event['methodArn']
+
+    try:
+        with metrics.phase('auth'):
+            response = validate_token(storage.tokens(), artist_id, token)
+    except Exception as e:
+        print(f"Error en ValidarTokenAcceso: {e}")
+        return build_policy(artist_id, 'Deny', method_arn)
+
+    # Token expirado: API Gateway responde 401 y el cliente debe renovarlo en /artist/refresh
+    if response['statusCode'] == 401:
+        raise Exception('Unauthorized')
+
+    if response['statusCode'] != 200:
+        return build_policy(artist_id, 'Deny', method_arn)
+
+    # El contexto solo admite valores simples; los handlers lo reciben en event['auth']
+    return build_policy(artist_id, 'Allow', method_arn, {'artist_id': artist_id})
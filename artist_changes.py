@@ -0,0 +1,179 @@
+import os
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+
+from country_shards import fetch_parallel, shard_for, shard_key
+from pagination import InvalidPageRequest, decode_cursor
+
+# Feed de cambios para los servicios que replican los artistas. Cada escritura
+# guarda 'updated_at' (ISO 8601 en UTC, ancho fijo, así el orden de texto es el
+# cronológico) y 'change_shard' = "<fecha>#<n>", con n estable a partir del
+# artist_id como en country_shards.py. ChangesIndex tiene 'change_shard' como
+# partición y 'updated_at' como clave de ordenación: es un índice disperso que
+# solo contiene los artistas escritos desde que existe el atributo, y las
+# escrituras de un día se reparten en CHANGE_SHARDS particiones. Leer los cambios
+# desde una posición es mezclar los fragmentos de cada día en orden.
+
+# Los cambios más recientes que este margen todavía no se devuelven: una escritura
+# puede confirmarse después de otra con un updated_at mayor (relojes de distintos
+# Lambdas, propagación del GSI), y el cursor ya la habría dejado atrás
+CHANGES_SETTLE_SECONDS = int(os.environ.get('CHANGES_SETTLE_SECONDS', '5'))
+
+# Consultas a ChangesIndex que hace una petición como máximo: al recorrer días sin
+# cambios (CHANGE_SHARDS consultas por día) devuelve el cursor al llegar a este límite
+MAX_CHANGE_QUERIES = int(os.environ.get('MAX_CHANGE_QUERIES', '32'))
+
+# Días hacia atrás que se pueden pedir con 'since'. Un cliente que se atrasa más que
+# esto vuelve a hacer la copia completa en lugar de recorrer el índice día por día.
+CHANGES_RETENTION_DAYS = int(os.environ.get('CHANGES_RETENTION_DAYS', '35'))
+
+# Fragmentos de cada día en ChangesIndex. Se puede aumentar sin migrar datos,
+# pero no reducir: los cambios de los fragmentos >= N dejarían de leerse.
+CHANGE_SHARDS = max(1, int(os.environ.get('CHANGE_SHARDS', '4')))
+
+# Atributos de cada cambio (la proyección de ChangesIndex, sin la contraseña)
+CHANGE_FIELDS = ['artist_id', 'name', 'country', 'photo', 'info', 'version', 'updated_at']
+
+
+def format_timestamp(moment):
+    return moment.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+# Atributos que agrega cada escritura de un artista
+def change_stamp(artist_id, now=None):
+    updated_at = format_timestamp(now or datetime.now(timezone.utc))
+    return {'updated_at': updated_at, 'change_shard': shard_key(updated_at[:10], shard_for(artist_id, CHANGE_SHARDS))}
+
+
+# 'day' y 'since' de un cursor tienen que ser los que escribe changes_page: una
+# fecha "AAAA-MM-DD" válida y una hora con el formato de format_timestamp en ese día
+def _valid_position(day, since):
+    if not isinstance(day, str) or not isinstance(since, str):
+        return False
+    try:
+        return date.fromisoformat(day).isoformat() == day and format_timestamp(datetime.fromisoformat(since)) == since
+    except ValueError:
+        return False
+
+
+# Posición inicial del feed: un cursor devuelto por /artist/changes o una fecha u
+# hora ISO 8601 (sin zona horaria se asume UTC), dentro de CHANGES_RETENTION_DAYS
+def parse_since(since, now=None):
+    if not since:
+        raise InvalidPageRequest("Falta el parámetro 'since'")
+
+    try:
+        moment = datetime.fromisoformat(since)
+    except ValueError:
+        position = decode_cursor(since)
+        keys = position.get('keys')
+        if (not _valid_position(position.get('day'), position.get('since'))
+                or position['since'][:10] != position['day']
+                or not isinstance(keys, dict)
+                or not all(isinstance(key, list) and len(key) == 2 and all(isinstance(part, str) for part in key)
+                           for key in keys.values())):
+            raise InvalidPageRequest('Cursor inválido')
+    else:
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        since = format_timestamp(moment)
+        position = {'day': since[:10], 'since': since, 'keys': {}}
+
+    oldest = format_timestamp((now or datetime.now(timezone.utc)) - timedelta(days=CHANGES_RETENTION_DAYS))
+    if position['since'] < oldest:
+        raise InvalidPageRequest(
+            f"'since' es anterior a {CHANGES_RETENTION_DAYS} días: hay que volver a hacer la copia completa"
+        )
+    return position
+
+
+def _next_day(day):
+    return (datetime.fromisoformat(day) + timedelta(days=1)).date().isoformat()
+
+
+def _order(item):
+    return item['updated_at'], item['artist_id']
+
+
+# Lee hasta 'limit' cambios del día 'day' mezclando sus fragmentos en orden de
+# (updated_at, artist_id). 'keys' guarda el último cambio devuelto de cada
+# fragmento ({shard: [updated_at, artist_id]}); los fragmentos sin cambios
+# devueltos se leen desde 'since'. Cada fragmento se consulta de a páginas
+# pequeñas y solo cuando su buffer se vacía, así una página lee poco más de
+# 'limit' cambios en total. Devuelve (items, keys, complete, queries), con
+# complete=True si ya no quedan cambios del día hasta 'until'.
+def _merge_day(artists, day, since, until, keys, limit):
+    keys = dict(keys)
+    buffers = {str(shard): deque() for shard in range(CHANGE_SHARDS)}
+    # ExclusiveStartKey de la próxima consulta de cada fragmento (None: desde 'since');
+    # se elimina al agotarse
+    pending = {
+        shard: ({'artist_id': keys[shard][1], 'change_shard': shard_key(day, shard), 'updated_at': keys[shard][0]}
+                if shard in keys else None)
+        for shard in buffers
+    }
+    items = []
+    queries = 0
+
+    def fetch(shard, shard_limit):
+        start_key = pending[shard]
+        # La consulta empieza en el último cambio leído del fragmento (ExclusiveStartKey
+        # tiene que cumplir la condición sobre updated_at)
+        shard_since = start_key['updated_at'] if start_key else since
+        return artists.by_change_shard(shard_key(day, shard), shard_limit, shard_since, until, start_key, fields=CHANGE_FIELDS)
+
+    while len(items) < limit:
+        empty = [shard for shard in buffers if not buffers[shard] and shard in pending]
+        if empty:
+            shard_limit = -(-(limit - len(items)) // len(buffers))
+            calls = [(shard, shard_limit) for shard in empty]
+            queries += len(calls)
+            for shard, (page, last_key) in zip(empty, fetch_parallel(fetch, calls)):
+                buffers[shard].extend(page)
+                if last_key:
+                    pending[shard] = last_key
+                else:
+                    del pending[shard]
+
+        heads = [shard for shard in buffers if buffers[shard]]
+        if not heads:
+            break
+        shard = min(heads, key=lambda shard: _order(buffers[shard][0]))
+        item = buffers[shard].popleft()
+        items.append(item)
+        keys[shard] = [item['updated_at'], item['artist_id']]
+
+    return items, keys, not pending and not any(buffers.values()), queries
+
+
+# Lee hasta 'limit' cambios desde 'position', día por día y en orden de
+# updated_at. Devuelve (items, next_position, has_more); next_position apunta al
+# último cambio devuelto de cada fragmento, o se mantiene si no hubo cambios nuevos.
+def changes_page(artists, position, limit, now=None):
+    until = format_timestamp((now or datetime.now(timezone.utc)) - timedelta(seconds=CHANGES_SETTLE_SECONDS))
+    day, since, keys = position['day'], position['since'], position['keys']
+    # Un 'since' posterior a 'until' (recién escrito o con el reloj del cliente
+    # adelantado) todavía no tiene cambios; DynamoDB rechaza un between invertido
+    if since > until:
+        return [], position, False
+    items = []
+    queries = 0
+
+    while len(items) < limit and day <= until[:10]:
+        page, keys, complete, day_queries = _merge_day(artists, day, since, until, keys, limit - len(items))
+        items.extend(page)
+        queries += day_queries
+        if not complete:
+            break
+
+        # Día completo: seguir con el siguiente, salvo que sea el de 'until'
+        if day == until[:10]:
+            return items, {'day': day, 'since': since, 'keys': keys}, False
+        day = _next_day(day)
+        since = f"{day}T00:00:00.000000+00:00"
+        keys = {}
+        if queries >= MAX_CHANGE_QUERIES:
+            break
+
+    # Se cortó por 'limit' o por MAX_CHANGE_QUERIES: puede haber más cambios
+    return items, {'day': day, 'since': since, 'keys': keys}, day <= until[:10]
@@ -0,0 +1,96 @@
+from artist_changes import change_stamp
+from artist_utils import hash_password
+from cache import invalidate_artist
+from storage import ConditionFailed
+
+# Campos del perfil que se pueden modificar con una actualización parcial
+UPDATABLE_FIELDS = ('name', 'info', 'photo', 'password')
+
+
+class UpdateError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+    def response(self):
+        return {
+            'statusCode': self.status_code,
+            'message': self.message
+        }
+
+
+# Normaliza los campos a actualizar con las mismas reglas que el registro. Todos
+# son texto no vacío; el nombre se guarda en minúsculas y la contraseña hasheada.
+def normalize_changes(changes):
+    unknown = set(changes) - set(UPDATABLE_FIELDS)
+    if unknown:
+        raise UpdateError(400, f"Campos no permitidos: {', '.join(sorted(unknown))}")
+    if not changes:
+        raise UpdateError(400, f"Indica al menos un campo a actualizar: {', '.join(UPDATABLE_FIELDS)}")
+
+    for field, value in changes.items():
+        if not isinstance(value, str):
+            raise UpdateError(400, f"El parámetro '{field}' debe ser texto")
+        if not value.strip():
+            raise UpdateError(400, f"El parámetro '{field}' no puede estar vacío")
+
+    normalized = dict(changes)
+    if 'name' in normalized:
+        normalized['name'] = normalized['name'].strip().lower()
+    if 'password' in normalized:
+        normalized['password'] = hash_password(normalized['password'])
+    return normalized
+
+
+# Traduce una condición fallida a su error usando el registro actual del artista
+def _condition_error(old_item, changes, current_password):
+    if not old_item:
+        raise UpdateError(404, "Artista no encontrado")
+    if 'password' in changes and old_item.get('password') != hash_password(current_password):
+        raise UpdateError(401, "Contraseña actual incorrecta")
+    version = int(old_item.get('version', 0))
+    raise UpdateError(409, f"Conflicto de versión: la versión actual es {version}")
+
+
+# Aplica una actualización parcial en un solo round trip y mantiene los índices
+# derivados. Devuelve la nueva versión del artista.
+def update_artist(artists, artist_id, changes, current_password=None, expected_version=None):
+    changes = normalize_changes(changes)
+    if 'password' in changes and not current_password:
+        raise UpdateError(400, "Falta el parámetro 'current_password'")
+    if expected_version is not None:
+        try:
+            expected_version = int(expected_version)
+        except (TypeError, ValueError):
+            raise UpdateError(400, "El parámetro 'expected_version' debe ser un número")
+
+    # Un único update_item condicional: el artista debe existir, la contraseña
+    # actual debe coincidir si cambia la contraseña y la versión debe ser
+    # expected_version si se indica
+    password = hash_password(current_password) if 'password' in changes else None
+    try:
+        old = artists.update(
+            artist_id,
+            {**changes, **change_stamp(artist_id)},  # Toda escritura entra en el feed de cambios
+            password=password,
+            expected_version=expected_version
+        )
+    except ConditionFailed as e:
+        _condition_error(e.item, changes, current_password)
+
+    # Los índices de nombres se reescriben siempre que se envía el nombre, aunque no
+    # cambie: si la escritura del índice falló en un intento anterior, el reintento
+    # ve el nombre ya guardado y tiene que completarla igual
+    if 'name' in changes:
+        artists.update_name_index(artist_id, old.get('name'), changes['name'])
+    renamed = 'name' in changes and old.get('name') != changes['name']
+
+    # Cualquier escritura cambia el perfil y la fila del artista en los resultados
+    # por su nombre (al menos 'version'); si cambió el nombre, también los del nuevo
+    if renamed:
+        invalidate_artist(artist_id, old.get('name'), changes['name'])
+    else:
+        invalidate_artist(artist_id, old.get('name'))
+
+    return int(old.get('version', 0)) + 1
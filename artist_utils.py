@@ -0,0 +1,82 @@
+import hashlib
+
+from artist_changes import change_stamp
+from country_shards import COUNTRY_SHARDS, country_shard
+
+# Atributos que nunca se devuelven al cliente
+SENSITIVE_FIELDS = ('password', 'idempotency_key')
+
+# Vista de lista: los atributos proyectados en CountryListIndex y NameListIndex
+LIST_FIELDS = ('artist_id', 'name', 'country', 'photo', 'version')
+
+
+class InvalidFields(ValueError):
+    pass
+
+# Hashear contraseña
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+# Valida y normaliza los datos de registro de un artista. Devuelve (item, error):
+# el item listo para guardar en la tabla de artistas, o el mensaje de error.
+# La usan registerArtist y la importación masiva para aplicar las mismas reglas.
+def build_artist_item(data):
+    artist_id = data.get('artist_id')
+    password = data.get('password')
+    country = data.get('country')
+    name = data.get('name')
+    info = data.get('info')
+
+    if name:
+        name = name.strip().lower()
+
+    # Verificar que todos los campos necesarios están presentes
+    if not artist_id or not password or not country or not name:
+        return None, 'Invalid request body: missing artist_id, password, country or name'
+
+    # Normalizar el país ingresado (convertir a minúsculas y quitar espacios)
+    country_input = country.strip().lower()
+
+    # Si el país ingresado es vacío o contiene caracteres no válidos, retornar un error
+    if not country_input.isalpha():
+        return None, 'Invalid country, please enter a valid name'
+
+    item = {
+        'artist_id': artist_id,
+        'password': hash_password(password),  # Hashea la contraseña antes de almacenarla
+        'country': country_input,
+        'name': name,
+        'info': info,
+        'photo': 'default-url',  # Valor por defecto para la foto
+        'version': 1,  # Versión para control de concurrencia optimista
+        **change_stamp(artist_id)  # updated_at y change_shard (feed de cambios)
+    }
+
+    # Clave del fragmento de CountryShardIndex (solo con COUNTRY_SHARDS > 0)
+    if COUNTRY_SHARDS > 0:
+        item['country_shard'] = country_shard(country_input, artist_id)
+
+    return item, None
+
+
+# Traduce el parámetro 'fields' (lista o "a,b,c") a los atributos a leer. Sin
+# 'fields' se leen todos los permitidos. artist_id y version siempre se incluyen
+# porque identifican cada artista y forman el ETag.
+def parse_fields(value, allowed=LIST_FIELDS):
+    if value is None or value == '' or value == []:
+        return list(allowed)
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise InvalidFields("El parámetro 'fields' debe ser una lista de atributos")
+
+    requested = [str(field).strip() for field in value if str(field).strip()]
+    sensitive = [field for field in requested if field in SENSITIVE_FIELDS]
+    if sensitive:
+        raise InvalidFields(f"Campos no disponibles: {', '.join(sensitive)}")
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise InvalidFields(f"Campos no permitidos: {', '.join(unknown)}. Disponibles: {', '.join(allowed)}")
+
+    return list(dict.fromkeys(['artist_id', *requested, 'version']))
@@ -0,0 +1,41 @@
+import runtime
+from country_shards import COUNTRY_SHARDS, country_shard
+
+# Asigna 'country_shard' a los artistas guardados antes de activar COUNTRY_SHARDS,
+# para que CountryShardIndex los incluya. Se invoca manualmente; 'shards' en el
+# evento permite preparar los datos antes de configurar COUNTRY_SHARDS, y 'cursor'
+# continúa desde la última página procesada si el Lambda se queda sin tiempo.
+def lambda_handler(event, context):
+    shards = int(event.get('shards') or COUNTRY_SHARDS)
+    if shards <= 0:
+        return {
+            'statusCode': 400,
+            'message': 'Indica la cantidad de fragmentos (shards) o configura COUNTRY_SHARDS'
+        }
+
+    table = runtime.table('TABLE_NAME_ARTISTS')
+    updated = 0
+
+    def assign_page(items):
+        nonlocal updated
+        for item in items:
+            table.update_item(
+                Key={'artist_id': item['artist_id']},
+                UpdateExpression='SET country_shard = :shard',
+                ConditionExpression='attribute_exists(artist_id)',
+                ExpressionAttributeValues={':shard': country_shard(item['country'], item['artist_id'], shards)}
+            )
+            updated += 1
+
+    fetch_page = runtime.artist_scan(
+        table,
+        ProjectionExpression='artist_id, country',
+        FilterExpression='attribute_not_exists(country_shard) AND attribute_exists(country)'
+    )
+    cursor = runtime.resume_pages(fetch_page, assign_page, event.get('cursor'), context)
+
+    return {
+        'statusCode': 200,
+        'updated': updated,
+        'cursor': cursor
+    }
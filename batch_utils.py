@@ -0,0 +1,37 @@
+import random
+import time
+
+# Máximo de llaves por llamada a BatchGetItem
+BATCH_GET_SIZE = 100
+MAX_RETRIES = 6
+
+
+def backoff(attempt):
+    # Backoff exponencial con jitter: 50 ms, 100 ms, 200 ms, ...
+    time.sleep(random.uniform(0, 0.05 * (2 ** attempt)))
+
+
+# Lee varias llaves de una tabla con BatchGetItem en bloques de BATCH_GET_SIZE,
+# reintentando con backoff las UnprocessedKeys. Devuelve la lista de items encontrados.
+def batch_get(dynamodb, table_name, keys, projection=None):
+    items = []
+    for start in range(0, len(keys), BATCH_GET_SIZE):
+        request = {'Keys': keys[start:start + BATCH_GET_SIZE]}
+        if projection:
+            request['ProjectionExpression'] = ', '.join(f"#p{i}" for i in range(len(projection)))
+            request['ExpressionAttributeNames'] = {f"#p{i}": name for i, name in enumerate(projection)}
+
+        pending = {table_name: request}
+        attempt = 0
+        while pending:
+            response = dynamodb.batch_get_item(RequestItems=pending)
+            items.extend(response.get('Responses', {}).get(table_name, []))
+            pending = response.get('UnprocessedKeys') or {}
+
+            if pending:
+                if attempt >= MAX_RETRIES:
+                    raise RuntimeError(f"No se pudieron leer {len(pending[table_name]['Keys'])} llaves de {table_name}")
+                backoff(attempt)
+                attempt += 1
+
+    return items
@@ -0,0 +1,85 @@
+# Benchmark de import y cold start por handler.
+#
+# Cada medición corre en un proceso nuevo de Python, como un contenedor de Lambda
+# recién creado: mide el tiempo de importar el módulo del handler, el de inicializar
+# el recurso y las tablas de DynamoDB (runtime.warm_up) y la memoria máxima (RSS).
+# Sirve para elegir el memorySize de cada función en serverless.yml a partir de datos.
+#
+#   python benchmarks/bench_cold_start.py -n 10
+#   python benchmarks/bench_cold_start.py --connect   # incluye abrir la conexión con DynamoDB
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import yaml
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Código que se ejecuta en el proceso hijo
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+import runtime
+handler = getattr(module, sys.argv[2])
+init_ms = runtime.warm_up(getattr(handler, 'env_tables', ()), connect=sys.argv[3] == '1')
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'init_ms': init_ms,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}))
+"""
+
+
+def handlers():
+    with open(os.path.join(ROOT, 'serverless.yml')) as f:
+        config = yaml.safe_load(f)
+    for name, function in config['functions'].items():
+        module, attr = function['handler'].rsplit('.', 1)
+        yield name, module, attr, function.get('memorySize', config['provider'].get('memorySize'))
+
+
+def probe_env():
+    env = dict(os.environ)
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    # Los nombres de tabla solo se usan para crear los objetos Table
+    for var in ('TABLE_NAME_ARTISTS', 'TABLE_NAME_TOKENS', 'TABLE_NAME_NGRAMS', 'TABLE_NAME_PREFIXES', 'TABLE_NAME_STATS'):
+        env.setdefault(var, f"bench-{var.lower()}")
+    return env
+
+
+def measure(module, attr, iterations, connect):
+    samples = []
+    for _ in range(iterations):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE, module, attr, '1' if connect else '0'],
+            cwd=ROOT, env=probe_env(), capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        key: round(statistics.median(sample[key] for sample in samples), 2)
+        for key in ('import_ms', 'init_ms', 'max_rss_mb')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--iterations', type=int, default=5)
+    parser.add_argument('--connect', action='store_true', help='Abrir la conexión con DynamoDB en el warm-up')
+    args = parser.parse_args()
+
+    results = {}
+    for name, module, attr, memory_size in handlers():
+        results[name] = measure(module, attr, args.iterations, args.connect)
+        results[name]['memorySize'] = memory_size
+        print(f"{name}: {results[name]}", file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# Benchmark del índice por país fragmentado (country_shards.py).
+#
+# Para cada cantidad de fragmentos N escribe un país "caliente" con --artists
+# artistas desde varios hilos (escrituras condicionales, como registerArtist) y
+# después lo recorre completo con country_page, página a página. N = 0 usa
+# CountryListIndex, sin fragmentar. Reporta escrituras/s, items/s leídos y la latencia
+# de cada página.
+#
+#   python benchmarks/bench_country_shards.py --endpoint http://localhost:8000 --shards 0 1 4 8
+#   python benchmarks/bench_country_shards.py --backend sqlite --artists 50000
+#
+# DynamoDB Local no limita el throughput por partición: la diferencia en escritura
+# solo se ve contra una tabla real.
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from harness import RESULTS_DIR, TABLE_ENVS, percentile
+
+
+def write_country(artists, country, count, concurrency):
+    import country_shards
+    from artist_utils import build_artist_item
+
+    def create(index):
+        item, _ = build_artist_item({
+            'artist_id': f"{country}-{index:07d}",
+            'password': 'pw',
+            'country': country,
+            'name': f"artist {index}",
+            'info': 'bench'
+        })
+        if country_shards.COUNTRY_SHARDS > 0:
+            item['country_shard'] = country_shards.country_shard(country, item['artist_id'])
+        artists.create(item)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(create, range(count)))
+    return count / (time.perf_counter() - start)
+
+
+def read_country(artists, country, limit):
+    import country_shards
+
+    latencies = []
+    total = 0
+    start_key = None
+    start = time.perf_counter()
+    while True:
+        page_start = time.perf_counter()
+        items, start_key = country_shards.country_page(artists, country, limit, start_key, fields=['artist_id', 'name'])
+        latencies.append((time.perf_counter() - page_start) * 1000)
+        total += len(items)
+        if not start_key:
+            break
+    elapsed = time.perf_counter() - start
+
+    return {
+        'items': total,
+        'pages': len(latencies),
+        'items_per_s': round(total / elapsed, 1),
+        'page_p50_ms': round(statistics.median(latencies), 2),
+        'page_p99_ms': round(percentile(latencies, 99), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de CountryShardIndex')
+    parser.add_argument('--backend', choices=('dynamodb', 'memory', 'sqlite'), default='dynamodb')
+    parser.add_argument('--endpoint', default=os.environ.get('DYNAMODB_ENDPOINT_URL', 'http://localhost:8000'))
+    parser.add_argument('--artists', type=int, default=10000, help='Artistas del país caliente')
+    parser.add_argument('--shards', type=int, nargs='+', default=[0, 1, 2, 4, 8], help='Cantidades de fragmentos a medir')
+    parser.add_argument('--limit', type=int, default=100, help='Tamaño de página')
+    parser.add_argument('--concurrency', type=int, default=16, help='Hilos de escritura')
+    parser.add_argument('--prefix', default='bench', help='Prefijo de los nombres de tabla')
+    args = parser.parse_args()
+
+    table_names = {env: f"{args.prefix}-{env.lower()}" for env in TABLE_ENVS}
+    os.environ.update(table_names)
+    os.environ['DYNAMODB_ENDPOINT_URL'] = args.endpoint
+    os.environ['STORAGE_BACKEND'] = args.backend
+    os.environ.setdefault('METRICS_ENABLED', 'false')
+    os.environ.setdefault('STORAGE_SQLITE_PATH', os.path.join(RESULTS_DIR, f"{args.prefix}.sqlite3"))
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+
+    import country_shards
+    import dataset
+    import runtime
+    import storage
+
+    if args.backend == 'dynamodb':
+        with open(os.path.join(ROOT, 'serverless.yml')) as f:
+            config = yaml.safe_load(f)
+        dataset.create_tables(runtime.dynamodb(), config, table_names)
+    else:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+
+    artists = storage.artists()
+    # Los países solo admiten letras: la corrida se identifica con letras también
+    run_id = ''.join(chr(ord('a') + int(digit)) for digit in str(int(time.time())))
+    results = {'backend': args.backend, 'artists': args.artists, 'limit': args.limit, 'shards': {}}
+    for shards in args.shards:
+        # Un país distinto por corrida para no mezclar artistas de otra configuración
+        country = f"bench{chr(ord('a') + shards)}{run_id}"
+        country_shards.COUNTRY_SHARDS = shards
+        result = {'writes_per_s': round(write_country(artists, country, args.artists, args.concurrency), 1)}
+        result.update(read_country(artists, country, args.limit))
+        results['shards'][str(shards)] = result
+        print(f"{shards} fragmentos: {result}", file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
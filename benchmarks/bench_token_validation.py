@@ -0,0 +1,96 @@
+# Benchmark de validación de token: compara la ruta antigua (invocar el Lambda
+# ValidateToken_A de forma síncrona) con la validación en proceso de token_utils.
+#
+# Se ejecuta contra un stage desplegado, con credenciales de AWS configuradas:
+#
+#   TABLE_NAME_TOKENS=dev-Pt_tokens_acceso_A SERVICE_NAME=api-artists STAGE=dev \
+#       python benchmarks/bench_token_validation.py --artist-id a1 --token <token> -n 200
+#
+# El token debe ser válido y no estar expirado.
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import runtime
+import storage
+from harness import percentile
+from token_utils import validate_token
+
+
+# Cuenta las llamadas hechas por un cliente de botocore, por servicio
+def count_calls(client, counter):
+    def on_call(model, **kwargs):
+        counter[model.name] = counter.get(model.name, 0) + 1
+    client.meta.events.register('before-call.*.*', on_call)
+
+
+def run(label, iterations, fn):
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.get('statusCode') != 200:
+            raise SystemExit(f"{label}: respuesta inesperada {response}")
+    return {
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(statistics.mean(latencies), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--artist-id', required=True)
+    parser.add_argument('--token', required=True)
+    parser.add_argument('-n', '--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    lambda_client = boto3.client('lambda')
+    table = runtime.table('TABLE_NAME_TOKENS')
+    tokens = storage.tokens()
+    function_name = f"{os.environ['SERVICE_NAME']}-{os.environ['STAGE']}-ValidateToken_A"
+
+    lambda_calls = {}
+    dynamo_calls = {}
+    count_calls(lambda_client, lambda_calls)
+    count_calls(table.meta.client, dynamo_calls)
+
+    payload = json.dumps({'artist_id': args.artist_id, 'token': args.token})
+
+    def invoke_path():
+        response = lambda_client.invoke(
+            FunctionName=function_name,
+            InvocationType='RequestResponse',
+            Payload=payload
+        )
+        return json.loads(response['Payload'].read())
+
+    def in_process_path():
+        return validate_token(tokens, args.artist_id, args.token)
+
+    # Calentar ambas rutas para no medir el cold start del primer request
+    invoke_path()
+    in_process_path()
+    lambda_calls.clear()
+    dynamo_calls.clear()
+
+    results = {'iterations': args.iterations}
+    results['invoke'] = run('invoke', args.iterations, invoke_path)
+    results['invoke']['lambda_invocations_per_request'] = lambda_calls.get('Invoke', 0) / args.iterations
+    results['in_process'] = run('in_process', args.iterations, in_process_path)
+    results['in_process']['lambda_invocations_per_request'] = 0
+    results['in_process']['dynamodb_calls_per_request'] = sum(dynamo_calls.values()) / args.iterations
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+# Generación de datos sintéticos y creación de tablas para los benchmarks locales.
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import boto3
+
+from artist_utils import build_artist_item
+from name_index import update_name_index
+from name_prefix import update_prefix_index
+
+# Distribución de países sesgada (Zipf): unos pocos países concentran la mayoría
+# de los artistas, como en el catálogo real
+COUNTRIES = [
+    'usa', 'mexico', 'brazil', 'colombia', 'argentina', 'spain', 'peru', 'chile',
+    'france', 'japan', 'germany', 'italy', 'canada', 'venezuela', 'ecuador',
+    'bolivia', 'uruguay', 'paraguay', 'cuba', 'portugal'
+]
+COUNTRY_WEIGHTS = [1 / (rank + 1) for rank in range(len(COUNTRIES))]
+
+SYLLABLES = [
+    'la', 'lo', 'ma', 'mi', 'ro', 'sa', 'ta', 'vi', 'ne', 'ka', 'bu', 'ny', 'ri',
+    'co', 'da', 'el', 'an', 'to', 'ra', 'li', 'na', 'zo', 'be', 'ju', 'an', 'es'
+]
+
+# Contraseña conocida para poder medir el login
+def password_for(artist_id):
+    return f"pw-{artist_id}"
+
+
+def artist_id_for(index):
+    return f"artist{index:07d}"
+
+
+def random_name(rng):
+    words = []
+    for _ in range(rng.choice((1, 2, 2, 3))):
+        words.append(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return ' '.join(words)
+
+
+def artist_rows(count, seed=42):
+    rng = random.Random(seed)
+    for index in range(count):
+        artist_id = artist_id_for(index)
+        yield {
+            'artist_id': artist_id,
+            'password': password_for(artist_id),
+            'country': rng.choices(COUNTRIES, COUNTRY_WEIGHTS)[0],
+            'name': random_name(rng),
+            'info': 'x' * rng.randint(50, 2000)
+        }
+
+
+# Elementos de una lista de serverless.yml en el último paso de la migración de
+# índices: los Fn::If toman la rama verdadera y AWS::NoValue se descarta
+def _final_step(entries):
+    resolved = []
+    for entry in entries:
+        if 'Fn::If' in entry:
+            entry = entry['Fn::If'][1]
+        if entry != {'Ref': 'AWS::NoValue'}:
+            resolved.append(entry)
+    return resolved
+
+
+# Crea las tablas declaradas en serverless.yml (con sus GSI) en el endpoint local
+def create_tables(dynamodb, config, table_names):
+    existing = set(dynamodb.meta.client.list_tables()['TableNames'])
+    for resource in config['resources']['Resources'].values():
+        if resource['Type'] != 'AWS::DynamoDB::Table':
+            continue
+        properties = resource['Properties']
+        env_name = properties['TableName'].split('.')[-1].rstrip('}')
+        table_name = table_names[env_name]
+        if table_name in existing:
+            continue
+
+        kwargs = {
+            'TableName': table_name,
+            'AttributeDefinitions': _final_step(properties['AttributeDefinitions']),
+            'KeySchema': properties['KeySchema'],
+            'BillingMode': 'PAY_PER_REQUEST'
+        }
+        if properties.get('GlobalSecondaryIndexes'):
+            kwargs['GlobalSecondaryIndexes'] = [
+                {
+                    'IndexName': index['IndexName'],
+                    'KeySchema': index['KeySchema'],
+                    'Projection': index['Projection']
+                }
+                for index in _final_step(properties['GlobalSecondaryIndexes'])
+            ]
+        dynamodb.create_table(**kwargs).wait_until_exists()
+
+
+_local = threading.local()
+
+
+def _thread_dynamodb(endpoint_url):
+    if not hasattr(_local, 'dynamodb'):
+        _local.dynamodb = boto3.resource('dynamodb', endpoint_url=endpoint_url)
+    return _local.dynamodb
+
+
+def _seed_chunk(rows, endpoint_url, table_names):
+    dynamodb = _thread_dynamodb(endpoint_url)
+    with dynamodb.Table(table_names['TABLE_NAME_ARTISTS']).batch_writer() as batch:
+        for row in rows:
+            item, _ = build_artist_item(row)
+            batch.put_item(Item=item)
+    ngrams = dynamodb.Table(table_names['TABLE_NAME_NGRAMS'])
+    prefixes = dynamodb.Table(table_names['TABLE_NAME_PREFIXES'])
+    for row in rows:
+        update_name_index(ngrams, row['artist_id'], None, row['name'])
+        update_prefix_index(prefixes, row['artist_id'], None, row['name'])
+    return len(rows)
+
+
+# Carga 'count' artistas sintéticos en paralelo
+def seed_artists(endpoint_url, table_names, count, workers=16, chunk_size=500):
+    rows = list(artist_rows(count))
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(lambda chunk: _seed_chunk(chunk, endpoint_url, table_names), chunks))
+
+
+# Carga 'count' artistas sintéticos en un backend local de storage (memory o sqlite)
+def seed_repository(artists, count, chunk_size=5000):
+    rows = artist_rows(count)
+    seeded = 0
+    while True:
+        chunk = [build_artist_item(row)[0] for _, row in zip(range(chunk_size), rows)]
+        if not chunk:
+            return seeded
+        artists.put_many(chunk)
+        for item in chunk:
+            artists.update_name_index(item['artist_id'], None, item['name'])
+        seeded += len(chunk)
+
+
+# Crea sesiones vigentes (tokens opacos) para los primeros 'count' artistas en el
+# repositorio de tokens. Devuelve {artist_id: token}.
+def seed_sessions(tokens, count):
+    sessions = {}
+    now = datetime.now()
+    for index in range(count):
+        artist_id = artist_id_for(index)
+        token = str(uuid.uuid4())
+        refresh_token_expiry = now + timedelta(days=30)
+        tokens.put({
+            'artist_id': artist_id,
+            'token': token,
+            'token_expiry': (now + timedelta(days=1)).isoformat(),
+            'refresh_token': str(uuid.uuid4()),
+            'refresh_token_expiry': refresh_token_expiry.isoformat(),
+            'expires_at': int(refresh_token_expiry.timestamp())
+        })
+        sessions[artist_id] = token
+    return sessions
@@ -0,0 +1,253 @@
+# Harness de carga local para todos los handlers.
+#
+# Ejecuta cada lambda_handler en el mismo proceso contra un DynamoDB local
+# (DynamoDB Local u otro endpoint compatible) o contra los backends locales de
+# storage (memory, sqlite), con un dataset sintético de N artistas, y reporta
+# throughput, latencias p50/p95/p99 y llamadas y capacidad consumida de DynamoDB
+# por petición. Los resultados se guardan en JSON para compararlos entre commits
+# y entre backends.
+#
+#   docker run -p 8000:8000 amazon/dynamodb-local -jar DynamoDBLocal.jar -inMemory
+#   python benchmarks/harness.py --endpoint http://localhost:8000 --artists 10000
+#   python benchmarks/harness.py --endpoint http://localhost:8000 --skip-seed \
+#       --compare benchmarks/results/<anterior>.json
+#   python benchmarks/harness.py --backend memory --artists 100000
+import argparse
+import importlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import yaml
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+TABLE_ENVS = ('TABLE_NAME_ARTISTS', 'TABLE_NAME_TOKENS', 'TABLE_NAME_NGRAMS', 'TABLE_NAME_PREFIXES', 'TABLE_NAME_STATS')
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+# Escenarios: handler a medir y generador de eventos con la forma que producen
+# los mapping templates de API Gateway
+def scenarios(artists, sessions, run_id):
+    from dataset import COUNTRIES, password_for, random_name
+
+    rng = random.Random(7)
+    session_ids = list(sessions)
+
+    def any_artist():
+        return f"artist{rng.randrange(artists):07d}"
+
+    def with_session(body):
+        artist_id = rng.choice(session_ids)
+        return {
+            'headers': {'Authorization': sessions[artist_id]},
+            'body': {'artist_id': artist_id, **body}
+        }
+
+    def register(i):
+        return {'body': {
+            'artist_id': f"{run_id}-{i}",
+            'password': 'pw',
+            'country': rng.choice(COUNTRIES),
+            'name': random_name(rng),
+            'info': 'bench'
+        }}
+
+    def login(i):
+        artist_id = rng.choice(session_ids)
+        return {'body': {'artist_id': artist_id, 'password': password_for(artist_id)}}
+
+    def validate(i):
+        artist_id = rng.choice(session_ids)
+        return {'artist_id': artist_id, 'token': sessions[artist_id]}
+
+    def change_password(i):
+        # Se cambia por la misma contraseña para no romper los logins siguientes
+        event = with_session({})
+        password = password_for(event['body']['artist_id'])
+        event['body'].update({'current_password': password, 'new_password': password})
+        return event
+
+    return {
+        'register': ('registerArtist.lambda_handler', register),
+        'login': ('loginArtist.lambda_handler', login),
+        'validate': ('ValidateToken_A.lambda_handler', validate),
+        'getInfo': ('getInfoById.lambda_handler', lambda i: {'body': {'artist_id': any_artist()}}),
+        'getAllByCountry': ('getAllByCountry.lambda_handler', lambda i: {'body': {'country': rng.choice(COUNTRIES)}}),
+        'getCountries': ('getCountries.lambda_handler', lambda i: {}),
+        'getAllbyName': ('getAllbyName.lambda_handler', lambda i: {'body': {'name': random_name(rng)[:rng.randint(3, 6)]}}),
+        'suggest': ('suggestArtists.lambda_handler', lambda i: {'query': {'prefix': random_name(rng)[:rng.randint(2, 5)]}}),
+        'changeName': ('changeName.lambda_handler', lambda i: with_session({'new_name': random_name(rng)})),
+        'changeInfo': ('changeInfo.lambda_handler', lambda i: with_session({'info': f"bench {i}"})),
+        'changePassword': ('changePassword.lambda_handler', change_password),
+    }
+
+
+def load_handler(path):
+    module_name, attr = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def run_scenario(handler, make_event, requests, concurrency):
+    import metrics
+
+    events = [make_event(i) for i in range(requests)]
+
+    # Las llamadas y la capacidad de DynamoDB de cada petición las cuentan los
+    # hooks de metrics.py sobre el cliente compartido de runtime
+    def call(event):
+        start = time.perf_counter()
+        response = handler(event, None)
+        latency = (time.perf_counter() - start) * 1000
+        recorder = metrics.last()
+        return latency, response.get('statusCode'), recorder.dynamodb_calls, recorder.rcu, recorder.wcu
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(call, events))
+    elapsed = time.perf_counter() - start
+
+    latencies = [sample[0] for sample in samples]
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample[1])] = statuses.get(str(sample[1]), 0) + 1
+
+    return {
+        'requests': requests,
+        'throughput_rps': round(requests / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'dynamodb_calls_per_request': round(sum(s[2] for s in samples) / requests, 2),
+        'rcu_per_request': round(sum(s[3] for s in samples) / requests, 2),
+        'wcu_per_request': round(sum(s[4] for s in samples) / requests, 2),
+        'status_codes': statuses
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparación con {baseline_path} ({baseline.get('commit')})", file=sys.stderr)
+    for name, current in results['handlers'].items():
+        previous = baseline['handlers'].get(name)
+        if not previous:
+            continue
+        deltas = []
+        for key in ('throughput_rps', 'p50_ms', 'p99_ms', 'dynamodb_calls_per_request', 'rcu_per_request'):
+            if previous.get(key):
+                deltas.append(f"{key} {100 * (current[key] - previous[key]) / previous[key]:+.1f}%")
+        print(f"  {name}: {', '.join(deltas)}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark local de los handlers')
+    parser.add_argument('--backend', choices=('dynamodb', 'memory', 'sqlite'), default='dynamodb',
+                        help='Backend de storage de los handlers')
+    parser.add_argument('--endpoint', default=os.environ.get('DYNAMODB_ENDPOINT_URL', 'http://localhost:8000'))
+    parser.add_argument('--artists', type=int, default=10000, help='Tamaño del dataset (10k a 1M)')
+    parser.add_argument('--sessions', type=int, default=1000, help='Artistas con sesión iniciada')
+    parser.add_argument('--requests', type=int, default=500, help='Peticiones por handler')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--only', nargs='*', help='Handlers a medir (por defecto todos)')
+    parser.add_argument('--skip-seed', action='store_true', help='Reutilizar el dataset ya cargado')
+    parser.add_argument('--prefix', default='bench', help='Prefijo de los nombres de tabla')
+    parser.add_argument('--output', help='Archivo JSON de resultados')
+    parser.add_argument('--compare', help='Resultados anteriores para comparar')
+    args = parser.parse_args()
+
+    # Configurar el entorno antes de importar los handlers
+    table_names = {env: f"{args.prefix}-{env.lower()}" for env in TABLE_ENVS}
+    os.environ.update(table_names)
+    os.environ['DYNAMODB_ENDPOINT_URL'] = args.endpoint
+    os.environ['STORAGE_BACKEND'] = args.backend
+    # Se miden todas las peticiones pero sin escribir las líneas EMF ni los eventos
+    # de depuración, que solo ensuciarían la salida
+    os.environ['METRICS_ENABLED'] = 'true'
+    os.environ['METRICS_EMF'] = 'false'
+    os.environ['METRICS_DEBUG_SAMPLE_RATE'] = '0'
+    os.environ.setdefault('STORAGE_SQLITE_PATH', os.path.join(RESULTS_DIR, f"{args.prefix}.sqlite3"))
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+
+    sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    import dataset
+    import runtime
+    import storage
+
+    if args.backend == 'dynamodb':
+        with open(os.path.join(ROOT, 'serverless.yml')) as f:
+            config = yaml.safe_load(f)
+        dataset.create_tables(runtime.dynamodb(), config, table_names)
+    else:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+
+    sessions_count = min(args.sessions, args.artists)
+    # El backend memory vive en el proceso: siempre hay que cargarlo
+    if not args.skip_seed or args.backend == 'memory':
+        start = time.perf_counter()
+        if args.backend == 'dynamodb':
+            seeded = dataset.seed_artists(args.endpoint, table_names, args.artists)
+        else:
+            seeded = dataset.seed_repository(storage.artists(), args.artists)
+        print(f"{seeded} artistas cargados en {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    sessions = dataset.seed_sessions(storage.tokens(), sessions_count)
+
+    results = {
+        'commit': git_commit(),
+        'backend': args.backend,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'artists': args.artists,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'handlers': {}
+    }
+    run_id = f"bench-{int(time.time())}"
+    for name, (handler_path, make_event) in scenarios(args.artists, sessions, run_id).items():
+        if args.only and name not in args.only:
+            continue
+        results['handlers'][name] = run_scenario(load_handler(handler_path), make_event, args.requests, args.concurrency)
+        print(f"{name}: {results['handlers'][name]}", file=sys.stderr)
+
+    # Contadores de la cache de perfiles de este proceso
+    import cache
+    results['cache'] = cache.stats()
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{results['timestamp'].replace(':', '')}-{results['commit']}-{args.backend}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados guardados en {output}", file=sys.stderr)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+# Importación masiva de artistas desde NDJSON o CSV.
+#
+# Aplica las mismas reglas que registerArtist (build_artist_item), descarta los
+# artist_id repetidos en el archivo o ya registrados en la tabla, y escribe cada
+# artista con la escritura condicional del repositorio de storage (create, como
+# registerArtist), repartido en varios hilos por bloques de 25: un registro que
+# llega entre la lectura y la escritura no se sobrescribe. Por cada fila escribe un resultado en el reporte (NDJSON) y agrega
+# al checkpoint (NDJSON) una línea por bloque con el resultado de sus artistas
+# escritos y si terminó, así una importación interrumpida puede reanudarse sin
+# reclasificar lo ya importado (el reporte también se escribe en modo append: el
+# último resultado de cada línea es el vigente):
+#
+#   TABLE_NAME_ARTISTS=dev-Pt_artists TABLE_NAME_NGRAMS=dev-Pt_artist_name_ngrams \
+#       TABLE_NAME_PREFIXES=dev-Pt_artist_name_prefixes python bulkImportArtists.py catalogo.ndjson --workers 8
+#
+# STORAGE_BACKEND y DYNAMODB_ENDPOINT_URL funcionan como en los handlers (p. ej.
+# para importar en DynamoDB Local o en el backend sqlite).
+import argparse
+import csv
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import storage
+from artist_utils import build_artist_item
+
+# Filas por bloque (unidad del checkpoint y del reparto entre hilos)
+CHUNK_SIZE = 25
+
+# Atributos que identifican un artista escrito por esta importación: si el put
+# condicional falla y el registro existente coincide, es una escritura propia de
+# una ejecución anterior que terminó antes de guardar el checkpoint
+IMPORT_FIELDS = ('password', 'name', 'country')
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+# Bloques terminados y resultado de cada artista escrito ('imported' o 'duplicate').
+# El archivo es un log NDJSON con una línea por bloque procesado
+# ({"chunk", "completed", "outcomes"}) que se reproduce al cargarlo: cada bloque
+# escribe solo sus resultados, no los de toda la importación. Solo se conservan
+# los resultados de los bloques pendientes, que son los únicos que se consultan.
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.completed = set()
+        self.outcomes = {}
+        line = '\n'
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Última línea cortada por una interrupción: ese bloque se reintenta
+                        continue
+                    self._apply(entry['chunk'], entry['outcomes'], entry['completed'])
+        self.log = open(path, 'a', encoding='utf-8')
+        if not line.endswith('\n'):
+            self.log.write('\n')
+
+    def _apply(self, index, outcomes, completed):
+        if completed:
+            self.completed.add(index)
+            self.outcomes.pop(index, None)
+        elif index not in self.completed:
+            self.outcomes.setdefault(index, {}).update(outcomes)
+
+    def outcome(self, index, artist_id):
+        with self.lock:
+            return self.outcomes.get(index, {}).get(artist_id)
+
+    def update(self, index, outcomes, completed):
+        with self.lock:
+            self._apply(index, outcomes, completed)
+            self.log.write(json.dumps({'chunk': index, 'completed': completed, 'outcomes': outcomes}) + '\n')
+            self.log.flush()
+
+    def close(self):
+        self.log.close()
+
+
+# Normaliza las filas y marca las inválidas y los artist_id repetidos dentro del
+# archivo (gana la primera aparición). Devuelve una lista de (fila, item, resultado).
+def prepare_rows(path):
+    prepared = []
+    seen = set()
+    for line_number, row in enumerate(read_rows(path), start=1):
+        item, error = build_artist_item(row)
+        if error:
+            prepared.append((line_number, None, {'status': 'invalid', 'message': error}))
+        elif item['artist_id'] in seen:
+            prepared.append((line_number, None, {'status': 'duplicate', 'message': 'artist_id repetido en el archivo'}))
+        else:
+            seen.add(item['artist_id'])
+            prepared.append((line_number, item, None))
+    return prepared
+
+
+# Escribe un artista nuevo. Devuelve 'imported' o 'duplicate' si el artist_id ya
+# estaba registrado por otro medio. El repositorio usa las tablas del hilo actual
+# (runtime crea un recurso de boto3 por hilo).
+def import_item(item, artists):
+    try:
+        artists.create(item)
+    except storage.ConditionFailed as e:
+        existing = e.item or {}
+        if any(existing.get(field) != item[field] for field in IMPORT_FIELDS):
+            return 'duplicate'
+
+    # Los índices se vuelven a escribir también al recuperar una escritura propia
+    artists.update_name_index(item['artist_id'], None, item['name'])
+    return 'imported'
+
+
+# Importa un bloque. Los artistas con resultado en el checkpoint no se vuelven a
+# escribir; un error en un artista no detiene el resto del bloque, que queda
+# pendiente para la próxima ejecución. Devuelve (resultados del reporte,
+# resultados nuevos por artist_id, bloque terminado).
+def import_chunk(index, rows, checkpoint):
+    artists = storage.artists()
+
+    results = []
+    outcomes = {}
+    completed = True
+    for line_number, item, result in rows:
+        if result is None:
+            artist_id = item['artist_id']
+            result = {'status': checkpoint.outcome(index, artist_id)}
+            if result['status'] is None:
+                try:
+                    result['status'] = outcomes[artist_id] = import_item(item, artists)
+                except Exception as e:
+                    print(f"Error al importar {artist_id}: {e}")
+                    completed = False
+                    result = {'status': 'error', 'message': str(e)}
+            if result['status'] == 'duplicate':
+                result['message'] = 'El artista ya está registrado'
+            result['artist_id'] = artist_id
+        results.append({'line': line_number, **result})
+    return results, outcomes, completed
+
+
+def run_import(path, checkpoint_path, report_path, workers):
+    rows = prepare_rows(path)
+    chunks = [rows[i:i + CHUNK_SIZE] for i in range(0, len(rows), CHUNK_SIZE)]
+    checkpoint = Checkpoint(checkpoint_path)
+    pending = [index for index in range(len(chunks)) if index not in checkpoint.completed]
+
+    print(f"{len(rows)} filas, {len(chunks)} bloques, {len(checkpoint.completed)} ya importados")
+
+    summary = {}
+    try:
+        with open(report_path, 'a', encoding='utf-8') as report, ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(import_chunk, index, chunks[index], checkpoint): index
+                for index in pending
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results, outcomes, completed = future.result()
+                except Exception as e:
+                    # El bloque queda fuera del checkpoint y se reintenta al reanudar
+                    print(f"Error en el bloque {index}: {e}")
+                    results = [
+                        {'line': line_number, 'status': 'error', 'message': str(e)}
+                        for line_number, _, _ in chunks[index]
+                    ]
+                    outcomes, completed = {}, False
+
+                for result in results:
+                    report.write(json.dumps(result, ensure_ascii=False) + '\n')
+                    summary[result['status']] = summary.get(result['status'], 0) + 1
+                report.flush()
+                checkpoint.update(index, outcomes, completed)
+    finally:
+        checkpoint.close()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importación masiva de artistas (NDJSON o CSV)')
+    parser.add_argument('path')
+    parser.add_argument('--checkpoint', help='Archivo de checkpoint (por defecto <path>.checkpoint.ndjson)')
+    parser.add_argument('--report', help='Reporte por fila en NDJSON (por defecto <path>.report.ndjson)')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    summary = run_import(
+        args.path,
+        args.checkpoint or f"{args.path}.checkpoint.ndjson",
+        args.report or f"{args.path}.report.ndjson",
+        args.workers
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == '__main__':
+    main()
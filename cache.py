@@ -0,0 +1,309 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+import storage
+from artist_utils import LIST_FIELDS, SENSITIVE_FIELDS
+from json_utils import json_default
+
+# Cache de lectura de los perfiles de artistas para los endpoints de consulta
+# (getInfoById, getAllbyName, getByName_and_Id). Tiene dos niveles:
+# - uno en el proceso (LRU con TTL y tamaño máximo), que dura mientras el
+#   contenedor siga caliente
+# - uno compartido opcional (ARTIST_CACHE_URL) con la interfaz de Redis: get,
+#   set con 'ex' y delete. 'redis://...' usa redis-py; 'local://' usa LocalRedis,
+#   un sustituto en el proceso para pruebas y benchmarks.
+# Las escrituras (update_artist, registerArtist) invalidan las entradas
+# afectadas. Otro contenedor puede servir un perfil anterior hasta que venza su
+# TTL en el nivel local, así que el TTL acota cuánto puede atrasarse una lectura.
+ARTIST_CACHE_TTL = int(os.environ.get('ARTIST_CACHE_TTL', '30'))  # Segundos; 0 desactiva la cache
+ARTIST_CACHE_SIZE = int(os.environ.get('ARTIST_CACHE_SIZE', '1000'))  # Entradas en el proceso
+ARTIST_CACHE_URL = os.environ.get('ARTIST_CACHE_URL', '')
+ARTIST_CACHE_PREFIX = os.environ.get('ARTIST_CACHE_PREFIX', 'artists:')
+
+# Contadores del contenedor desde el arranque
+_counters = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+_counters_lock = threading.Lock()
+
+_local_tier = None
+_shared_tier = None
+
+
+def _count(counter, metric=None, value=1):
+    if not value:
+        return
+    with _counters_lock:
+        _counters[counter] += value
+    if metric:
+        metrics.count(metric, value)
+
+
+def stats():
+    with _counters_lock:
+        counters = dict(_counters)
+    counters['size'] = len(_local_tier) if _local_tier else 0
+    return counters
+
+
+# LRU con vencimiento por entrada. Al superar 'size' descarta la menos usada.
+class LRUCache:
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                _count('expirations')
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        evicted = 0
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                evicted += 1
+        _count('evictions', 'CacheEvictions', evicted)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+# Sustituto en el proceso del nivel compartido, con el mismo subconjunto de la
+# interfaz de redis-py que usa este módulo
+class LocalRedis:
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= time.time():
+                del self.values[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value, ex=None):
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        with self.lock:
+            self.values[key] = (time.time() + ex if ex else None, value)
+        return True
+
+    def delete(self, *keys):
+        with self.lock:
+            return sum(1 for key in keys if self.values.pop(key, None) is not None)
+
+
+def local_tier():
+    global _local_tier
+    if _local_tier is None:
+        _local_tier = LRUCache(ARTIST_CACHE_SIZE, ARTIST_CACHE_TTL)
+    return _local_tier
+
+
+def shared_tier():
+    global _shared_tier
+    if _shared_tier is None and ARTIST_CACHE_URL:
+        if ARTIST_CACHE_URL.startswith('local://'):
+            _shared_tier = LocalRedis()
+        else:
+            # Dependencia opcional: solo se necesita con un Redis real
+            import redis
+            _shared_tier = redis.Redis.from_url(ARTIST_CACHE_URL, socket_timeout=0.2)
+    return _shared_tier
+
+
+# Un error del nivel compartido no debe fallar la petición: se trata como un miss
+def _shared_get(keys):
+    shared = shared_tier()
+    if not shared:
+        return {}
+    found = {}
+    try:
+        for key in keys:
+            value = shared.get(ARTIST_CACHE_PREFIX + key)
+            if value is not None:
+                found[key] = json.loads(value)
+    except Exception as e:
+        print(f"Error al leer la cache compartida: {e}")
+    return found
+
+
+def _shared_set(values):
+    shared = shared_tier()
+    if not shared:
+        return
+    try:
+        for key, value in values.items():
+            shared.set(ARTIST_CACHE_PREFIX + key, json.dumps(value, default=json_default), ex=ARTIST_CACHE_TTL)
+    except Exception as e:
+        print(f"Error al escribir la cache compartida: {e}")
+
+
+# Busca 'keys' en los dos niveles sin cargar lo que falta. Los valores encontrados
+# en el nivel compartido se copian al local.
+def lookup(keys):
+    local = local_tier()
+    found = {}
+    for key in keys:
+        value = local.get(key)
+        if value is not None:
+            found[key] = value
+    _count('hits', 'CacheHits', len(found))
+
+    missing = [key for key in keys if key not in found]
+    if missing:
+        shared = _shared_get(missing)
+        _count('shared_hits', 'SharedCacheHits', len(shared))
+        for key, value in shared.items():
+            local.set(key, value)
+        found.update(shared)
+    return found
+
+
+# Busca 'keys' en los dos niveles y completa lo que falta con load(missing) ->
+# {key: value}
+def read_through(keys, load):
+    found = lookup(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        _count('misses', 'CacheMisses', len(missing))
+        loaded = load(missing)
+        local = local_tier()
+        for key, value in loaded.items():
+            local.set(key, value)
+        _shared_set(loaded)
+        found.update(loaded)
+    return found
+
+
+def artist_key(artist_id):
+    return f"artist:{artist_id}"
+
+
+def name_key(name):
+    return f"name:{name}"
+
+
+# Invalida el perfil de un artista y los resultados por nombre de 'names' (el
+# nombre anterior y el nuevo cuando cambia)
+def invalidate_artist(artist_id, *names):
+    if ARTIST_CACHE_TTL <= 0:
+        return
+    keys = [artist_key(artist_id)] + [name_key(name) for name in names if name]
+    local_tier().delete(*keys)
+    shared = shared_tier()
+    if shared:
+        try:
+            shared.delete(*[ARTIST_CACHE_PREFIX + key for key in keys])
+        except Exception as e:
+            print(f"Error al invalidar la cache compartida: {e}")
+
+
+def _profile(item):
+    return {field: value for field, value in item.items() if field not in SENSITIVE_FIELDS}
+
+
+def _project(profile, fields):
+    if not fields:
+        return dict(profile)
+    return {field: profile[field] for field in fields if field in profile}
+
+
+# Repositorio de solo lectura sobre el de storage. Guarda el perfil completo de
+# cada artista (sin los atributos sensibles) cuando se lee completo, y con él
+# responde cualquier proyección. Una lectura proyectada que no está en la cache
+# (p. ej. VERSION_FIELDS del ETag) se hace proyectada y no se guarda: no paga el
+# item completo. Las búsquedas por nombre guardan las filas de la vista de lista
+# (LIST_FIELDS, la proyección de NameListIndex), así un miss es una sola consulta
+# al índice sin leer la tabla.
+class CachedArtists:
+    def __init__(self, artists):
+        self.artists = artists
+
+    def get(self, artist_id, fields=None):
+        key = artist_key(artist_id)
+        if fields:
+            profile = lookup([key]).get(key)
+            if profile:
+                return _project(profile, fields)
+            _count('misses', 'CacheMisses')
+            return self.artists.get(artist_id, fields=fields)
+
+        def load(keys):
+            item = self.artists.get(artist_id)
+            return {keys[0]: _profile(item)} if item else {}
+
+        profile = read_through([key], load).get(key)
+        return dict(profile) if profile else None
+
+    def batch_get(self, artist_ids, fields=None):
+        artist_ids = list(dict.fromkeys(artist_ids))
+        keys = [artist_key(artist_id) for artist_id in artist_ids]
+        if fields:
+            found = lookup(keys)
+            missing = [artist_id for artist_id, key in zip(artist_ids, keys) if key not in found]
+            loaded = {}
+            if missing:
+                _count('misses', 'CacheMisses', len(missing))
+                read_fields = list(dict.fromkeys(['artist_id', *fields]))
+                loaded = {item['artist_id']: item for item in self.artists.batch_get(missing, fields=read_fields)}
+            return [
+                _project(found[key], fields) if key in found else _project(loaded[artist_id], fields)
+                for artist_id, key in zip(artist_ids, keys)
+                if key in found or artist_id in loaded
+            ]
+
+        def load(missing):
+            ids = [key[len('artist:'):] for key in missing]
+            return {artist_key(item['artist_id']): _profile(item) for item in self.artists.batch_get(ids)}
+
+        found = read_through(keys, load)
+        return [dict(found[key]) for key in keys if key in found]
+
+    def by_name(self, name, artist_id=None, fields=None):
+        # Atributos fuera de la vista de lista: sin cache
+        if fields and not set(fields) <= set(LIST_FIELDS):
+            return self.artists.by_name(name, artist_id, fields=fields)
+
+        def load(keys):
+            return {keys[0]: self.artists.by_name(name, fields=list(LIST_FIELDS))}
+
+        rows = read_through([name_key(name)], load)[name_key(name)]
+        if artist_id:
+            rows = [row for row in rows if row['artist_id'] == artist_id]
+        return [_project(row, fields) for row in rows]
+
+    def search_names(self, query, limit):
+        return self.artists.search_names(query, limit)
+
+
+# Repositorio de artistas para los endpoints de lectura: con la cache desactivada
+# es el mismo de storage
+def artists():
+    if ARTIST_CACHE_TTL <= 0:
+        return storage.artists()
+    return CachedArtists(storage.artists())
@@ -1,22 +1,12 @@
-import json
-import boto3
-import hashlib
-import os
-
-# Cliente de DynamoDB
-dynamodb = boto3.resource('dynamodb')
-
-# Obtener el nombre de la tabla desde las variables de entorno
-ARTIST_TABLE = os.environ['TABLE_NAME_ARTISTS']
-table = dynamodb.Table(ARTIST_TABLE)
-
-# Función para hashear la contraseña
-def hash_password(password):
-    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+import runtime
+import storage
+from artist_update import UpdateError, update_artist
+from token_utils import authorize_request
 
+@runtime.handler('TABLE_NAME_ARTISTS', 'TABLE_NAME_TOKENS')
 def lambda_handler(event, context):
     try:
-        print(f"Evento recibido: {json.dumps(event, indent=2)}")
+        artists = storage.artists()
 
         # Obtener encabezados de la solicitud de manera segura
         headers = event.get('headers', {})
@@ -31,54 +21,10 @@ def lambda_handler(event, context):
         # Obtener el cuerpo de la solicitud
         body = event['body']
 
-        # Obtener artist_id del cuerpo
-        artist_id = body.get('artist_id')
-        if not artist_id:
-            return {
-                'statusCode': 400,
-                'message': 'Falta el parámetro artist_id'
-            }
-
-        # Crear el cliente de Lambda para invocar el Lambda de ValidarTokenAcceso
-        lambda_client = boto3.client('lambda')
-
-        # Crear el payload como JSON para validar el token
-        payload = {
-            "token": token,
-            "artist_id": artist_id
-        }
-
-        # Invocar el Lambda ValidarTokenAcceso
-        lambda_function_name = f"{os.environ['SERVICE_NAME']}-{os.environ['STAGE']}-ValidateToken_A"
-
-        invoke_response = lambda_client.invoke(
-            FunctionName=lambda_function_name,
-            InvocationType='RequestResponse',
-            Payload=json.dumps(payload)
-        )
-
-        # Leer la respuesta del Lambda invocado
-        response = json.loads(invoke_response['Payload'].read())
-        print(f"Respuesta de ValidarTokenAcceso: {response}")
-
-        # Validar la respuesta del Lambda invocado
-        if 'statusCode' not in response:
-            return {
-                'statusCode': 500,
-                'message': 'Respuesta inválida de ValidarTokenAcceso'
-            }
-
-        if response['statusCode'] == 403:
-            return {
-                'statusCode': 403,
-                'message': 'Forbidden - Acceso No Autorizado'
-            }
-
-        if response['statusCode'] == 401:
-            return {
-                'statusCode': 401,
-                'message': 'Unauthorized - Token Expirado'
-            }
+        # Validar el token y obtener el artist_id autorizado (authorizer de API Gateway o en proceso)
+        artist_id, auth_error = authorize_request(event, storage.tokens(), token)
+        if auth_error:
+            return auth_error
 
         # Continuar con la lógica si el token es válido
         new_password = body.get('new_password')
@@ -91,40 +37,21 @@ def lambda_handler(event, context):
                 "message": "Faltan parámetros: 'current_password' o 'new_password'"
             }
 
-        # Buscar el usuario en la base de datos usando artist_id
-        response = table.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('artist_id').eq(artist_id)
-        )
-
-        # Verificar si el usuario existe
-        if 'Items' not in response or len(response['Items']) == 0:
-            return {
-                "statusCode": 404,
-                "message": "Artista no encontrado"
-            }
-
-        # Obtener el primer usuario encontrado (asumimos que hay solo uno por artist_id)
-        user = response['Items'][0]
-
-        # Verificar si la contraseña actual coincide
-        if hash_password(current_password) != user['password']:
-            return {
-                "statusCode": 401,
-                "message": "Contraseña actual incorrecta"
-            }
-
-        # Hashear la nueva contraseña
-        hashed_new_password = hash_password(new_password)
-
-        # Actualizar la contraseña del usuario
-        user['password'] = hashed_new_password
-
-        # Actualizar el registro en DynamoDB
-        table.put_item(Item=user)
+        # Cambiar la contraseña con un único update_item condicionado a que la
+        # contraseña actual coincida
+        try:
+            version = update_artist(
+                artists, artist_id, {'password': new_password},
+                current_password=current_password,
+                expected_version=body.get('expected_version')
+            )
+        except UpdateError as e:
+            return e.response()
 
         return {
             "statusCode": 200,
-            "message": "Contraseña actualizada exitosamente"
+            "message": "Contraseña actualizada exitosamente",
+            "version": version
         }
 
     except Exception as e:
@@ -0,0 +1,18 @@
+import json
+
+import runtime
+from country_stats import apply_deltas, country_deltas
+
+# Consumidor del stream de la tabla de artistas: mantiene los contadores por país.
+# Cada lote del stream se resume en un único update_item con todos los incrementos.
+def lambda_handler(event, context):
+    records = event.get('Records', [])
+    deltas = country_deltas(records)
+    apply_deltas(runtime.table('TABLE_NAME_STATS'), deltas)
+
+    print(json.dumps({'country_stats': {'records': len(records), 'deltas': deltas}}))
+    return {
+        'statusCode': 200,
+        'records': len(records),
+        'countries': len(deltas)
+    }
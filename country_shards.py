@@ -0,0 +1,99 @@
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from pagination import InvalidPageRequest
+
+# Fragmentación opcional del índice por país. Con COUNTRY_SHARDS = N > 0 cada
+# artista guarda 'country_shard' = "<country>#<n>" (n estable a partir de su
+# artist_id) y CountryShardIndex reparte un país grande en N particiones. Los
+# listados consultan los N fragmentos en paralelo. Se puede aumentar N sin migrar
+# datos, pero no reducirlo: los artistas de los fragmentos >= N dejarían de listarse.
+COUNTRY_SHARDS = int(os.environ.get('COUNTRY_SHARDS', '0'))
+
+# Pool compartido entre invocaciones mientras el contenedor siga caliente. Con
+# más fragmentos que hilos, las consultas restantes esperan turno.
+MAX_WORKERS = 16
+_executor = None
+
+
+def shard_for(artist_id, shards=None):
+    return zlib.crc32(artist_id.encode('utf-8')) % (shards or COUNTRY_SHARDS)
+
+
+def shard_key(country, shard):
+    return f"{country}#{shard}"
+
+
+def country_shard(country, artist_id, shards=None):
+    return shard_key(country, shard_for(artist_id, shards))
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    return _executor
+
+
+# Ejecuta fetch(*args) para cada elemento de 'calls' en el pool, con el registro
+# de métricas de la petición. Devuelve los resultados en el mismo orden.
+def fetch_parallel(fetch, calls):
+    recorder = metrics.current()
+
+    def run(args):
+        with metrics.attach(recorder):
+            return fetch(*args)
+
+    futures = [_pool().submit(run, args) for args in calls]
+    return [future.result() for future in futures]
+
+
+# Página de un país repartida entre los fragmentos. El cursor combinado guarda el
+# LastEvaluatedKey de cada fragmento que aún tiene artistas ({shard: key}; None
+# si todavía no se consultó). En cada ronda se reparte lo que falta para completar
+# 'limit' entre los fragmentos pendientes y se consultan a la vez.
+def query_shards(artists, country, limit, start_key=None, fields=None):
+    pending = dict(start_key['shards']) if start_key else {str(shard): None for shard in range(COUNTRY_SHARDS)}
+    items = []
+
+    def fetch(shard, shard_limit):
+        return artists.by_country_shard(shard_key(country, shard), shard_limit, pending[shard], fields)
+
+    while pending and len(items) < limit:
+        base, extra = divmod(limit - len(items), len(pending))
+        shards = [
+            (shard, base + (1 if i < extra else 0))
+            for i, shard in enumerate(sorted(pending, key=int))
+            if base or i < extra
+        ]
+        for (shard, _), (shard_items, last_key) in zip(shards, fetch_parallel(fetch, shards)):
+            items.extend(shard_items)
+            if last_key:
+                pending[shard] = last_key
+            else:
+                del pending[shard]
+
+    return items, ({'country': country, 'shards': pending} if pending else None)
+
+
+# Un cursor de CountryListIndex no sirve para CountryShardIndex ni al revés. El de
+# los fragmentos viene del cliente: solo puede nombrar fragmentos que existen
+# ("0" a COUNTRY_SHARDS - 1), cada uno con su LastEvaluatedKey o None.
+def check_cursor(start_key):
+    if start_key and ('shards' in start_key) != (COUNTRY_SHARDS > 0):
+        raise InvalidPageRequest('El cursor no corresponde a la configuración del índice')
+    if start_key and COUNTRY_SHARDS > 0:
+        shards = start_key['shards']
+        if (not isinstance(shards, dict) or not shards
+                or not set(shards) <= {str(shard) for shard in range(COUNTRY_SHARDS)}
+                or not all(key is None or isinstance(key, dict) for key in shards.values())):
+            raise InvalidPageRequest('Cursor inválido')
+
+
+# Página de un país con el índice que corresponda a la configuración
+def country_page(artists, country, limit, start_key=None, fields=None):
+    if COUNTRY_SHARDS > 0:
+        return query_shards(artists, country, limit, start_key, fields)
+    return artists.by_country(country, limit, start_key, fields=fields)
@@ -0,0 +1,53 @@
+# Conteo de artistas por país. Los contadores viven en un único item de la tabla de
+# estadísticas (un atributo por país), así /artist/countries los lee con un solo
+# get_item. Los mantiene el consumidor del stream de la tabla de artistas.
+COUNTRY_STATS_KEY = {'stat_id': 'countries'}
+
+
+def _country(image):
+    return (image or {}).get('country', {}).get('S')
+
+
+# Suma por país los cambios de un lote de registros del stream (NEW_AND_OLD_IMAGES):
+# alta +1, baja -1 y cambio de país -1 en el anterior y +1 en el nuevo
+def country_deltas(records):
+    deltas = {}
+    for record in records:
+        images = record.get('dynamodb', {})
+        old_country = _country(images.get('OldImage'))
+        new_country = _country(images.get('NewImage'))
+        if old_country == new_country:
+            continue
+        if old_country:
+            deltas[old_country] = deltas.get(old_country, 0) - 1
+        if new_country:
+            deltas[new_country] = deltas.get(new_country, 0) + 1
+    return {country: delta for country, delta in deltas.items() if delta}
+
+
+# Aplica todos los incrementos de un lote con un único update_item
+def apply_deltas(stats_table, deltas):
+    if not deltas:
+        return
+    names = {}
+    values = {}
+    additions = []
+    for i, (country, delta) in enumerate(sorted(deltas.items())):
+        names[f"#c{i}"] = country
+        values[f":d{i}"] = delta
+        additions.append(f"#c{i} :d{i}")
+
+    stats_table.update_item(
+        Key=COUNTRY_STATS_KEY,
+        UpdateExpression="ADD " + ", ".join(additions),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values
+    )
+
+
+def read_counts(stats_table):
+    item = stats_table.get_item(Key=COUNTRY_STATS_KEY).get('Item', {})
+    return {
+        country: int(count) for country, count in item.items()
+        if country not in COUNTRY_STATS_KEY and count
+    }
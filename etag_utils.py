@@ -0,0 +1,43 @@
+import hashlib
+
+# ETag de las respuestas de lectura. Se calcula a partir de artist_id y 'version'
+# (que incrementan todas las escrituras), no del contenido serializado, así que
+# basta una lectura proyectada de esos dos atributos para saber si el cliente ya
+# tiene la versión actual.
+VERSION_FIELDS = ['artist_id', 'version']
+
+
+# ETag de una lista de artistas. 'scope' agrega lo que, además de los artistas,
+# cambia la respuesta (p. ej. el país o el cursor de la siguiente página).
+def list_etag(items, *scope):
+    digest = hashlib.sha256()
+    for part in scope:
+        digest.update(f"{part}\n".encode('utf-8'))
+    for item in items:
+        digest.update(f"{item['artist_id']}:{int(item.get('version', 0))}\n".encode('utf-8'))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def item_etag(item):
+    return list_etag([item])
+
+
+# ETags del encabezado If-None-Match (las débiles W/"..." se comparan igual)
+def if_none_match(event):
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    value = headers.get('if-none-match')
+    if not value:
+        return set()
+    return {tag.strip().removeprefix('W/') for tag in value.split(',')}
+
+
+def etag_matches(tags, etag):
+    return '*' in tags or etag in tags
+
+
+# Respuesta sin cuerpo: el cliente ya tiene la versión actual
+def not_modified(etag):
+    return {
+        'statusCode': 304,
+        'etag': etag
+    }
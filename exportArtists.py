@@ -0,0 +1,277 @@
+# Exportación completa de la tabla de artistas a NDJSON comprimido.
+#
+# Recorre la tabla con un scan paralelo (Segment/TotalSegments): cada segmento lo
+# procesa un hilo y escribe su propio archivo "artists-<segmento>-of-<total>.ndjson.gz"
+# en un directorio local o en S3 (s3://bucket/prefijo). Cada página del scan se
+# comprime como un miembro gzip independiente y se escribe en cuanto llega, así la
+# memoria no depende del tamaño de la tabla (una página por hilo en local, una parte
+# del multipart upload por hilo en S3). Los atributos sensibles (password,
+# idempotency_key) no se exportan.
+#
+# El checkpoint guarda por segmento el LastEvaluatedKey de la última página ya
+# escrita de forma durable; si se vuelve a ejecutar con el mismo checkpoint cada
+# segmento continúa desde ahí. DYNAMODB_ENDPOINT_URL funciona como en los handlers
+# (p. ej. para exportar desde DynamoDB Local). Al terminar imprime el throughput de
+# cada segmento:
+#
+#   TABLE_NAME_ARTISTS=dev-Pt_artists python exportArtists.py exports/2024-05-01 --segments 8
+#   TABLE_NAME_ARTISTS=dev-Pt_artists python exportArtists.py s3://analytics/artists/2024-05-01
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import boto3
+
+import runtime
+from artist_utils import SENSITIVE_FIELDS
+from json_utils import json_default
+
+# S3 exige al menos 5 MB por parte (salvo la última)
+PART_SIZE = 8 * 1024 * 1024
+
+# Los clientes de boto3 no se comparten entre hilos: uno por hilo (la tabla de
+# artistas también es del hilo, ver runtime.table)
+_local = threading.local()
+
+
+def _s3():
+    if not hasattr(_local, 's3'):
+        _local.s3 = boto3.client('s3')
+    return _local.s3
+
+
+def encode_page(items):
+    lines = []
+    for item in items:
+        row = {key: value for key, value in item.items() if key not in SENSITIVE_FIELDS}
+        lines.append(json.dumps(row, ensure_ascii=False, default=json_default) + '\n')
+    return gzip.compress(''.join(lines).encode('utf-8'))
+
+
+# Archivo local de un segmento. 'state' es lo último guardado en el checkpoint:
+# al reanudar se descarta lo escrito después (páginas que el checkpoint no cubre).
+class LocalSegmentWriter:
+    def __init__(self, path, state):
+        if state:
+            self.file = open(path, 'r+b')
+            self.file.truncate(state['offset'])
+            self.file.seek(state['offset'])
+        else:
+            self.file = open(path, 'wb')
+
+    # Devuelve el estado durable tras la escritura
+    def write(self, data):
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {'offset': self.file.tell()}
+
+    def close(self):
+        state = {'offset': self.file.tell()}
+        self.file.close()
+        return state
+
+
+# Objeto de S3 de un segmento, escrito con un multipart upload. Las páginas se
+# acumulan hasta completar una parte; solo lo ya subido es durable, así que
+# write() devuelve None mientras la página siga en el buffer.
+class S3SegmentWriter:
+    def __init__(self, bucket, key, state):
+        self.bucket = bucket
+        self.key = key
+        self.buffer = bytearray()
+        if state:
+            self.upload_id = state['upload_id']
+            self.parts = list(state['parts'])
+        else:
+            self.upload_id = _s3().create_multipart_upload(Bucket=bucket, Key=key)['UploadId']
+            self.parts = []
+
+    def _state(self):
+        return {'upload_id': self.upload_id, 'parts': list(self.parts)}
+
+    def _upload_part(self):
+        part_number = len(self.parts) + 1
+        response = _s3().upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=bytes(self.buffer)
+        )
+        self.parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer.extend(data)
+        if len(self.buffer) < PART_SIZE:
+            return None
+        self._upload_part()
+        return self._state()
+
+    def close(self):
+        if self.buffer or not self.parts:
+            self._upload_part()
+        _s3().complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts}
+        )
+        return self._state()
+
+
+def open_writer(destination, file_name, state):
+    if destination.startswith('s3://'):
+        bucket, _, prefix = destination[len('s3://'):].partition('/')
+        key = f"{prefix.rstrip('/')}/{file_name}" if prefix else file_name
+        return S3SegmentWriter(bucket, key, state)
+    return LocalSegmentWriter(os.path.join(destination, file_name), state)
+
+
+class Checkpoint:
+    def __init__(self, path, destination, total_segments):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {'destination': destination, 'total_segments': total_segments, 'segments': {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            if saved['destination'] != destination or saved['total_segments'] != total_segments:
+                raise SystemExit(
+                    f"El checkpoint {path} corresponde a otra exportación "
+                    f"({saved['destination']}, {saved['total_segments']} segmentos)"
+                )
+            self.data = saved
+
+    def segment(self, segment):
+        return self.data['segments'].get(str(segment), {})
+
+    def update(self, segment, state):
+        with self.lock:
+            self.data['segments'][str(segment)] = state
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.data, f, default=json_default)
+            os.replace(tmp_path, self.path)
+
+
+# Recorre un segmento completo. Solo avanza el checkpoint cuando la página quedó
+# escrita de forma durable en el destino.
+def export_segment(destination, segment, total_segments, page_size, checkpoint):
+    saved = checkpoint.segment(segment)
+    report = {'segment': segment, 'items': 0, 'pages': 0, 'bytes': 0, 'rcu': 0.0, 'seconds': 0.0}
+    if saved.get('done'):
+        report['skipped'] = True
+        return report
+
+    table = runtime.table('TABLE_NAME_ARTISTS')
+    writer = open_writer(destination, f"artists-{segment:04d}-of-{total_segments:04d}.ndjson.gz", saved.get('sink'))
+    scan_args = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'Limit': page_size,
+        'ReturnConsumedCapacity': 'TOTAL'
+    }
+    if saved.get('last_key'):
+        scan_args['ExclusiveStartKey'] = saved['last_key']
+    exported = saved.get('items', 0)
+
+    start = time.perf_counter()
+    while True:
+        response = table.scan(**scan_args)
+        items = response.get('Items', [])
+        last_key = response.get('LastEvaluatedKey')
+        report['pages'] += 1
+        report['rcu'] += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+
+        if items:
+            data = encode_page(items)
+            report['items'] += len(items)
+            report['bytes'] += len(data)
+            durable = writer.write(data)
+            if durable is not None and last_key:
+                checkpoint.update(segment, {
+                    'last_key': last_key,
+                    'sink': durable,
+                    'items': exported + report['items']
+                })
+
+        if not last_key:
+            break
+        scan_args['ExclusiveStartKey'] = last_key
+
+    checkpoint.update(segment, {'done': True, 'sink': writer.close(), 'items': exported + report['items']})
+    elapsed = time.perf_counter() - start
+    report['seconds'] = round(elapsed, 2)
+    report['items_per_s'] = round(report['items'] / elapsed, 1)
+    return report
+
+
+def run_export(destination, checkpoint_path, total_segments, workers, page_size):
+    if not destination.startswith('s3://'):
+        os.makedirs(destination, exist_ok=True)
+    checkpoint = Checkpoint(checkpoint_path, destination, total_segments)
+
+    reports = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(export_segment, destination, segment, total_segments, page_size, checkpoint): segment
+            for segment in range(total_segments)
+        }
+        for future in as_completed(futures):
+            segment = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                # El segmento conserva su último checkpoint y continúa al reanudar
+                print(f"Error en el segmento {segment}: {e}")
+                report = {'segment': segment, 'error': str(e)}
+            reports.append(report)
+            print(json.dumps(report))
+
+    elapsed = time.perf_counter() - start
+    exported = sum(report.get('items', 0) for report in reports)
+    return {
+        'segments': sorted(reports, key=lambda report: report['segment']),
+        'items': exported,
+        'bytes': sum(report.get('bytes', 0) for report in reports),
+        'rcu': sum(report.get('rcu', 0) for report in reports),
+        'seconds': round(elapsed, 2),
+        'items_per_s': round(exported / elapsed, 1),
+        'failed_segments': sorted(report['segment'] for report in reports if 'error' in report)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exportación de la tabla de artistas a NDJSON comprimido')
+    parser.add_argument('destination', help='Directorio local o s3://bucket/prefijo')
+    parser.add_argument('--segments', type=int, default=8, help='TotalSegments del scan paralelo')
+    parser.add_argument('--workers', type=int, help='Hilos (por defecto uno por segmento)')
+    parser.add_argument('--page-size', type=int, default=1000, help='Items por llamada a Scan')
+    parser.add_argument('--checkpoint', help='Archivo de checkpoint (por defecto export.checkpoint.json '
+                                             'en el directorio de destino o en el directorio actual para S3)')
+    args = parser.parse_args()
+
+    checkpoint_path = args.checkpoint
+    if not checkpoint_path:
+        base = '.' if args.destination.startswith('s3://') else args.destination
+        checkpoint_path = os.path.join(base, 'export.checkpoint.json')
+
+    summary = run_export(
+        args.destination,
+        checkpoint_path,
+        args.segments,
+        args.workers or args.segments,
+        args.page_size
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,50 @@
-import boto3
-import os
-from boto3.dynamodb.conditions import Key
 import json
 
-# Cliente de DynamoDB
-dynamodb = boto3.resource('dynamodb')
+import runtime
+import storage
+from artist_utils import InvalidFields, parse_fields
+from country_shards import check_cursor, country_page
+from etag_utils import VERSION_FIELDS, etag_matches, if_none_match, list_etag, not_modified
+from pagination import InvalidPageRequest, decode_cursor, encode_cursor, page_size
 
-# Obtener el nombre de la tabla desde las variables de entorno
-ARTIST_TABLE = os.environ['TABLE_NAME_ARTISTS']
-table = dynamodb.Table(ARTIST_TABLE)
+SORT_ORDERS = ('asc', 'desc')
 
+
+# Traduce name_prefix, name_from/name_to y sort a una condición sobre la clave de
+# ordenación de CountryNameIndex. Devuelve (name_condition, descending), o None si
+# la petición no pide orden ni filtro por nombre.
+def parse_name_query(body):
+    name_prefix = str(body.get('name_prefix') or '').strip().lower()
+    name_from = str(body.get('name_from') or '').strip().lower()
+    name_to = str(body.get('name_to') or '').strip().lower()
+    sort = body.get('sort')
+
+    if not (name_prefix or name_from or name_to or sort):
+        return None
+    if sort is not None and sort not in SORT_ORDERS:
+        raise InvalidPageRequest("El parámetro 'sort' debe ser 'asc' o 'desc'")
+    # DynamoDB admite una sola condición sobre la clave de ordenación
+    if name_prefix and (name_from or name_to):
+        raise InvalidPageRequest("'name_prefix' no se puede combinar con 'name_from' ni 'name_to'")
+
+    name_condition = None
+    if name_prefix:
+        name_condition = ('begins_with', name_prefix)
+    elif name_from and name_to:
+        if name_from > name_to:
+            raise InvalidPageRequest("'name_from' debe ser menor o igual que 'name_to'")
+        name_condition = ('between', name_from, name_to)
+    elif name_from:
+        name_condition = ('gte', name_from)
+    elif name_to:
+        name_condition = ('lte', name_to)
+
+    return name_condition, sort == 'desc'
+
+
+@runtime.handler('TABLE_NAME_ARTISTS')
 def lambda_handler(event, context):
     try:
-       
-        
         body = event['body'] 
 
         # Obtener el valor de 'country' del cuerpo
@@ -27,25 +58,65 @@ def lambda_handler(event, context):
             
         country = country.strip().lower()
 
-        # Hacer la consulta en la tabla usando el índice GSI basado en 'country'
-        response = table.query(
-            IndexName='CountryIndex',  # Usar el índice GSI definido para 'country'
-            KeyConditionExpression=Key('country').eq(country)
-        )
+        try:
+            limit = page_size(body.get('limit'))
+            start_key = decode_cursor(body.get('cursor'))
+            if start_key and start_key.get('country') != country:
+                raise InvalidPageRequest('El cursor no corresponde a este país')
+            # Orden y filtros por nombre; el cursor de CountryNameIndex trae 'name'
+            name_query = parse_name_query(body)
+            if start_key and ('name' in start_key) != (name_query is not None):
+                raise InvalidPageRequest('El cursor no corresponde a este orden')
+            if name_query is None:
+                check_cursor(start_key)
+            # Atributos de la respuesta (ProjectionExpression sobre el índice)
+            fields = parse_fields(body.get('fields'))
+        except (InvalidPageRequest, InvalidFields) as e:
+            return {
+                "statusCode": 400,
+                "message": str(e)
+            }
+
+        artists = storage.artists()
+
+        # Sin orden ni filtro se usa CountryListIndex (o sus fragmentos); con ellos,
+        # CountryNameIndex lee solo el rango de nombres pedido
+        def read_page(read_fields):
+            if name_query is None:
+                return country_page(artists, country, limit, start_key, fields=read_fields)
+            name_condition, descending = name_query
+            return artists.by_country_name(country, limit, start_key, read_fields, name_condition, descending)
+
+        # El orden y los filtros también forman parte del ETag
+        scope = [country, ','.join(fields)]
+        if name_query is not None:
+            scope.append(json.dumps(name_query))
+
+        # Con If-None-Match, leer primero solo artist_id y version de la misma página:
+        # si el ETag coincide se responde 304 sin leer los artistas completos
+        tags = if_none_match(event)
+        if tags:
+            versions, next_key = read_page(VERSION_FIELDS)
+            etag = list_etag(versions, *scope, encode_cursor(next_key))
+            if versions and etag_matches(tags, etag):
+                return not_modified(etag)
 
-        items = response.get('Items', [])
+        # Consultar el índice GSI hasta completar 'limit' items
+        items, next_key = read_page(fields)
 
-        if not items:
+        if not items and not body.get('cursor'):
             return {
                 "statusCode": 404,
                 "message": f"No se encontraron usuarios para el país {country}"
             }
 
-        # Retornar los usuarios encontrados
+        # Retornar los usuarios encontrados y el cursor de la siguiente página
         return {
             "statusCode": 200,
             "message": f"Usuarios encontrados para el país {country}",
-            "users": items
+            "users": items,
+            "next_cursor": encode_cursor(next_key),
+            "etag": list_etag(items, *scope, encode_cursor(next_key))
         }
 
     except Exception as e:
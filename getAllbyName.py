@@ -1,11 +1,14 @@
-import boto3
-from boto3.dynamodb.conditions import Key
 import os
 
-# Cliente DynamoDB
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME_ARTISTS'])  # Obtén el nombre de la tabla desde las variables de entorno
+import cache
+import runtime
+from artist_utils import InvalidFields, parse_fields
+from etag_utils import VERSION_FIELDS, etag_matches, if_none_match, list_etag, not_modified
 
+# Máximo de artistas devueltos por una búsqueda por subcadena
+MAX_SEARCH_RESULTS = int(os.environ.get('MAX_SEARCH_RESULTS', '100'))
+
+@runtime.handler('TABLE_NAME_ARTISTS', 'TABLE_NAME_NGRAMS')
 def lambda_handler(event, context):
     # Obtener el 'name' del artista desde el evento
     body = event.get('body', {})
@@ -20,29 +23,43 @@ def lambda_handler(event, context):
     # Normalizar el nombre a minúsculas
     name = name.strip().lower()
 
+    # Atributos de la respuesta (ProjectionExpression); nunca incluye la contraseña
     try:
-        # Intentar usar query con el GSI 
-        response = table.query(
-            IndexName='NameTenantIndex',  # El nombre del índice GSI
-            KeyConditionExpression=Key('name').eq(name)
-        )
+        fields = parse_fields(body.get('fields'))
+    except InvalidFields as e:
+        return {
+            'statusCode': 400,
+            'body': str(e)
+        }
 
-        items = response.get('Items', [])
+    try:
+        artists = cache.artists()
+
+        # Con If-None-Match solo se leen artist_id y version para comparar el ETag
+        tags = if_none_match(event)
+        read_fields = VERSION_FIELDS if tags else fields
+        artist_ids = None
 
-        # Si no se encuentran resultados con query, hacer un scan
+        # Intentar usar query con el GSI 
+        items = artists.by_name(name, fields=read_fields)
+
+        # Si no hay coincidencia exacta, buscar por subcadena en el índice de trigramas
         if not items:
-            print("No se encontraron resultados con query, usando scan...")
-            response = table.scan(
-                FilterExpression="contains(#name, :name_value)",
-                ExpressionAttributeNames={
-                    "#name": "name"  # Referencia a 'name' en la tabla
-                },
-                ExpressionAttributeValues={
-                    ":name_value": name  # El valor de búsqueda para 'name'
-                }
-            )
+            artist_ids = artists.search_names(name, MAX_SEARCH_RESULTS)
+            items = artists.batch_get(artist_ids, fields=read_fields)
+            items.sort(key=lambda item: item['artist_id'])
+
+        if items and tags:
+            etag = list_etag(items, name, ','.join(fields))
+            if etag_matches(tags, etag):
+                return not_modified(etag)
 
-            items = response.get('Items', [])
+            # Algún artista cambió: leer los atributos pedidos
+            if artist_ids is None:
+                items = artists.by_name(name, fields=fields)
+            else:
+                items = artists.batch_get(artist_ids, fields=fields)
+                items.sort(key=lambda item: item['artist_id'])
 
         if not items:
             return {
@@ -52,6 +69,7 @@ def lambda_handler(event, context):
 
         return {
             'statusCode': 200,
+            'etag': list_etag(items, name, ','.join(fields)),
             'body': {
                 'message': 'Artistas encontrados.',
                 'artists': items
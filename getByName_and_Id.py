@@ -1,11 +1,8 @@
-import boto3
-from boto3.dynamodb.conditions import Key
-import os
-
-# Cliente DynamoDB
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(os.environ['TABLE_NAME_ARTISTS'])  # Obtén el nombre de la tabla desde las variables de entorno
+import cache
+import runtime
+from artist_utils import LIST_FIELDS
 
+@runtime.handler('TABLE_NAME_ARTISTS')
 def lambda_handler(event, context):
     # Obtener el 'name' del artista desde el evento
     # Obtener el cuerpo de la solicitud
@@ -20,13 +17,8 @@ def lambda_handler(event, context):
         }
 
     try:
-        # Usamos el GSI 'NameArtistIdIndex' para buscar artistas por nombre y filtrar por 'artist_id'
-        response = table.query(
-            IndexName='NameArtistIdIndex',  # El nombre del índice GSI
-            KeyConditionExpression=Key('name').eq(name) & Key('artist_id').eq(artist_id)
-        )
-
-        items = response.get('Items', [])
+        # Usamos el GSI 'NameListIndex' para buscar artistas por nombre y filtrar por 'artist_id'
+        items = cache.artists().by_name(name, artist_id, fields=list(LIST_FIELDS))
 
         if not items:
             return {
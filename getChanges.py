@@ -0,0 +1,39 @@
+import runtime
+import storage
+from artist_changes import changes_page, parse_since
+from pagination import InvalidPageRequest, encode_cursor, page_size
+
+# Feed de cambios: artistas registrados o modificados después de 'since', en orden
+# de updated_at. 'since' es el next_cursor de la respuesta anterior o, en la
+# primera sincronización, una fecha u hora ISO 8601.
+@runtime.handler('TABLE_NAME_ARTISTS')
+def lambda_handler(event, context):
+    # GET: los parámetros llegan en el query string
+    query = event.get('query') or {}
+
+    try:
+        limit = page_size(query.get('limit'))
+        position = parse_since(query.get('since'))
+    except InvalidPageRequest as e:
+        return {
+            'statusCode': 400,
+            'message': str(e)
+        }
+
+    try:
+        items, next_position, has_more = changes_page(storage.artists(), position, limit)
+
+        # El cursor se devuelve siempre: sin cambios nuevos apunta a la misma posición
+        return {
+            'statusCode': 200,
+            'changes': items,
+            'next_cursor': encode_cursor(next_position),
+            'has_more': has_more
+        }
+
+    except Exception as e:
+        print(f"Error al consultar los cambios: {e}")
+        return {
+            'statusCode': 500,
+            'message': 'Error interno del servidor'
+        }
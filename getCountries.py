@@ -0,0 +1,22 @@
+import runtime
+import storage
+
+# Cantidad de artistas por país, leída de los contadores precalculados
+@runtime.handler('TABLE_NAME_STATS')
+def lambda_handler(event, context):
+    try:
+        counts = storage.artists().country_counts()
+
+        return {
+            'statusCode': 200,
+            'countries': dict(sorted(counts.items())),
+            'total': sum(counts.values())
+        }
+
+    except Exception as e:
+        # Manejo de errores
+        print(f"Error al consultar los países: {e}")
+        return {
+            'statusCode': 500,
+            'message': 'Error interno del servidor'
+        }
@@ -0,0 +1,56 @@
+import os
+
+import runtime
+import storage
+
+# Máximo de artist_id aceptados por petición
+MAX_BATCH_IDS = int(os.environ.get('MAX_BATCH_IDS', '100'))
+
+@runtime.handler('TABLE_NAME_ARTISTS')
+def lambda_handler(event, context):
+    try:
+        body = event.get('body', {})
+
+        # Obtener la lista de artist_id del cuerpo de la solicitud
+        artist_ids = body.get('artist_ids')
+        if not artist_ids or not isinstance(artist_ids, list):
+            return {
+                'statusCode': 400,
+                'message': 'Falta el parámetro artist_ids (lista)'
+            }
+
+        # Quitar duplicados manteniendo el orden recibido
+        artist_ids = list(dict.fromkeys(artist_ids))
+
+        if len(artist_ids) > MAX_BATCH_IDS:
+            return {
+                'statusCode': 400,
+                'message': f'Se aceptan como máximo {MAX_BATCH_IDS} artist_ids por petición'
+            }
+
+        # Leer todos los artistas con BatchGetItem (bloques de 100, con reintentos)
+        items = storage.artists().batch_get(artist_ids, fields=['artist_id', 'photo', 'name', 'info'])
+
+        artists = {
+            item['artist_id']: {
+                'photo': item.get('photo'),
+                'name': item.get('name'),
+                'info': item.get('info')
+            }
+            for item in items
+        }
+
+        return {
+            'statusCode': 200,
+            'artists': artists,
+            'not_found': [artist_id for artist_id in artist_ids if artist_id not in artists]
+        }
+
+    except Exception as e:
+        # Manejo de errores
+        print(f"Error en Lambda: {e}")
+        return {
+            'statusCode': 500,
+            'message': 'Error interno del servidor',
+            'error': str(e)
+        }
@@ -1,19 +1,8 @@
-import boto3
-import json
-import os
-from boto3.dynamodb.conditions import Key
-
-# Cliente de DynamoDB
-dynamodb = boto3.resource('dynamodb')
-
-# Obtener los nombres de las tablas desde las variables de entorno
-ARTIST_TABLE = os.environ['TABLE_NAME_ARTISTS']
-TOKENS_TABLE = os.environ['TABLE_NAME_TOKENS']
-
-# Inicializar las tablas
-artists_table = dynamodb.Table(ARTIST_TABLE)
-tokens_table = dynamodb.Table(TOKENS_TABLE)
+import cache
+import runtime
+from etag_utils import VERSION_FIELDS, etag_matches, if_none_match, item_etag, not_modified
 
+@runtime.handler('TABLE_NAME_ARTISTS')
 def lambda_handler(event, context):
     try:
         # Obtener los datos del evento
@@ -27,25 +16,31 @@ def lambda_handler(event, context):
                 'message': 'Falta el parámetro artist_id'
             }
 
-       
-        dynamo_response = artists_table.query(
-            KeyConditionExpression=Key('artist_id').eq(artist_id)
-        )
+        # Perfiles desde la cache de lectura (o directo de storage si está desactivada)
+        artists = cache.artists()
+
+        # Si el cliente envía If-None-Match, comprobar primero la versión con una
+        # lectura proyectada y responder 304 sin leer el perfil completo
+        tags = if_none_match(event)
+        if tags:
+            current = artists.get(artist_id, fields=VERSION_FIELDS)
+            if current and etag_matches(tags, item_etag(current)):
+                return not_modified(item_etag(current))
 
-        items = dynamo_response.get('Items', [])
-        if not items:
+        user = artists.get(artist_id)
+        if not user:
             return {
                 "statusCode": 404,
                 "message": "Usuario no encontrado"
             }
 
         # Retornar información del usuario
-        user = items[0]
         return {
             "statusCode": 200,
             "photo": user.get("photo"),
             "name": user.get("name"),
-            "info":user.get("info")
+            "info":user.get("info"),
+            "etag": item_etag(user)
         }
 
     except Exception as e:
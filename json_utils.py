@@ -0,0 +1,11 @@
+from decimal import Decimal
+
+
+# 'default' de json.dumps para los items de DynamoDB: los números llegan como
+# Decimal y los conjuntos (SS, NS) como set
+def json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, set):
+        return sorted(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
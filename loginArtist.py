@@ -1,15 +1,17 @@
-import boto3
 import hashlib
 import uuid
-import json
-import os
 
 from datetime import datetime, timedelta
 
+import runtime
+import storage
+from token_utils import enforce_session_cap, new_access_token, token_ttl
+
 # Hashear contraseña
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
+@runtime.handler('TABLE_NAME_ARTISTS', 'TABLE_NAME_TOKENS')
 def lambda_handler(event, context):
     
     body = event.get('body', {})  # Deserializamos el body si es un string JSON
@@ -18,52 +20,46 @@ def lambda_handler(event, context):
     password = body['password']
     hashed_password = hash_password(password)
 
-    dynamodb = boto3.resource('dynamodb')
-
-
-    
-    table_name = os.environ['TABLE_NAME_ARTISTS']
     # Obtener usuario de la tabla `Pt_users`
-    table_users = dynamodb.Table(table_name)
-    response = table_users.get_item(Key={'artist_id': artist_id})
+    artist = storage.artists().get(artist_id, fields=['password'])
     
-    if 'Item' not in response:
+    if not artist:
         return {
             'statusCode': 403,
             'body': 'Usuario no existe'
         }
 
-    hashed_password_bd = response['Item']['password']
+    hashed_password_bd = artist['password']
     if hashed_password != hashed_password_bd:
         return {
             'statusCode': 403,
             'body': 'Password incorrecto'
         }
 
-    # Generar Token (expira en 60 minutos)
-    token = str(uuid.uuid4())  # Aquí renombramos `access_token` a `token`
-    token_expiry = datetime.now() + timedelta(minutes=60)
+    # Generar Token (expira en 60 minutos). En modo 'signed' el token es firmado
+    # y en la tabla se guarda su jti como Sort Key.
+    token, token_key, token_expiry = new_access_token(artist_id)
 
     # Generar Refresh Token (expira en 30 días)
     refresh_token = str(uuid.uuid4())
     refresh_token_expiry = datetime.now() + timedelta(days=30)
 
-
-    
-    table_name = os.environ['TABLE_NAME_TOKENS']
-
     # Guardar tokens en DynamoDB
-    table_tokens = dynamodb.Table(table_name)
+    tokens = storage.tokens()
+
+    # Limitar las sesiones vivas del artista expulsando las más antiguas
+    enforce_session_cap(tokens, artist_id)
 
     # Registro de Token y Refresh Token
     token_record = {
         'artist_id': artist_id,       # Clave de partición
-        'token': token,               # Clave de clasificación (Sort Key)
+        'token': token_key,           # Clave de clasificación (Sort Key)
         'token_expiry': token_expiry.isoformat(),
         'refresh_token': refresh_token,
-        'refresh_token_expiry': refresh_token_expiry.isoformat()
+        'refresh_token_expiry': refresh_token_expiry.isoformat(),
+        'expires_at': token_ttl(refresh_token_expiry.isoformat())  # Atributo TTL de DynamoDB
     }
-    table_tokens.put_item(Item=token_record)
+    tokens.put(token_record)
 
     return {
         'statusCode': 200,
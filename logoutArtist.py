@@ -0,0 +1,44 @@
+import runtime
+import storage
+from token_utils import authorize_request, end_session
+
+# Cierra la sesión del token de la petición: su Refresh Token deja de servir y, si
+# es un token firmado, queda revocado hasta su expiración
+@runtime.handler('TABLE_NAME_TOKENS')
+def lambda_handler(event, context):
+    try:
+        # Obtener encabezados de la solicitud de manera segura
+        headers = event.get('headers', {})
+        token = headers.get('Authorization')
+
+        if not token:
+            return {
+                'statusCode': 400,
+                'message': 'Falta el encabezado Authorization'
+            }
+
+        tokens = storage.tokens()
+
+        # Validar el token y obtener el artist_id autorizado (authorizer de API Gateway o en proceso)
+        artist_id, auth_error = authorize_request(event, tokens, token)
+        if auth_error:
+            return auth_error
+
+        if not end_session(tokens, artist_id, token):
+            return {
+                'statusCode': 403,
+                'message': 'Forbidden - Acceso No Autorizado'
+            }
+
+        return {
+            'statusCode': 200,
+            'message': 'Sesión cerrada correctamente.'
+        }
+
+    except Exception as e:
+        # Manejo de errores
+        print(f"Error al cerrar la sesión: {e}")
+        return {
+            'statusCode': 500,
+            'message': 'Error interno del servidor.'
+        }
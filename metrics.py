@@ -0,0 +1,218 @@
+import contextlib
+import json
+import os
+import random
+import threading
+import time
+
+# Instrumentación de los handlers. Cada invocación mide sus fases (autenticación,
+# cada llamada a DynamoDB, serialización) y la capacidad consumida, y al terminar
+# escribe una línea en CloudWatch Embedded Metric Format: CloudWatch extrae las
+# métricas del log sin llamadas a PutMetricData.
+NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'api-artists')
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Con false se miden las peticiones sin escribir la línea EMF: el harness de
+# benchmarks lee los contadores de cada petición con last()
+METRICS_EMF = os.environ.get('METRICS_EMF', 'true').lower() == 'true'
+
+# Fracción de peticiones que además registran el evento completo, las fases y el
+# tamaño de la respuesta. El resto solo paga la línea de métricas.
+DEBUG_SAMPLE_RATE = float(os.environ.get('METRICS_DEBUG_SAMPLE_RATE', '0.01'))
+
+UNITS = {
+    'LatencyMs': 'Milliseconds',
+    'DynamoDBMs': 'Milliseconds',
+    'AuthMs': 'Milliseconds',
+    'SerializeMs': 'Milliseconds',
+    'DynamoDBCalls': 'Count',
+    'ConsumedRCU': 'Count',
+    'ConsumedWCU': 'Count',
+    'ResponseBytes': 'Bytes',
+    'CacheHits': 'Count',
+    'SharedCacheHits': 'Count',
+    'CacheMisses': 'Count',
+    'CacheEvictions': 'Count'
+}
+
+READ_OPERATIONS = ('GetItem', 'BatchGetItem', 'Query', 'Scan', 'TransactGetItems')
+
+# Campos del evento que nunca se escriben en el log de depuración
+SENSITIVE_KEYS = ('password', 'current_password', 'new_password', 'token', 'refresh_token', 'authorization')
+
+# Petición en curso (una por hilo)
+_current = threading.local()
+
+
+class Recorder:
+    def __init__(self, name, sampled):
+        self.name = name
+        self.sampled = sampled
+        self.phases = {}
+        self.dynamodb_calls = 0
+        self.rcu = 0.0
+        self.wcu = 0.0
+        self.status_code = None
+        self.response_bytes = None
+        self.counters = {}
+        # Las consultas en paralelo registran desde varios hilos
+        self.lock = threading.Lock()
+
+    def add(self, phase, elapsed_ms):
+        with self.lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + elapsed_ms
+
+    def count(self, metric, value):
+        with self.lock:
+            self.counters[metric] = self.counters.get(metric, 0) + value
+
+    # Registra la respuesta. En las peticiones muestreadas también mide cuánto
+    # cuesta serializarla y su tamaño.
+    def finish(self, response):
+        if isinstance(response, dict):
+            self.status_code = response.get('statusCode')
+        if self.sampled:
+            start = time.perf_counter()
+            self.response_bytes = len(json.dumps(response, default=str).encode('utf-8'))
+            self.add('serialize', (time.perf_counter() - start) * 1000)
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {
+            key: '***' if str(key).lower() in SENSITIVE_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def current():
+    return getattr(_current, 'recorder', None)
+
+
+# Última petición terminada en el hilo actual
+def last():
+    return getattr(_current, 'last', None)
+
+
+# Asocia el hilo actual a la petición 'recorder', para que las llamadas hechas
+# desde un pool de hilos se cuenten en la petición que las originó
+@contextlib.contextmanager
+def attach(recorder):
+    previous = current()
+    _current.recorder = recorder
+    try:
+        yield
+    finally:
+        _current.recorder = previous
+
+
+# Mide una fase de la petición en curso; fuera de una petición no hace nada
+@contextlib.contextmanager
+def phase(name):
+    recorder = current()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if recorder:
+            recorder.add(name, (time.perf_counter() - start) * 1000)
+
+
+# Suma 'value' al contador 'metric' (ver UNITS) de la petición en curso
+def count(metric, value=1):
+    recorder = current()
+    if recorder:
+        recorder.count(metric, value)
+
+
+# Envuelve una invocación de 'name' y emite sus métricas al terminar
+@contextlib.contextmanager
+def request(name, event):
+    if not METRICS_ENABLED:
+        yield None
+        return
+
+    recorder = Recorder(name, random.random() < DEBUG_SAMPLE_RATE)
+    if recorder.sampled:
+        print(json.dumps({'debug': name, 'event': redact(event)}, default=str))
+
+    _current.recorder = recorder
+    start = time.perf_counter()
+    try:
+        yield recorder
+    finally:
+        _current.recorder = None
+        _current.last = recorder
+        if METRICS_EMF:
+            emit(recorder, (time.perf_counter() - start) * 1000)
+
+
+def emit(recorder, latency_ms):
+    values = {
+        'LatencyMs': round(latency_ms, 2),
+        'DynamoDBMs': round(sum(ms for name, ms in recorder.phases.items() if name.startswith('dynamodb.')), 2),
+        'DynamoDBCalls': recorder.dynamodb_calls,
+        'ConsumedRCU': recorder.rcu,
+        'ConsumedWCU': recorder.wcu
+    }
+    if 'auth' in recorder.phases:
+        values['AuthMs'] = round(recorder.phases['auth'], 2)
+    if 'serialize' in recorder.phases:
+        values['SerializeMs'] = round(recorder.phases['serialize'], 2)
+        values['ResponseBytes'] = recorder.response_bytes
+    values.update(recorder.counters)
+
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': NAMESPACE,
+                'Dimensions': [['Function']],
+                'Metrics': [{'Name': metric, 'Unit': UNITS[metric]} for metric in values]
+            }]
+        },
+        'Function': recorder.name,
+        'StatusCode': recorder.status_code,
+        'phases': {name: round(ms, 2) for name, ms in recorder.phases.items()},
+        **values
+    }))
+
+
+# Hooks de botocore: cada llamada a DynamoDB pide su capacidad consumida y se
+# registra como fase "dynamodb.<Operación>" de la petición en curso
+def _request_capacity(params, model, **kwargs):
+    if current() and 'ReturnConsumedCapacity' in model.input_shape.members:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+
+def _before_call(context, **kwargs):
+    context['metrics_start'] = time.perf_counter()
+
+
+def _after_call(parsed, model, context, **kwargs):
+    recorder = current()
+    if not recorder or 'metrics_start' not in context:
+        return
+
+    recorder.add(f"dynamodb.{model.name}", (time.perf_counter() - context['metrics_start']) * 1000)
+
+    consumed = parsed.get('ConsumedCapacity') or []
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    with recorder.lock:
+        recorder.dynamodb_calls += 1
+        for capacity in consumed:
+            if model.name in READ_OPERATIONS:
+                recorder.rcu += capacity.get('CapacityUnits', 0)
+            else:
+                recorder.wcu += capacity.get('CapacityUnits', 0)
+
+
+def install(client):
+    events = client.meta.events
+    events.register('provide-client-params.dynamodb.*', _request_capacity)
+    events.register('before-call.dynamodb.*', _before_call)
+    events.register('after-call.dynamodb.*', _after_call)
@@ -0,0 +1,388 @@
+# Servidor HTTP de un solo proceso con todos los handlers (modo monolito).
+#
+# Sirve las rutas http declaradas en serverless.yml desde un proceso de larga
+# duración, para staging on-prem y pruebas de carga sin el overhead de invocar un
+# Lambda por petición. Reproduce lo que hace API Gateway con integration: lambda:
+# - arma el evento con el request template de la ruta (o con el template por
+#   defecto de Serverless si no declara uno)
+# - en las rutas con authorizer ejecuta ValidateToken_A.authorizer_handler en
+#   proceso, con la misma cache por Authorization y X-Artist-Id y el mismo TTL
+# - responde 200 con la respuesta del handler como cuerpo JSON (el statusCode va
+#   dentro) y copia los encabezados mapeados, p. ej. ETag; las respuestas 304 de
+#   los endpoints con ETag salen como HTTP 304 sin cuerpo, como con su template
+#
+# Las peticiones se atienden en un pool de hilos; cada hilo usa su propio recurso
+# de DynamoDB de runtime.py. Las variables de provider.environment se toman de
+# serverless.yml salvo que ya estén definidas:
+#
+#   python monolith.py --stage dev --port 8080 --workers 32
+#   STORAGE_BACKEND=sqlite python monolith.py --workers 16
+import argparse
+import importlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import yaml
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Respuestas de API Gateway cuando la petición no llega al handler
+NOT_FOUND = {'message': 'Missing Authentication Token'}
+UNAUTHORIZED = {'message': 'Unauthorized'}
+FORBIDDEN = {'message': 'User is not authorized to access this resource'}
+INVALID_BODY = {'message': 'Could not parse request body into json'}
+INTERNAL_ERROR = {'message': 'Internal server error'}
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'OPTIONS,GET,POST,PUT,PATCH,DELETE',
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,'
+                                    'X-Amz-Security-Token,X-Amz-User-Agent,If-None-Match,X-Artist-Id'
+}
+
+VARIABLE = re.compile(r"\$\{([^{}]+)\}")
+
+# Subconjunto de Velocity que usan los templates de serverless.yml
+TEMPLATE_EXPRESSION = re.compile(
+    r"\$util\.escapeJavaScript\(\$input\.params\('([^']*)'\)\)"
+    r"|\$input\.params\('([^']*)'\)"
+    r"|\$input\.json\('\$'\)"
+    r"|\$context\.authorizer\.(\w+)"
+    r"|\$context\.(\w+)"
+)
+
+
+# Resuelve las variables ${self:...}, ${sls:stage} y ${param:x, defecto} de serverless.yml
+def resolve(value, config, stage):
+    if isinstance(value, dict):
+        return {key: resolve(item, config, stage) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve(item, config, stage) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    def lookup(expression):
+        source, _, rest = expression.partition(':')
+        if source == 'sls' and rest == 'stage':
+            return stage
+        if source == 'self':
+            node = config
+            for part in rest.split('.'):
+                node = node[part]
+            return resolve(node, config, stage)
+        if source == 'param':
+            _, _, default = rest.partition(',')
+            return default.strip().strip("'\"")
+        raise ValueError(f"Variable no soportada: ${{{expression}}}")
+
+    # Una variable que ocupa todo el valor conserva su tipo (p. ej. un objeto de custom)
+    match = VARIABLE.fullmatch(value)
+    if match:
+        return lookup(match.group(1))
+    return VARIABLE.sub(lambda match: str(lookup(match.group(1))), value)
+
+
+class Route:
+    def __init__(self, function_name, handler_path, http):
+        self.function_name = function_name
+        self.handler_path = handler_path
+        self.method = http['method'].upper()
+        self.path = '/' + http['path'].strip('/')
+        self.authorizer = http.get('authorizer')
+        self.cors = bool(http.get('cors'))
+        self.template = ((http.get('request') or {}).get('template') or {}).get('application/json')
+        response = http.get('response') or {}
+        self.response_headers = response.get('headers') or {}
+        # El template de respuesta pasa a HTTP 304 las respuestas de not_modified
+        self.not_modified = 'responseOverride.status = 304' in (response.get('template') or '')
+        self.handler = None
+
+
+def load_routes(config, stage):
+    routes = {}
+    for function_name, function in (config.get('functions') or {}).items():
+        for event in function.get('events') or []:
+            if 'http' not in event:
+                continue
+            route = Route(function_name, function['handler'], resolve(event['http'], config, stage))
+            routes[(route.method, route.path)] = route
+    return routes
+
+
+def load_handler(path):
+    module_name, attr = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), attr)
+
+
+# Cache del authorizer por identidad (encabezados de identitySource), como la que
+# mantiene API Gateway durante resultTtlInSeconds
+class AuthorizerCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            self.entries.pop(key, None)
+            return None
+
+    def put(self, key, policy):
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, policy)
+
+
+class Monolith:
+    def __init__(self, config, stage):
+        self.stage = stage
+        self.routes = load_routes(config, stage)
+        self.authorizers = {}
+
+    # Importa los handlers (después de configurar el entorno) y hace el warm-up de
+    # todas las tablas que usan
+    def load(self):
+        import runtime
+
+        env_tables = set()
+        for route in self.routes.values():
+            route.handler = load_handler(route.handler_path)
+            env_tables.update(getattr(route.handler, 'env_tables', ()))
+            if route.authorizer:
+                name = route.authorizer['name']
+                if name not in self.authorizers:
+                    self.authorizers[name] = (
+                        route.authorizer,
+                        AuthorizerCache(int(route.authorizer.get('resultTtlInSeconds') or 0))
+                    )
+        return runtime.warm_up(sorted(env_tables))
+
+    def authorize(self, route, headers):
+        settings, cache = self.authorizers[route.authorizer['name']]
+        identity = tuple(
+            headers.get(source.split('.')[-1].lower(), '')
+            for source in settings['identitySource'].split(',')
+        )
+        # API Gateway rechaza sin invocar al authorizer si falta la identidad
+        if not all(identity):
+            return None, UNAUTHORIZED
+
+        policy = cache.get(identity)
+        if policy is None:
+            authorizer = load_handler('ValidateToken_A.authorizer_handler')
+            event = {
+                'type': 'REQUEST',
+                'methodArn': f"arn:aws:execute-api:local:000000000000:monolith/{self.stage}/{route.method}{route.path}",
+                'headers': headers
+            }
+            try:
+                policy = authorizer(event, None)
+            except Exception:
+                return None, UNAUTHORIZED
+            cache.put(identity, policy)
+
+        if policy['policyDocument']['Statement'][0]['Effect'] != 'Allow':
+            return None, FORBIDDEN
+        return policy, None
+
+    def build_event(self, route, headers, query, raw_body, policy):
+        context = {
+            'httpMethod': route.method,
+            'path': f"/{self.stage}{route.path}",
+            'resourcePath': route.path,
+            'stage': self.stage,
+            'requestId': str(uuid.uuid4())
+        }
+        authorizer_context = (policy or {}).get('context') or {}
+        body_text = raw_body.strip() or '{}'
+
+        if route.template:
+            def render(match):
+                escaped_param, param, authorizer_key, context_key = match.groups()
+                # $input.json('$') vuelve a serializar el body: un cuerpo como
+                # '{...}, "auth": {...}' no puede agregar claves al evento
+                if match.group(0) == "$input.json('$')":
+                    return json.dumps(json.loads(body_text))
+                if authorizer_key:
+                    value = authorizer_context.get(authorizer_key, '')
+                elif context_key:
+                    value = context.get(context_key, '')
+                else:
+                    name = escaped_param if escaped_param is not None else param
+                    value = headers.get(name.lower(), query.get(name, ''))
+                return json.dumps(str(value))[1:-1]
+
+            return json.loads(TEMPLATE_EXPRESSION.sub(render, route.template))
+
+        # Template por defecto de Serverless para integration: lambda
+        return {
+            'body': json.loads(body_text),
+            'method': route.method,
+            'principalId': (policy or {}).get('principalId', ''),
+            'stage': self.stage,
+            'enhancedAuthContext': authorizer_context,
+            'headers': headers,
+            'query': query,
+            'path': {},
+            'identity': {},
+            'stageVariables': {},
+            'requestPath': route.path
+        }
+
+    # Devuelve (estado HTTP, cuerpo, encabezados)
+    def dispatch(self, method, raw_path, headers, raw_body):
+        url = urlsplit(raw_path)
+        route = self.routes.get((method, '/' + url.path.strip('/')))
+        if route is None:
+            return 403, NOT_FOUND, {}
+
+        extra_headers = dict(CORS_HEADERS) if route.cors else {}
+        policy = None
+        if route.authorizer:
+            policy, error = self.authorize(route, headers)
+            if error:
+                return (401 if error is UNAUTHORIZED else 403), error, extra_headers
+
+        try:
+            event = self.build_event(route, headers, dict(parse_qsl(url.query)), raw_body, policy)
+        except ValueError:
+            return 400, INVALID_BODY, extra_headers
+
+        try:
+            response = route.handler(event, None)
+        except Exception as e:
+            print(f"Error en {route.function_name}: {e}")
+            return 502, INTERNAL_ERROR, extra_headers
+
+        for header, mapping in route.response_headers.items():
+            source = mapping.rpartition('.')[2]
+            if isinstance(response, dict) and response.get(source) is not None:
+                extra_headers[header] = str(response[source])
+        if route.not_modified and isinstance(response, dict) and response.get('statusCode') == 304:
+            return 304, None, extra_headers
+        return 200, response, extra_headers
+
+    def cors_preflight(self, raw_path):
+        path = '/' + urlsplit(raw_path).path.strip('/')
+        return any(route.cors and route.path == path for route in self.routes.values())
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    monolith = None
+
+    def _send(self, status, body, headers):
+        # Las respuestas 304 no llevan cuerpo
+        payload = json.dumps(body, default=str).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length).decode('utf-8') if length else ''
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        status, body, extra_headers = self.monolith.dispatch(self.command, self.path, headers, raw_body)
+        self._send(status, body, extra_headers)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    def do_OPTIONS(self):
+        if self.monolith.cors_preflight(self.path):
+            self._send(200, {}, CORS_HEADERS)
+        else:
+            self._send(403, NOT_FOUND, {})
+
+    # El log de acceso de http.server escribe en stderr por cada petición
+    def log_message(self, format, *args):
+        pass
+
+
+# HTTPServer que atiende cada conexión en un pool de hilos de tamaño fijo, en lugar
+# de crear un hilo por conexión como ThreadingHTTPServer. Con keep-alive una
+# conexión ocupa su hilo hasta cerrarse.
+class PooledHTTPServer(HTTPServer):
+    request_queue_size = 128
+
+    def __init__(self, address, handler_class, workers):
+        super().__init__(address, handler_class)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def configure_environment(config, stage):
+    environment = resolve((config.get('provider') or {}).get('environment') or {}, config, stage)
+    for name, value in environment.items():
+        # Las funciones de CloudFormation (Fn::If de los índices) no se resuelven
+        # localmente: se usa el valor por defecto del código, el del último paso
+        if isinstance(value, dict):
+            continue
+        os.environ.setdefault(name, str(value))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor HTTP con todos los handlers en un proceso')
+    parser.add_argument('--config', default=os.path.join(ROOT, 'serverless.yml'))
+    parser.add_argument('--stage', default='dev')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=16, help='Hilos que atienden peticiones')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    # El entorno tiene que estar listo antes de importar los handlers
+    configure_environment(config, args.stage)
+    sys.path.insert(0, ROOT)
+
+    monolith = Monolith(config, args.stage)
+    init_ms = monolith.load()
+    RequestHandler.monolith = monolith
+
+    server = PooledHTTPServer((args.host, args.port), RequestHandler, args.workers)
+    print(f"{len(monolith.routes)} rutas en http://{args.host}:{args.port} "
+          f"({args.workers} hilos, warm-up {init_ms} ms)")
+    for method, path in sorted(monolith.routes, key=lambda key: (key[1], key[0])):
+        print(f"  {method:6} {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
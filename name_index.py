@@ -0,0 +1,99 @@
+from boto3.dynamodb.conditions import Key
+
+# Índice de búsqueda por subcadena sobre los nombres de artistas. Cada nombre
+# normalizado se parte en trigramas y por cada trigrama se guarda un registro
+# (gram, artist_id, name) en una tabla dedicada. Buscar es recorrer los registros
+# de un trigrama de la búsqueda, sin leer la tabla de artistas completa.
+NGRAM_SIZE = 3
+
+
+def normalize_name(name):
+    return name.strip().lower()
+
+
+def name_grams(name):
+    name = normalize_name(name)
+    return {name[i:i + NGRAM_SIZE] for i in range(len(name) - NGRAM_SIZE + 1)}
+
+
+# Actualiza los registros del índice cuando un artista se registra o cambia de nombre
+def update_name_index(ngram_table, artist_id, old_name, new_name):
+    old_grams = name_grams(old_name) if old_name else set()
+    new_grams = name_grams(new_name) if new_name else set()
+
+    with ngram_table.batch_writer() as batch:
+        for gram in old_grams - new_grams:
+            batch.delete_item(Key={'gram': gram, 'artist_id': artist_id})
+
+        # Los trigramas que se mantienen también se reescriben porque guardan el nombre
+        for gram in new_grams:
+            batch.put_item(Item={
+                'gram': gram,
+                'artist_id': artist_id,
+                'name': normalize_name(new_name)
+            })
+
+
+# Registros que se leen por página de un trigrama y páginas como máximo por trigrama
+POSTINGS_PAGE_SIZE = 200
+MAX_POSTING_PAGES = 5
+
+
+# Lee los registros de un trigrama página por página, en orden de artist_id (la
+# clave de ordenación de la tabla)
+class _Postings:
+    def __init__(self, ngram_table, gram):
+        self.table = ngram_table
+        self.query_args = {
+            'KeyConditionExpression': Key('gram').eq(gram),
+            'ProjectionExpression': 'artist_id, #name',
+            'ExpressionAttributeNames': {'#name': 'name'},
+            'Limit': POSTINGS_PAGE_SIZE
+        }
+        self.pages = 0
+        self.done = False
+        self.matches = []
+
+    # Lee la página siguiente y guarda los artistas cuyo nombre contiene 'query'
+    def read_page(self, query):
+        response = self.table.query(**self.query_args)
+        self.pages += 1
+        for item in response.get('Items', []):
+            if query in item['name']:
+                self.matches.append(item['artist_id'])
+        if 'LastEvaluatedKey' in response:
+            self.query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        else:
+            self.done = True
+
+
+# Devuelve los artist_id cuyo nombre contiene 'query', ordenados y hasta 'limit'.
+# Las búsquedas más cortas que un trigrama no se pueden resolver con el índice.
+#
+# Cada registro guarda el nombre completo, así que basta con recorrer los registros
+# de un solo trigrama y confirmar la subcadena: todo resultado contiene todos los
+# trigramas de la búsqueda. No se sabe de antemano cuál es el menos frecuente, por
+# eso se lee una página de cada uno por turno y se para en cuanto:
+# - un trigrama se termina: sus coincidencias son el resultado completo
+# - un trigrama junta 'limit' coincidencias: como se leen en orden de artist_id,
+#   son las primeras 'limit' del resultado
+# El costo queda acotado por el trigrama menos frecuente y por MAX_POSTING_PAGES:
+# si ningún trigrama se resuelve dentro del límite, se devuelven las coincidencias
+# encontradas hasta ahí (todas válidas, aunque puede faltar alguna).
+def search_names(ngram_table, query, limit):
+    query = normalize_name(query)
+    grams = sorted(name_grams(query))
+    if not grams:
+        return []
+
+    readers = [_Postings(ngram_table, gram) for gram in grams]
+    for _ in range(MAX_POSTING_PAGES):
+        for reader in readers:
+            reader.read_page(query)
+            if reader.done or len(reader.matches) >= limit:
+                return reader.matches[:limit]
+
+    found = set()
+    for reader in readers:
+        found.update(reader.matches)
+    return sorted(found)[:limit]
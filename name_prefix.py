@@ -0,0 +1,51 @@
+from boto3.dynamodb.conditions import Key
+
+from name_index import normalize_name
+
+# Índice de autocompletado sobre los nombres de artistas. Cada artista tiene un
+# registro en una tabla dedicada con clave de partición 'bucket' (los primeros
+# PREFIX_BUCKET_SIZE caracteres del nombre) y clave de ordenación
+# "<nombre>#<artist_id>". Sugerir es una sola consulta begins_with sobre el bucket
+# del prefijo con Limit: lee como mucho 'limit' registros sin importar cuántos
+# artistas haya.
+PREFIX_BUCKET_SIZE = 2
+
+
+def prefix_bucket(name):
+    return normalize_name(name)[:PREFIX_BUCKET_SIZE]
+
+
+def prefix_sort_key(name, artist_id):
+    return f"{normalize_name(name)}#{artist_id}"
+
+
+# Actualiza el registro del artista cuando se registra o cambia de nombre
+def update_prefix_index(prefix_table, artist_id, old_name, new_name):
+    if old_name and normalize_name(old_name) != normalize_name(new_name or ''):
+        prefix_table.delete_item(Key={
+            'bucket': prefix_bucket(old_name),
+            'sort_key': prefix_sort_key(old_name, artist_id)
+        })
+    if new_name:
+        prefix_table.put_item(Item={
+            'bucket': prefix_bucket(new_name),
+            'sort_key': prefix_sort_key(new_name, artist_id),
+            'name': normalize_name(new_name),
+            'artist_id': artist_id
+        })
+
+
+# Hasta 'limit' artistas cuyo nombre empieza con 'prefix', ordenados por nombre.
+# Los prefijos más cortos que un bucket no se pueden resolver con una consulta.
+def suggest_names(prefix_table, prefix, limit):
+    prefix = normalize_name(prefix)
+    if len(prefix) < PREFIX_BUCKET_SIZE:
+        return []
+
+    response = prefix_table.query(
+        KeyConditionExpression=Key('bucket').eq(prefix_bucket(prefix)) & Key('sort_key').begins_with(prefix),
+        ProjectionExpression='artist_id, #name',
+        ExpressionAttributeNames={'#name': 'name'},
+        Limit=limit
+    )
+    return [{'name': item['name'], 'artist_id': item['artist_id']} for item in response.get('Items', [])]
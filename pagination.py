@@ -0,0 +1,49 @@
+import base64
+import json
+import os
+from decimal import Decimal
+
+from json_utils import json_default
+
+# Tamaño de página por defecto y máximo permitido en el servidor
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '100'))
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+# Convierte un LastEvaluatedKey de DynamoDB en un cursor opaco para el cliente
+def encode_cursor(last_evaluated_key):
+    if not last_evaluated_key:
+        return None
+    data = json.dumps(last_evaluated_key, separators=(',', ':'), default=json_default)
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+# Convierte el cursor recibido en el ExclusiveStartKey de la siguiente consulta
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        data = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        key = json.loads(data, parse_float=Decimal)
+    except (ValueError, UnicodeError):
+        raise InvalidPageRequest('Cursor inválido')
+    if not isinstance(key, dict):
+        raise InvalidPageRequest('Cursor inválido')
+    return key
+
+
+# Lee 'limit' del request y lo acota al máximo del servidor
+def page_size(limit):
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise InvalidPageRequest("El parámetro 'limit' debe ser un número")
+    if limit < 1:
+        raise InvalidPageRequest("El parámetro 'limit' debe ser mayor que 0")
+    return min(limit, MAX_PAGE_SIZE)
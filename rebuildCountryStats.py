@@ -0,0 +1,38 @@
+import runtime
+from country_stats import COUNTRY_STATS_KEY
+
+# Recorre la tabla de artistas y recalcula los contadores por país. Se invoca
+# manualmente al habilitar el stream (los artistas anteriores no generaron
+# eventos); acepta 'cursor' y los conteos parciales 'counts' en el evento para
+# continuar si el Lambda se queda sin tiempo. Las escrituras que lleguen durante el
+# recorrido pueden quedar contadas dos veces o ninguna: conviene ejecutarlo con
+# poco tráfico.
+def lambda_handler(event, context):
+    table = runtime.table('TABLE_NAME_ARTISTS')
+    counts = dict(event.get('counts') or {})
+
+    def count_page(items):
+        for item in items:
+            if item.get('country'):
+                counts[item['country']] = counts.get(item['country'], 0) + 1
+
+    fetch_page = runtime.artist_scan(
+        table,
+        ProjectionExpression='#country',
+        ExpressionAttributeNames={'#country': 'country'}
+    )
+    cursor = runtime.resume_pages(fetch_page, count_page, event.get('cursor'), context)
+    if cursor:
+        return {
+            'statusCode': 200,
+            'counts': counts,
+            'cursor': cursor
+        }
+
+    runtime.table('TABLE_NAME_STATS').put_item(Item={**COUNTRY_STATS_KEY, **counts})
+
+    return {
+        'statusCode': 200,
+        'counts': counts,
+        'cursor': None
+    }
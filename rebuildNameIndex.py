@@ -0,0 +1,35 @@
+import runtime
+from name_index import update_name_index
+from name_prefix import update_prefix_index
+
+# Recorre la tabla de artistas y (re)construye los índices de trigramas y de
+# prefijos. Se invoca manualmente al desplegar un índice por primera vez; acepta
+# 'cursor' en el evento para continuar desde la última página procesada si el
+# Lambda se queda sin tiempo.
+def lambda_handler(event, context):
+    table = runtime.table('TABLE_NAME_ARTISTS')
+    ngram_table = runtime.table('TABLE_NAME_NGRAMS')
+    prefix_table = runtime.table('TABLE_NAME_PREFIXES')
+
+    indexed = 0
+
+    def index_page(items):
+        nonlocal indexed
+        for item in items:
+            if item.get('name'):
+                update_name_index(ngram_table, item['artist_id'], None, item['name'])
+                update_prefix_index(prefix_table, item['artist_id'], None, item['name'])
+                indexed += 1
+
+    fetch_page = runtime.artist_scan(
+        table,
+        ProjectionExpression='artist_id, #name',
+        ExpressionAttributeNames={'#name': 'name'}
+    )
+    cursor = runtime.resume_pages(fetch_page, index_page, event.get('cursor'), context)
+
+    return {
+        'statusCode': 200,
+        'indexed': indexed,
+        'cursor': cursor
+    }
@@ -0,0 +1,36 @@
+import runtime
+import storage
+from token_utils import rotate_tokens, token_key_for
+
+# Renueva la sesión de un artista: recibe el Access Token (normalmente expirado) y
+# el Refresh Token, y devuelve un nuevo par de tokens como el login
+@runtime.handler('TABLE_NAME_TOKENS')
+def lambda_handler(event, context):
+    try:
+        body = event.get('body', {})
+
+        artist_id = body.get('artist_id')
+        token = body.get('token')
+        refresh_token = body.get('refresh_token')
+
+        if not artist_id or not token or not refresh_token:
+            return {
+                'statusCode': 400,
+                'body': 'Faltan parámetros artist_id, token o refresh_token'
+            }
+
+        token_key = token_key_for(artist_id, token)
+        if not token_key:
+            return {
+                'statusCode': 403,
+                'body': 'Token o Refresh Token inválido'
+            }
+
+        return rotate_tokens(storage.tokens(), artist_id, token_key, refresh_token)
+
+    except Exception as e:
+        print(f"Error al renovar el token: {e}")
+        return {
+            'statusCode': 500,
+            'body': 'Error interno del servidor'
+        }
@@ -1,80 +1,64 @@
-import boto3
-import hashlib
-import json
-import os  # Para acceder a las variables de entorno
-
-# Hashear contraseña
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+import runtime
+import storage
+from artist_utils import build_artist_item
+from cache import invalidate_artist
 
 # Función lambda que maneja el registro de usuario y validación de contraseña
+@runtime.handler('TABLE_NAME_ARTISTS', 'TABLE_NAME_NGRAMS', 'TABLE_NAME_PREFIXES')
 def lambda_handler(event, context):
     try:
-        # Imprimir el evento para depuración
-        print("Received event:", event)
-        # Obtener el nombre de la tabla desde las variables de entorno
-        table_name = os.environ['TABLE_NAME_ARTISTS']
-        print("Using DynamoDB table:", table_name)
-
+        # El evento completo solo se registra en las peticiones muestreadas (metrics.py)
         body = event.get('body', {})
 
-        print("Parsed body:", body)
-        # Extraer los campos necesarios del cuerpo
-        artist_id = body.get('artist_id')
-        password = body.get('password')
-        country = body.get('country')
-        name = body.get('name')
-        info = body.get('info')
-
-        if name:
-            name = name.strip().lower()
-
-        # Verificar que todos los campos necesarios están presentes
-        if not artist_id or not password or not country or not name:
-            mensaje = {'error': 'Invalid request body: missing artist_id, password, country or name'}
+        # Validar y normalizar los campos (país, nombre en minúsculas, hash de la contraseña)
+        artist, error = build_artist_item(body)
+        if error:
+            mensaje = {'error': error}
             return {
                 'statusCode': 400,
                 'body': mensaje  # Convertir el mensaje a JSON
             }
 
-        # Normalizar el país ingresado (convertir a minúsculas y quitar espacios)
-        country_input = country.strip().lower()
+        artist_id = artist['artist_id']
 
-        # Si el país ingresado es vacío o contiene caracteres no válidos, retornar un error
-        if not country_input.isalpha():
-            mensaje = {'error': 'Invalid country, please enter a valid name'}
-            return {'statusCode': 400, 'body': mensaje}
+        # Repositorio de artistas (compartido entre invocaciones)
+        artists = storage.artists()
 
-        # Hashea la contraseña antes de almacenarla
-        hashed_password = hash_password(password)
+        # Clave de idempotencia opcional: un reintento con la misma clave devuelve el
+        # resultado original sin volver a escribir
+        headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+        idempotency_key = headers.get('idempotency-key') or body.get('idempotency_key')
+        if idempotency_key:
+            artist['idempotency_key'] = idempotency_key
 
-        # Conectar a DynamoDB
-        dynamodb = boto3.resource('dynamodb')
-        t_artist = dynamodb.Table(table_name)  # Usar el nombre de la tabla desde el environment variable
+        # Registrar el artista con una sola escritura condicional: si el artist_id ya
+        # existe, DynamoDB rechaza el put y devuelve el registro existente
+        try:
+            artists.create(artist)
+        except storage.ConditionFailed as e:
+            existing_key = (e.item or {}).get('idempotency_key')
+            if idempotency_key and existing_key == idempotency_key:
+                # La petición original pudo fallar después de guardar el artista y antes
+                # de indexar su nombre: se vuelve a indexar (es idempotente)
+                artists.update_name_index(artist_id, None, e.item['name'])
+                invalidate_artist(artist_id, e.item['name'])
+                mensaje = {'message': 'User registered successfully', 'artist_id': artist_id}
+                return {
+                    'statusCode': 200,
+                    'body': mensaje  # Mismo resultado que la petición original
+                }
 
-        # Verificar si el artista ya existe en la base de datos (basado en artist_id)
-        response = t_artist.query(
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('artist_id').eq(artist_id)
-        )
-
-        if response['Items']:
             mensaje = {'error': 'El artista ya está registrado'}
             return {
                 'statusCode': 400,
                 'body': mensaje  # El artista ya existe
             }
 
-        # Si no existe, registrar el nuevo artista
-        t_artist.put_item(
-            Item={
-                'artist_id': artist_id,
-                'password': hashed_password,
-                'country': country_input,
-                'name': name,
-                'info': info,
-                'photo': 'default-url'  # Valor por defecto para la foto
-            }
-        )
+        # Indexar el nombre para la búsqueda por subcadena
+        artists.update_name_index(artist_id, None, artist['name'])
+
+        # Las búsquedas por este nombre pueden estar en cache sin el artista nuevo
+        invalidate_artist(artist_id, artist['name'])
 
         # Retornar un código de estado HTTP 200 (OK) y un mensaje de éxito
         mensaje = {'message': 'User registered successfully', 'artist_id': artist_id}
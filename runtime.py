@@ -0,0 +1,114 @@
+import functools
+import os
+import threading
+import time
+
+import metrics
+
+# Recursos de DynamoDB de los handlers. Se crean en la primera invocación que los
+# necesita (no al importar el módulo) y se reutilizan mientras el contenedor del
+# Lambda siga caliente. Los recursos de boto3 no se comparten entre hilos: cada
+# hilo (el del Lambda, los del pool de country_shards, los de monolith.py) tiene
+# el suyo y sus tablas.
+_local = threading.local()
+
+
+def dynamodb():
+    if not hasattr(_local, 'dynamodb'):
+        import boto3
+        # DYNAMODB_ENDPOINT_URL permite apuntar a un DynamoDB local
+        _local.dynamodb = boto3.resource('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT_URL'))
+        _local.tables = {}
+        # Tiempos y capacidad consumida de cada llamada (ver metrics.py)
+        metrics.install(_local.dynamodb.meta.client)
+    return _local.dynamodb
+
+
+# Devuelve la tabla cuyo nombre está en la variable de entorno 'env_name'
+def table(env_name):
+    table_name = os.environ[env_name]
+    dynamodb()
+    if table_name not in _local.tables:
+        _local.tables[table_name] = _local.dynamodb.Table(table_name)
+    return _local.tables[table_name]
+
+
+# Milisegundos que un recorrido largo deja libres para devolver el cursor antes del
+# timeout del Lambda
+RESUME_MARGIN_MS = 10000
+
+
+# Recorrido reanudable de las tareas de mantenimiento: fetch_page(cursor) devuelve
+# (página, cursor siguiente o None) y handle_page(página) la procesa. Termina al
+# agotar las páginas (devuelve None) o cuando al Lambda le quedan menos de
+# RESUME_MARGIN_MS (devuelve el cursor para continuar en otra invocación).
+def resume_pages(fetch_page, handle_page, cursor, context):
+    while True:
+        page, cursor = fetch_page(cursor)
+        handle_page(page)
+        if not cursor or (context and context.get_remaining_time_in_millis() < RESUME_MARGIN_MS):
+            return cursor
+
+
+# fetch_page de resume_pages para un scan de la tabla de artistas: el cursor es el
+# artist_id del LastEvaluatedKey
+def artist_scan(table, **scan_args):
+    def fetch_page(cursor):
+        page_args = dict(scan_args)
+        if cursor:
+            page_args['ExclusiveStartKey'] = {'artist_id': cursor}
+        response = table.scan(**page_args)
+        last_key = response.get('LastEvaluatedKey')
+        return response.get('Items', []), (last_key['artist_id'] if last_key else None)
+    return fetch_page
+
+
+# Evento de warm-up: {"warmup": true} o el que envía serverless-plugin-warmup
+def is_warmup(event):
+    return isinstance(event, dict) and (event.get('warmup') is True or event.get('source') == 'serverless-plugin-warmup')
+
+
+# Inicializa el recurso y las tablas indicadas. Con connect=True además abre la
+# conexión HTTPS con DynamoDB para que la primera petición real no la pague.
+def warm_up(env_tables, connect=True):
+    start = time.perf_counter()
+
+    # Los backends locales de storage no usan tablas ni conexión con DynamoDB
+    if os.environ.get('STORAGE_BACKEND', 'dynamodb') != 'dynamodb':
+        return 0.0
+
+    for env_name in env_tables:
+        table(env_name)
+
+    if connect:
+        try:
+            dynamodb().meta.client.describe_endpoints()
+        except Exception as e:
+            print(f"Warm-up sin conexión: {e}")
+
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+# Decorador de lambda_handler: responde a los eventos de warm-up inicializando las
+# tablas que usa el handler, sin ejecutar su lógica, y emite las métricas de cada
+# invocación
+def handler(*env_tables):
+    def decorator(fn):
+        name = fn.__module__ if fn.__name__ == 'lambda_handler' else f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(event, context):
+            if is_warmup(event):
+                return {
+                    'statusCode': 200,
+                    'warmup': True,
+                    'init_ms': warm_up(env_tables)
+                }
+            with metrics.request(name, event) as recorder:
+                response = fn(event, context)
+                if recorder:
+                    recorder.finish(response)
+            return response
+        wrapper.env_tables = env_tables
+        return wrapper
+    return decorator
@@ -0,0 +1,200 @@
+import os
+from abc import ABC, abstractmethod
+
+# Capa de almacenamiento de artistas y tokens. Los handlers usan estos repositorios
+# en lugar de las tablas de DynamoDB, así la misma lógica se puede ejecutar y
+# perfilar sin AWS. STORAGE_BACKEND elige la implementación:
+# - 'dynamodb' (por defecto): las tablas de serverless.yml
+# - 'memory': diccionarios en el proceso, para pruebas y benchmarks
+# - 'sqlite': un archivo SQLite (STORAGE_SQLITE_PATH) con índices equivalentes a los GSI
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'dynamodb')
+
+# Repositorios creados en la primera invocación y reutilizados mientras el
+# contenedor siga caliente
+_repositories = {}
+
+
+# Una escritura condicional no se cumplió. 'item' es el registro actual tal como
+# está guardado (None si no existe), para que quien llama decida el error.
+class ConditionFailed(Exception):
+    def __init__(self, item=None):
+        super().__init__('La condición de la escritura no se cumplió')
+        self.item = item
+
+
+# Una transacción se canceló porque otra escritura sobre los mismos registros
+# estaba en curso (TransactionConflict de DynamoDB). Se puede reintentar.
+class TransactionConflict(Exception):
+    def __init__(self):
+        super().__init__('La transacción chocó con otra escritura en curso')
+
+
+# Operaciones sobre la tabla de artistas y sus índices. Los items son diccionarios
+# con los mismos atributos que guarda DynamoDB. Un backend tiene que implementar
+# todos los métodos: si le falta alguno falla al crearlo, no a mitad de una petición.
+class ArtistRepository(ABC):
+    # Devuelve el artista o None. 'fields' limita los atributos leídos.
+    @abstractmethod
+    def get(self, artist_id, fields=None):
+        raise NotImplementedError
+
+    # Lee varios artistas; los que no existen no aparecen en el resultado
+    @abstractmethod
+    def batch_get(self, artist_ids, fields=None):
+        raise NotImplementedError
+
+    # Guarda un artista nuevo. Si el artist_id ya existe lanza ConditionFailed con
+    # el registro existente.
+    @abstractmethod
+    def create(self, item):
+        raise NotImplementedError
+
+    # Guarda artistas sin condiciones (carga masiva de datos)
+    @abstractmethod
+    def put_many(self, items):
+        raise NotImplementedError
+
+    # Actualización parcial: asigna 'changes' e incrementa 'version'. Condiciones:
+    # el artista existe, la contraseña guardada es 'password' (si se indica) y la
+    # versión es 'expected_version' (0 = sin versión). Devuelve el registro anterior
+    # completo; si una condición falla lanza ConditionFailed con el registro actual.
+    @abstractmethod
+    def update(self, artist_id, changes, password=None, expected_version=None):
+        raise NotImplementedError
+
+    # Página de artistas de un país (CountryListIndex). Devuelve (items, last_key):
+    # last_key tiene la forma del LastEvaluatedKey del índice, o es None en la última.
+    # 'fields' limita los atributos leídos sin cambiar los límites de la página.
+    @abstractmethod
+    def by_country(self, country, limit, start_key=None, fields=None):
+        raise NotImplementedError
+
+    # Página de un fragmento de país (CountryShardIndex, ver country_shards.py)
+    @abstractmethod
+    def by_country_shard(self, shard_key, limit, start_key=None, fields=None):
+        raise NotImplementedError
+
+    # Página de artistas de un país ordenados por nombre (CountryNameIndex).
+    # 'name_condition' limita los nombres leídos con una condición sobre la clave
+    # de ordenación: ('begins_with', prefijo), ('between', desde, hasta),
+    # ('gte', desde) o ('lte', hasta). Con descending=True el orden es inverso.
+    @abstractmethod
+    def by_country_name(self, country, limit, start_key=None, fields=None, name_condition=None, descending=False):
+        raise NotImplementedError
+
+    # Página de un fragmento de ChangesIndex ("<fecha>#<n>") con since <= updated_at
+    # <= until, en orden de updated_at (ver artist_changes.py)
+    @abstractmethod
+    def by_change_shard(self, shard_key, limit, since, until, start_key=None, fields=None):
+        raise NotImplementedError
+
+    # Artistas con un nombre exacto (NameListIndex), opcionalmente con un artist_id
+    @abstractmethod
+    def by_name(self, name, artist_id=None, fields=None):
+        raise NotImplementedError
+
+    # Cantidad de artistas por país {country: n}
+    @abstractmethod
+    def country_counts(self):
+        raise NotImplementedError
+
+    # Mantiene los índices de nombres (subcadena y prefijo) cuando cambia un nombre
+    @abstractmethod
+    def update_name_index(self, artist_id, old_name, new_name):
+        raise NotImplementedError
+
+    # artist_id (ordenados, hasta 'limit') cuyo nombre contiene 'query'
+    @abstractmethod
+    def search_names(self, query, limit):
+        raise NotImplementedError
+
+    # Hasta 'limit' {'name', 'artist_id'} cuyo nombre empieza con 'prefix',
+    # ordenados por nombre y artist_id
+    @abstractmethod
+    def suggest_names(self, prefix, limit):
+        raise NotImplementedError
+
+
+# Operaciones sobre la tabla de tokens: sesiones (artist_id, token) y la lista de
+# revocación de tokens firmados
+class TokenRepository(ABC):
+    @abstractmethod
+    def get(self, artist_id, token, consistent=False):
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, item):
+        raise NotImplementedError
+
+    # Sesiones vivas de un artista con 'token', 'token_expiry' y
+    # 'refresh_token_expiry'. Los registros ya renovados ('replaced_by'), que se
+    # conservan solo durante el periodo de gracia, no cuentan como sesiones.
+    @abstractmethod
+    def sessions(self, artist_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, artist_id, tokens):
+        raise NotImplementedError
+
+    # Una página del barrido de sesiones vencidas en 'now' (datetime): según
+    # expires_at o, en los registros anteriores a ese atributo, según
+    # refresh_token_expiry. Devuelve (claves [(artist_id, token)], registros
+    # leídos, capacidad consumida, clave para continuar o None).
+    @abstractmethod
+    def expired_page(self, now, start_key=None):
+        raise NotImplementedError
+
+    # Elimina sesiones de varios artistas a partir de sus claves (artist_id, token)
+    @abstractmethod
+    def delete_many(self, keys):
+        raise NotImplementedError
+
+    # Renovación atómica: marca la sesión (artist_id, token) con replaced_by y
+    # expires_at = grace_expires_at, siempre que no estuviera ya reemplazada y su
+    # Refresh Token sea 'refresh_token', y guarda 'new_item'. Si otra renovación
+    # ganó lanza ConditionFailed; si otra escritura sobre la sesión estaba en curso
+    # lanza TransactionConflict.
+    @abstractmethod
+    def rotate(self, artist_id, token, refresh_token, new_item, grace_expires_at):
+        raise NotImplementedError
+
+    # Entradas "jti:exp" de la lista de revocación
+    @abstractmethod
+    def revoked(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_revoked(self, entries):
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_revoked(self, entries):
+        raise NotImplementedError
+
+
+def _create(kind):
+    if STORAGE_BACKEND == 'memory':
+        import storage_memory as backend
+    elif STORAGE_BACKEND == 'sqlite':
+        import storage_sqlite as backend
+    elif STORAGE_BACKEND == 'dynamodb':
+        import storage_dynamodb as backend
+    else:
+        raise ValueError(f"STORAGE_BACKEND desconocido: {STORAGE_BACKEND}")
+
+    if kind == 'artists':
+        return backend.ArtistStore()
+    return backend.TokenStore()
+
+
+def artists():
+    if 'artists' not in _repositories:
+        _repositories['artists'] = _create('artists')
+    return _repositories['artists']
+
+
+def tokens():
+    if 'tokens' not in _repositories:
+        _repositories['tokens'] = _create('tokens')
+    return _repositories['tokens']
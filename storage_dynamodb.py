@@ -0,0 +1,308 @@
+import os
+
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+import runtime
+from batch_utils import batch_get
+from country_stats import read_counts
+from name_index import search_names, update_name_index
+from name_prefix import suggest_names, update_prefix_index
+from storage import ArtistRepository, ConditionFailed, TokenRepository, TransactionConflict
+
+# Registro de la lista de revocación dentro de la tabla de tokens
+REVOCATION_KEY = {'artist_id': '#revoked', 'token': '#list'}
+
+# Índices de las consultas por país y por nombre. Durante la migración de índices
+# (ver README) serverless.yml apunta a los originales hasta que existen los nuevos.
+COUNTRY_INDEX = os.environ.get('ARTIST_COUNTRY_INDEX', 'CountryListIndex')
+NAME_INDEX = os.environ.get('ARTIST_NAME_INDEX', 'NameListIndex')
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _serialize(item):
+    return {key: _serializer.serialize(value) for key, value in item.items()}
+
+
+# Los errores de condición devuelven el item en formato de bajo nivel
+# (p. ej. {'version': {'N': '3'}})
+def _deserialize(item):
+    if not item:
+        return None
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def _projection(fields):
+    return {
+        'ProjectionExpression': ', '.join(f"#p{i}" for i in range(len(fields))),
+        'ExpressionAttributeNames': {f"#p{i}": name for i, name in enumerate(fields)}
+    }
+
+
+def _is_condition_failure(e):
+    return e.response['Error']['Code'] == 'ConditionalCheckFailedException'
+
+
+# Construye los argumentos de un único update_item condicional:
+# - SET de cada campo más el incremento de 'version'
+# - el artista debe existir
+# - si se indica, la contraseña guardada debe ser 'password'
+# - si se indica expected_version, la versión guardada debe ser esa (0 = sin versión)
+def build_update(artist_id, changes, password=None, expected_version=None):
+    names = {'#version': 'version'}
+    values = {':zero': 0, ':one': 1}
+    assignments = []
+
+    for i, (field, value) in enumerate(sorted(changes.items())):
+        names[f"#f{i}"] = field
+        values[f":v{i}"] = value
+        assignments.append(f"#f{i} = :v{i}")
+    assignments.append("#version = if_not_exists(#version, :zero) + :one")
+
+    conditions = ["attribute_exists(artist_id)"]
+    if password is not None:
+        names['#password'] = 'password'
+        values[':current_password'] = password
+        conditions.append("#password = :current_password")
+    if expected_version is not None:
+        if expected_version == 0:
+            conditions.append("attribute_not_exists(#version)")
+        else:
+            values[':expected_version'] = expected_version
+            conditions.append("#version = :expected_version")
+
+    return {
+        'Key': {'artist_id': artist_id},
+        'UpdateExpression': "SET " + ", ".join(assignments),
+        'ConditionExpression': " AND ".join(conditions),
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values,
+        'ReturnValues': 'ALL_OLD',
+        'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+    }
+
+
+class ArtistStore(ArtistRepository):
+    @property
+    def table(self):
+        return runtime.table('TABLE_NAME_ARTISTS')
+
+    def get(self, artist_id, fields=None):
+        get_args = {'Key': {'artist_id': artist_id}}
+        if fields:
+            get_args.update(_projection(fields))
+        return self.table.get_item(**get_args).get('Item')
+
+    def batch_get(self, artist_ids, fields=None):
+        keys = [{'artist_id': artist_id} for artist_id in artist_ids]
+        return batch_get(runtime.dynamodb(), self.table.name, keys, projection=fields)
+
+    def create(self, item):
+        try:
+            self.table.put_item(
+                Item=item,
+                ConditionExpression='attribute_not_exists(artist_id)',
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+        except ClientError as e:
+            if not _is_condition_failure(e):
+                raise
+            raise ConditionFailed(_deserialize(e.response.get('Item')))
+
+    def put_many(self, items):
+        with self.table.batch_writer() as batch:
+            for item in items:
+                batch.put_item(Item=item)
+
+    def update(self, artist_id, changes, password=None, expected_version=None):
+        try:
+            response = self.table.update_item(**build_update(artist_id, changes, password, expected_version))
+        except ClientError as e:
+            if not _is_condition_failure(e):
+                raise
+            raise ConditionFailed(_deserialize(e.response.get('Item')))
+        return response.get('Attributes', {})
+
+    # Sigue el LastEvaluatedKey hasta completar 'limit' items, por si DynamoDB corta
+    # la página antes por el límite de 1 MB
+    def _query_page(self, index_name, condition, limit, start_key, fields, forward=True):
+        items = []
+        while True:
+            query_args = {
+                'IndexName': index_name,
+                'KeyConditionExpression': condition,
+                'ScanIndexForward': forward,
+                'Limit': limit - len(items)
+            }
+            if fields:
+                query_args.update(_projection(fields))
+            if start_key:
+                query_args['ExclusiveStartKey'] = start_key
+
+            response = self.table.query(**query_args)
+            items.extend(response.get('Items', []))
+            start_key = response.get('LastEvaluatedKey')
+
+            if not start_key or len(items) >= limit:
+                return items, start_key
+
+    def by_country(self, country, limit, start_key=None, fields=None):
+        return self._query_page(COUNTRY_INDEX, Key('country').eq(country), limit, start_key, fields)
+
+    # Cada fragmento se consulta desde un hilo del pool de country_shards; self.table
+    # es la tabla de ese hilo (runtime crea un recurso de boto3 por hilo)
+    def by_country_shard(self, shard_key, limit, start_key=None, fields=None):
+        return self._query_page('CountryShardIndex', Key('country_shard').eq(shard_key), limit, start_key, fields)
+
+    # La condición sobre 'name' es parte del KeyConditionExpression: DynamoDB lee
+    # solo el rango de nombres que coincide, no la partición completa del país
+    def by_country_name(self, country, limit, start_key=None, fields=None, name_condition=None, descending=False):
+        condition = Key('country').eq(country)
+        if name_condition:
+            operator, *values = name_condition
+            condition = condition & getattr(Key('name'), operator)(*values)
+        return self._query_page('CountryNameIndex', condition, limit, start_key, fields, forward=not descending)
+
+    def by_change_shard(self, shard_key, limit, since, until, start_key=None, fields=None):
+        condition = Key('change_shard').eq(shard_key) & Key('updated_at').between(since, until)
+        return self._query_page('ChangesIndex', condition, limit, start_key, fields)
+
+    def by_name(self, name, artist_id=None, fields=None):
+        condition = Key('name').eq(name)
+        if artist_id:
+            condition = condition & Key('artist_id').eq(artist_id)
+        query_args = {'IndexName': NAME_INDEX, 'KeyConditionExpression': condition}
+        if fields:
+            query_args.update(_projection(fields))
+        return self.table.query(**query_args).get('Items', [])
+
+    # Contadores que mantiene el consumidor del stream (countryStats)
+    def country_counts(self):
+        return read_counts(runtime.table('TABLE_NAME_STATS'))
+
+    def update_name_index(self, artist_id, old_name, new_name):
+        update_name_index(runtime.table('TABLE_NAME_NGRAMS'), artist_id, old_name, new_name)
+        update_prefix_index(runtime.table('TABLE_NAME_PREFIXES'), artist_id, old_name, new_name)
+
+    def search_names(self, query, limit):
+        return search_names(runtime.table('TABLE_NAME_NGRAMS'), query, limit)
+
+    def suggest_names(self, prefix, limit):
+        return suggest_names(runtime.table('TABLE_NAME_PREFIXES'), prefix, limit)
+
+
+class TokenStore(TokenRepository):
+    @property
+    def table(self):
+        return runtime.table('TABLE_NAME_TOKENS')
+
+    def get(self, artist_id, token, consistent=False):
+        response = self.table.get_item(Key={'artist_id': artist_id, 'token': token}, ConsistentRead=consistent)
+        return response.get('Item')
+
+    def put(self, item):
+        self.table.put_item(Item=item)
+
+    def sessions(self, artist_id):
+        sessions = []
+        query_args = {
+            'KeyConditionExpression': Key('artist_id').eq(artist_id),
+            'FilterExpression': Attr('replaced_by').not_exists(),
+            'ProjectionExpression': '#token, token_expiry, refresh_token_expiry',
+            'ExpressionAttributeNames': {'#token': 'token'}
+        }
+        while True:
+            response = self.table.query(**query_args)
+            sessions.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return sessions
+            query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def delete(self, artist_id, tokens):
+        with self.table.batch_writer() as batch:
+            for token in tokens:
+                batch.delete_item(Key={'artist_id': artist_id, 'token': token})
+
+    def expired_page(self, now, start_key=None):
+        scan_args = {
+            'FilterExpression': Attr('expires_at').lt(int(now.timestamp())) | (
+                Attr('expires_at').not_exists() & Attr('refresh_token_expiry').lt(now.isoformat())
+            ),
+            'ProjectionExpression': 'artist_id, #token',
+            'ExpressionAttributeNames': {'#token': 'token'},
+            'ReturnConsumedCapacity': 'TOTAL'
+        }
+        if start_key:
+            scan_args['ExclusiveStartKey'] = start_key
+        response = self.table.scan(**scan_args)
+        return (
+            [(item['artist_id'], item['token']) for item in response.get('Items', [])],
+            response.get('ScannedCount', 0),
+            response.get('ConsumedCapacity', {}).get('CapacityUnits', 0),
+            response.get('LastEvaluatedKey')
+        )
+
+    def delete_many(self, keys):
+        with self.table.batch_writer() as batch:
+            for artist_id, token in keys:
+                batch.delete_item(Key={'artist_id': artist_id, 'token': token})
+
+    # Una sola TransactWriteItems: si otra renovación ganó, DynamoDB cancela las dos
+    # escrituras con ConditionalCheckFailed; si otra transacción sobre la misma
+    # sesión todavía está en curso, con TransactionConflict
+    def rotate(self, artist_id, token, refresh_token, new_item, grace_expires_at):
+        table = self.table
+        try:
+            table.meta.client.transact_write_items(TransactItems=[
+                {
+                    'Update': {
+                        'TableName': table.name,
+                        'Key': _serialize({'artist_id': artist_id, 'token': token}),
+                        'UpdateExpression': 'SET replaced_by = :new_key, expires_at = :grace',
+                        'ConditionExpression': 'attribute_not_exists(replaced_by) AND refresh_token = :refresh_token',
+                        'ExpressionAttributeValues': _serialize({
+                            ':new_key': new_item['token'],
+                            ':grace': grace_expires_at,
+                            ':refresh_token': refresh_token
+                        })
+                    }
+                },
+                {
+                    'Put': {
+                        'TableName': table.name,
+                        'Item': _serialize(new_item),
+                        'ConditionExpression': 'attribute_not_exists(#token)',
+                        'ExpressionAttributeNames': {'#token': 'token'}
+                    }
+                }
+            ])
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+            reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+            if 'ConditionalCheckFailed' in reasons:
+                raise ConditionFailed()
+            if 'TransactionConflict' in reasons:
+                raise TransactionConflict()
+            raise
+
+    def revoked(self):
+        response = self.table.get_item(Key=REVOCATION_KEY)
+        return set(response.get('Item', {}).get('jtis', set()))
+
+    def add_revoked(self, entries):
+        self.table.update_item(
+            Key=REVOCATION_KEY,
+            UpdateExpression="ADD jtis :new",
+            ExpressionAttributeValues={':new': set(entries)}
+        )
+
+    def remove_revoked(self, entries):
+        self.table.update_item(
+            Key=REVOCATION_KEY,
+            UpdateExpression="DELETE jtis :expired",
+            ExpressionAttributeValues={':expired': set(entries)}
+        )
@@ -0,0 +1,252 @@
+import copy
+import threading
+
+from name_index import NGRAM_SIZE, normalize_name
+from name_prefix import PREFIX_BUCKET_SIZE
+from storage import ArtistRepository, ConditionFailed, TokenRepository
+
+# Backend en memoria: los datos viven en el proceso y se comparten entre todos los
+# repositorios creados en él. Reproduce la semántica de las tablas de DynamoDB
+# (escrituras condicionales, índices por país y nombre, paginación con
+# LastEvaluatedKey) para ejecutar los handlers sin AWS.
+_artists = {}
+_tokens = {}
+_revoked = set()
+_lock = threading.RLock()
+
+
+# Comprueba las condiciones de una actualización parcial sobre el registro actual
+def check_update(current, password=None, expected_version=None):
+    if current is None:
+        return False
+    if password is not None and current.get('password') != password:
+        return False
+    if expected_version is not None:
+        if expected_version == 0:
+            return 'version' not in current
+        return current.get('version') == expected_version
+    return True
+
+
+# Aplica los cambios y devuelve el registro anterior (como ReturnValues='ALL_OLD')
+def apply_update(current, changes):
+    old = copy.deepcopy(current)
+    current.update(changes)
+    current['version'] = current.get('version', 0) + 1
+    return old
+
+
+def name_matches(name, name_condition):
+    if not name_condition:
+        return True
+    operator, *values = name_condition
+    if operator == 'begins_with':
+        return name.startswith(values[0])
+    if operator == 'between':
+        return values[0] <= name <= values[1]
+    if operator == 'gte':
+        return name >= values[0]
+    return name <= values[0]
+
+
+def project(item, fields):
+    if not fields:
+        return copy.deepcopy(item)
+    return {field: copy.deepcopy(item[field]) for field in fields if field in item}
+
+
+# Busca 'query' en los nombres como el índice de trigramas: las búsquedas más
+# cortas que un trigrama no devuelven resultados
+def matching_names(names, query, limit):
+    query = normalize_name(query)
+    if len(query) < NGRAM_SIZE:
+        return []
+    return sorted(artist_id for artist_id, name in names if query in name)[:limit]
+
+
+# Busca los nombres que empiezan con 'prefix' como el índice de prefijos: los
+# prefijos más cortos que un bucket no devuelven resultados
+def matching_prefixes(names, prefix, limit):
+    prefix = normalize_name(prefix)
+    if len(prefix) < PREFIX_BUCKET_SIZE:
+        return []
+    matches = sorted((name, artist_id) for artist_id, name in names if name.startswith(prefix))
+    return [{'name': name, 'artist_id': artist_id} for name, artist_id in matches[:limit]]
+
+
+# Mismo criterio que el filtro del barrido en DynamoDB
+def session_expired(item, now):
+    if 'expires_at' in item:
+        return item['expires_at'] < int(now.timestamp())
+    return item['refresh_token_expiry'] < now.isoformat()
+
+
+class ArtistStore(ArtistRepository):
+    def get(self, artist_id, fields=None):
+        with _lock:
+            item = _artists.get(artist_id)
+            return project(item, fields) if item else None
+
+    def batch_get(self, artist_ids, fields=None):
+        with _lock:
+            return [project(_artists[artist_id], fields) for artist_id in artist_ids if artist_id in _artists]
+
+    def create(self, item):
+        with _lock:
+            if item['artist_id'] in _artists:
+                raise ConditionFailed(copy.deepcopy(_artists[item['artist_id']]))
+            _artists[item['artist_id']] = copy.deepcopy(item)
+
+    def put_many(self, items):
+        with _lock:
+            for item in items:
+                _artists[item['artist_id']] = copy.deepcopy(item)
+
+    def update(self, artist_id, changes, password=None, expected_version=None):
+        with _lock:
+            current = _artists.get(artist_id)
+            if not check_update(current, password, expected_version):
+                raise ConditionFailed(copy.deepcopy(current))
+            return apply_update(current, copy.deepcopy(changes))
+
+    # Los items de un país se recorren por artist_id; last_key tiene la forma del
+    # LastEvaluatedKey de CountryListIndex o CountryShardIndex
+    def _page(self, attribute, value, limit, start_key, fields):
+        after = start_key['artist_id'] if start_key else None
+        with _lock:
+            matches = sorted(
+                artist_id for artist_id, item in _artists.items()
+                if item.get(attribute) == value and (after is None or artist_id > after)
+            )
+            items = [project(_artists[artist_id], fields) for artist_id in matches[:limit]]
+
+        if len(matches) <= limit:
+            return items, None
+        return items, {'artist_id': matches[limit - 1], attribute: value}
+
+    def by_country(self, country, limit, start_key=None, fields=None):
+        return self._page('country', country, limit, start_key, fields)
+
+    def by_country_shard(self, shard_key, limit, start_key=None, fields=None):
+        return self._page('country_shard', shard_key, limit, start_key, fields)
+
+    # Orden (name, artist_id), como CountryNameIndex con artistas del mismo nombre
+    def by_country_name(self, country, limit, start_key=None, fields=None, name_condition=None, descending=False):
+        after = (start_key['name'], start_key['artist_id']) if start_key else None
+        with _lock:
+            matches = sorted(
+                ((item['name'], artist_id) for artist_id, item in _artists.items()
+                 if item.get('country') == country and item.get('name') and name_matches(item['name'], name_condition)),
+                reverse=descending
+            )
+            if after:
+                matches = [key for key in matches if (key < after if descending else key > after)]
+            items = [project(_artists[artist_id], fields) for _, artist_id in matches[:limit]]
+
+        if len(matches) <= limit:
+            return items, None
+        name, artist_id = matches[limit - 1]
+        return items, {'artist_id': artist_id, 'country': country, 'name': name}
+
+    # Orden (updated_at, artist_id), como ChangesIndex con escrituras simultáneas
+    def by_change_shard(self, shard_key, limit, since, until, start_key=None, fields=None):
+        after = (start_key['updated_at'], start_key['artist_id']) if start_key else None
+        with _lock:
+            matches = sorted(
+                (item['updated_at'], artist_id) for artist_id, item in _artists.items()
+                if item.get('change_shard') == shard_key and since <= item.get('updated_at', '') <= until
+            )
+            if after:
+                matches = [key for key in matches if key > after]
+            items = [project(_artists[artist_id], fields) for _, artist_id in matches[:limit]]
+
+        if len(matches) <= limit:
+            return items, None
+        updated_at, artist_id = matches[limit - 1]
+        return items, {'artist_id': artist_id, 'change_shard': shard_key, 'updated_at': updated_at}
+
+    def by_name(self, name, artist_id=None, fields=None):
+        with _lock:
+            return [
+                project(item, fields) for key, item in sorted(_artists.items())
+                if item.get('name') == name and (artist_id is None or key == artist_id)
+            ]
+
+    # Sin stream: los contadores se calculan sobre los artistas guardados
+    def country_counts(self):
+        counts = {}
+        with _lock:
+            for item in _artists.values():
+                if item.get('country'):
+                    counts[item['country']] = counts.get(item['country'], 0) + 1
+        return counts
+
+    # Las búsquedas por subcadena y prefijo recorren los nombres guardados, no hay
+    # índices aparte
+    def update_name_index(self, artist_id, old_name, new_name):
+        pass
+
+    def search_names(self, query, limit):
+        with _lock:
+            names = [(artist_id, item.get('name', '')) for artist_id, item in _artists.items()]
+        return matching_names(names, query, limit)
+
+    def suggest_names(self, prefix, limit):
+        with _lock:
+            names = [(artist_id, item.get('name', '')) for artist_id, item in _artists.items()]
+        return matching_prefixes(names, prefix, limit)
+
+
+class TokenStore(TokenRepository):
+    def get(self, artist_id, token, consistent=False):
+        with _lock:
+            item = _tokens.get((artist_id, token))
+            return copy.deepcopy(item) if item else None
+
+    def put(self, item):
+        with _lock:
+            _tokens[(item['artist_id'], item['token'])] = copy.deepcopy(item)
+
+    def sessions(self, artist_id):
+        with _lock:
+            return [
+                {'token': item['token'], 'token_expiry': item['token_expiry'], 'refresh_token_expiry': item['refresh_token_expiry']}
+                for (owner, _), item in _tokens.items() if owner == artist_id and 'replaced_by' not in item
+            ]
+
+    def delete(self, artist_id, tokens):
+        with _lock:
+            for token in tokens:
+                _tokens.pop((artist_id, token), None)
+
+    def expired_page(self, now, start_key=None):
+        with _lock:
+            keys = [key for key, item in _tokens.items() if session_expired(item, now)]
+            return keys, len(_tokens), 0, None
+
+    def delete_many(self, keys):
+        with _lock:
+            for key in keys:
+                _tokens.pop(tuple(key), None)
+
+    def rotate(self, artist_id, token, refresh_token, new_item, grace_expires_at):
+        with _lock:
+            current = _tokens.get((artist_id, token))
+            if (not current or 'replaced_by' in current or current.get('refresh_token') != refresh_token
+                    or (artist_id, new_item['token']) in _tokens):
+                raise ConditionFailed()
+            current['replaced_by'] = new_item['token']
+            current['expires_at'] = grace_expires_at
+            _tokens[(artist_id, new_item['token'])] = copy.deepcopy(new_item)
+
+    def revoked(self):
+        with _lock:
+            return set(_revoked)
+
+    def add_revoked(self, entries):
+        with _lock:
+            _revoked.update(entries)
+
+    def remove_revoked(self, entries):
+        with _lock:
+            _revoked.difference_update(entries)
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import threading
+
+from name_index import normalize_name
+from storage import ArtistRepository, ConditionFailed, TokenRepository
+from storage_memory import apply_update, check_update, matching_names, matching_prefixes, project, session_expired
+
+# Backend SQLite: cada registro se guarda como documento JSON junto a las columnas
+# que necesitan los índices. (country, artist_id) y (name, artist_id) equivalen a
+# CountryListIndex y NameListIndex, así que las consultas y la paginación devuelven
+# lo mismo que DynamoDB. Útil para perfilar con datasets grandes sin AWS.
+SQLITE_PATH = os.environ.get('STORAGE_SQLITE_PATH', 'storage.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artists (
+    artist_id TEXT PRIMARY KEY,
+    country TEXT,
+    name TEXT,
+    item TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artists_country ON artists (country, artist_id);
+CREATE INDEX IF NOT EXISTS artists_name ON artists (name, artist_id);
+CREATE INDEX IF NOT EXISTS artists_country_name ON artists (country, name, artist_id);
+CREATE INDEX IF NOT EXISTS artists_change_shard ON artists (
+    json_extract(item, '$.change_shard'), json_extract(item, '$.updated_at'), artist_id
+);
+CREATE INDEX IF NOT EXISTS artists_country_shard ON artists (json_extract(item, '$.country_shard'), artist_id);
+CREATE TABLE IF NOT EXISTS tokens (
+    artist_id TEXT NOT NULL,
+    token TEXT NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (artist_id, token)
+);
+CREATE TABLE IF NOT EXISTS revoked (
+    entry TEXT PRIMARY KEY
+);
+"""
+
+_connection = None
+_lock = threading.RLock()
+
+
+# Una conexión por proceso, compartida entre hilos bajo _lock
+def connection():
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(SQLITE_PATH, check_same_thread=False)
+        _connection.executescript(SCHEMA)
+    return _connection
+
+
+def _load(row):
+    return json.loads(row[0]) if row else None
+
+
+def _artist_row(item):
+    return item['artist_id'], item.get('country'), item.get('name'), json.dumps(item)
+
+
+class ArtistStore(ArtistRepository):
+    def get(self, artist_id, fields=None):
+        with _lock:
+            item = _load(connection().execute('SELECT item FROM artists WHERE artist_id = ?', (artist_id,)).fetchone())
+        return project(item, fields) if item else None
+
+    def batch_get(self, artist_ids, fields=None):
+        items = []
+        # SQLite limita la cantidad de parámetros por sentencia
+        for start in range(0, len(artist_ids), 500):
+            chunk = list(artist_ids[start:start + 500])
+            placeholders = ', '.join('?' * len(chunk))
+            with _lock:
+                rows = connection().execute(f'SELECT item FROM artists WHERE artist_id IN ({placeholders})', chunk).fetchall()
+            items.extend(project(_load(row), fields) for row in rows)
+        return items
+
+    def create(self, item):
+        with _lock, connection() as conn:
+            existing = _load(conn.execute('SELECT item FROM artists WHERE artist_id = ?', (item['artist_id'],)).fetchone())
+            if existing:
+                raise ConditionFailed(existing)
+            conn.execute('INSERT INTO artists VALUES (?, ?, ?, ?)', _artist_row(item))
+
+    def put_many(self, items):
+        with _lock, connection() as conn:
+            conn.executemany('INSERT OR REPLACE INTO artists VALUES (?, ?, ?, ?)', [_artist_row(item) for item in items])
+
+    def update(self, artist_id, changes, password=None, expected_version=None):
+        with _lock, connection() as conn:
+            current = _load(conn.execute('SELECT item FROM artists WHERE artist_id = ?', (artist_id,)).fetchone())
+            if not check_update(current, password, expected_version):
+                raise ConditionFailed(current)
+            old = apply_update(current, changes)
+            conn.execute('UPDATE artists SET country = ?, name = ?, item = ? WHERE artist_id = ?', _artist_row(current)[1:] + (artist_id,))
+        return old
+
+    def _page(self, column, attribute, value, limit, start_key, fields):
+        after = start_key['artist_id'] if start_key else ''
+        with _lock:
+            rows = connection().execute(
+                f'SELECT item FROM artists WHERE {column} = ? AND artist_id > ? ORDER BY artist_id LIMIT ?',
+                (value, after, limit + 1)
+            ).fetchall()
+
+        items = [_load(row) for row in rows[:limit]]
+        last_key = {'artist_id': items[-1]['artist_id'], attribute: value} if len(rows) > limit else None
+        return [project(item, fields) for item in items], last_key
+
+    def by_country(self, country, limit, start_key=None, fields=None):
+        return self._page('country', 'country', country, limit, start_key, fields)
+
+    def by_country_shard(self, shard_key, limit, start_key=None, fields=None):
+        return self._page("json_extract(item, '$.country_shard')", 'country_shard', shard_key, limit, start_key, fields)
+
+    # Rango sobre el índice (country, name, artist_id)
+    def by_country_name(self, country, limit, start_key=None, fields=None, name_condition=None, descending=False):
+        query = 'SELECT item FROM artists WHERE country = ? AND name IS NOT NULL'
+        params = [country]
+        if name_condition:
+            operator, *values = name_condition
+            if operator == 'begins_with':
+                query += ' AND name >= ? AND name < ?'
+                params += [values[0], values[0] + '\U0010ffff']
+            elif operator == 'between':
+                query += ' AND name BETWEEN ? AND ?'
+                params += values
+            else:
+                query += ' AND name >= ?' if operator == 'gte' else ' AND name <= ?'
+                params += values
+        if start_key:
+            query += ' AND (name, artist_id) < (?, ?)' if descending else ' AND (name, artist_id) > (?, ?)'
+            params += [start_key['name'], start_key['artist_id']]
+        order = 'DESC' if descending else 'ASC'
+        query += f' ORDER BY name {order}, artist_id {order} LIMIT ?'
+        params.append(limit + 1)
+
+        with _lock:
+            rows = connection().execute(query, params).fetchall()
+
+        items = [_load(row) for row in rows[:limit]]
+        last_key = None
+        if len(rows) > limit:
+            last_key = {'artist_id': items[-1]['artist_id'], 'country': country, 'name': items[-1]['name']}
+        return [project(item, fields) for item in items], last_key
+
+    def by_change_shard(self, shard_key, limit, since, until, start_key=None, fields=None):
+        query = (
+            "SELECT item FROM artists WHERE json_extract(item, '$.change_shard') = ?"
+            " AND json_extract(item, '$.updated_at') BETWEEN ? AND ?"
+        )
+        params = [shard_key, since, until]
+        if start_key:
+            query += " AND (json_extract(item, '$.updated_at'), artist_id) > (?, ?)"
+            params += [start_key['updated_at'], start_key['artist_id']]
+        query += " ORDER BY json_extract(item, '$.updated_at'), artist_id LIMIT ?"
+        params.append(limit + 1)
+
+        with _lock:
+            rows = connection().execute(query, params).fetchall()
+
+        items = [_load(row) for row in rows[:limit]]
+        last_key = None
+        if len(rows) > limit:
+            last_key = {'artist_id': items[-1]['artist_id'], 'change_shard': shard_key, 'updated_at': items[-1]['updated_at']}
+        return [project(item, fields) for item in items], last_key
+
+    def by_name(self, name, artist_id=None, fields=None):
+        query = 'SELECT item FROM artists WHERE name = ?'
+        params = [name]
+        if artist_id:
+            query += ' AND artist_id = ?'
+            params.append(artist_id)
+        with _lock:
+            rows = connection().execute(query + ' ORDER BY artist_id', params).fetchall()
+        return [project(_load(row), fields) for row in rows]
+
+    # Sin stream: los contadores se calculan con el índice de country
+    def country_counts(self):
+        with _lock:
+            rows = connection().execute(
+                'SELECT country, COUNT(*) FROM artists WHERE country IS NOT NULL GROUP BY country'
+            ).fetchall()
+        return dict(rows)
+
+    # La búsqueda por subcadena recorre la columna name, no hay índice aparte
+    def update_name_index(self, artist_id, old_name, new_name):
+        pass
+
+    def search_names(self, query, limit):
+        with _lock:
+            names = connection().execute(
+                'SELECT artist_id, name FROM artists WHERE instr(name, ?) > 0', (normalize_name(query),)
+            ).fetchall()
+        return matching_names(names, query, limit)
+
+    # Rango sobre el índice (name, artist_id): lee solo los nombres con el prefijo
+    def suggest_names(self, prefix, limit):
+        prefix = normalize_name(prefix)
+        with _lock:
+            names = connection().execute(
+                'SELECT artist_id, name FROM artists WHERE name >= ? AND name < ? ORDER BY name, artist_id LIMIT ?',
+                (prefix, prefix + '\U0010ffff', limit)
+            ).fetchall()
+        return matching_prefixes(names, prefix, limit)
+
+
+class TokenStore(TokenRepository):
+    def get(self, artist_id, token, consistent=False):
+        with _lock:
+            return _load(connection().execute(
+                'SELECT item FROM tokens WHERE artist_id = ? AND token = ?', (artist_id, token)
+            ).fetchone())
+
+    def put(self, item):
+        with _lock, connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)', (item['artist_id'], item['token'], json.dumps(item)))
+
+    def sessions(self, artist_id):
+        with _lock:
+            rows = connection().execute('SELECT item FROM tokens WHERE artist_id = ?', (artist_id,)).fetchall()
+        return [
+            {'token': item['token'], 'token_expiry': item['token_expiry'], 'refresh_token_expiry': item['refresh_token_expiry']}
+            for item in map(_load, rows) if 'replaced_by' not in item
+        ]
+
+    def delete(self, artist_id, tokens):
+        with _lock, connection() as conn:
+            conn.executemany('DELETE FROM tokens WHERE artist_id = ? AND token = ?', [(artist_id, token) for token in tokens])
+
+    def expired_page(self, now, start_key=None):
+        with _lock:
+            items = [_load(row) for row in connection().execute('SELECT item FROM tokens').fetchall()]
+        keys = [(item['artist_id'], item['token']) for item in items if session_expired(item, now)]
+        return keys, len(items), 0, None
+
+    def delete_many(self, keys):
+        with _lock, connection() as conn:
+            conn.executemany('DELETE FROM tokens WHERE artist_id = ? AND token = ?', [tuple(key) for key in keys])
+
+    def rotate(self, artist_id, token, refresh_token, new_item, grace_expires_at):
+        with _lock, connection() as conn:
+            current = _load(conn.execute(
+                'SELECT item FROM tokens WHERE artist_id = ? AND token = ?', (artist_id, token)
+            ).fetchone())
+            taken = conn.execute(
+                'SELECT 1 FROM tokens WHERE artist_id = ? AND token = ?', (artist_id, new_item['token'])
+            ).fetchone()
+            if not current or 'replaced_by' in current or current.get('refresh_token') != refresh_token or taken:
+                raise ConditionFailed()
+
+            current['replaced_by'] = new_item['token']
+            current['expires_at'] = grace_expires_at
+            conn.execute('UPDATE tokens SET item = ? WHERE artist_id = ? AND token = ?', (json.dumps(current), artist_id, token))
+            conn.execute('INSERT INTO tokens VALUES (?, ?, ?)', (artist_id, new_item['token'], json.dumps(new_item)))
+
+    def revoked(self):
+        with _lock:
+            return {row[0] for row in connection().execute('SELECT entry FROM revoked').fetchall()}
+
+    def add_revoked(self, entries):
+        with _lock, connection() as conn:
+            conn.executemany('INSERT OR IGNORE INTO revoked VALUES (?)', [(entry,) for entry in entries])
+
+    def remove_revoked(self, entries):
+        with _lock, connection() as conn:
+            conn.executemany('DELETE FROM revoked WHERE entry = ?', [(entry,) for entry in entries])
@@ -0,0 +1,49 @@
+import os
+
+import runtime
+import storage
+from name_prefix import PREFIX_BUCKET_SIZE
+
+# Sugerencias por petición (por defecto y máximo)
+SUGGEST_LIMIT = int(os.environ.get('SUGGEST_LIMIT', '10'))
+MAX_SUGGEST_LIMIT = int(os.environ.get('MAX_SUGGEST_LIMIT', '50'))
+
+# Autocompletado de nombres: artistas cuyo nombre empieza con 'prefix', ordenados
+# por nombre. Una sola consulta acotada por 'limit' en el índice de prefijos.
+@runtime.handler('TABLE_NAME_PREFIXES')
+def lambda_handler(event, context):
+    # GET: los parámetros llegan en el query string
+    query = event.get('query') or {}
+    prefix = (query.get('prefix') or '').strip().lower()
+
+    if len(prefix) < PREFIX_BUCKET_SIZE:
+        return {
+            'statusCode': 400,
+            'message': f"El parámetro 'prefix' debe tener al menos {PREFIX_BUCKET_SIZE} caracteres"
+        }
+
+    try:
+        limit = int(query.get('limit') or SUGGEST_LIMIT)
+    except ValueError:
+        limit = 0
+    if limit < 1 or limit > MAX_SUGGEST_LIMIT:
+        return {
+            'statusCode': 400,
+            'message': f"El parámetro 'limit' debe estar entre 1 y {MAX_SUGGEST_LIMIT}"
+        }
+
+    try:
+        suggestions = storage.artists().suggest_names(prefix, limit)
+
+        return {
+            'statusCode': 200,
+            'prefix': prefix,
+            'suggestions': suggestions
+        }
+
+    except Exception as e:
+        print(f"Error al consultar las sugerencias: {e}")
+        return {
+            'statusCode': 500,
+            'message': 'Error interno del servidor'
+        }
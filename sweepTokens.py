@@ -0,0 +1,45 @@
+import json
+import time
+from datetime import datetime
+
+import runtime
+import storage
+
+# Barrido de sesiones vencidas de la tabla de tokens. El TTL de DynamoDB
+# (atributo expires_at) las elimina por sí solo, pero puede tardar hasta días y
+# no cubre los registros creados antes de que existiera expires_at. Se ejecuta
+# programado; acepta 'cursor' en el evento para continuar un barrido anterior.
+@runtime.handler('TABLE_NAME_TOKENS')
+def lambda_handler(event, context):
+    tokens = storage.tokens()
+    now = datetime.now()
+
+    stats = {'pages': 0, 'scanned': 0, 'deleted': 0, 'consumed_rcu': 0.0}
+    start = time.perf_counter()
+
+    def fetch_page(cursor):
+        keys, scanned, consumed, cursor = tokens.expired_page(now, cursor)
+        return (keys, scanned, consumed), cursor
+
+    def sweep_page(page):
+        keys, scanned, consumed = page
+        stats['pages'] += 1
+        stats['scanned'] += scanned
+        stats['consumed_rcu'] += consumed
+
+        tokens.delete_many(keys)
+        stats['deleted'] += len(keys)
+
+    cursor = runtime.resume_pages(fetch_page, sweep_page, event.get('cursor'), context)
+
+    elapsed = time.perf_counter() - start
+    stats['duration_s'] = round(elapsed, 3)
+    stats['scanned_per_s'] = round(stats['scanned'] / elapsed, 1) if elapsed else 0
+    stats['deleted_per_s'] = round(stats['deleted'] / elapsed, 1) if elapsed else 0
+    print(json.dumps({'sweep_tokens': stats}))
+
+    return {
+        'statusCode': 200,
+        'metrics': stats,
+        'cursor': cursor
+    }
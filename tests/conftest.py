@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+
+# Las pruebas ejecutan los handlers con el backend en memoria, sin AWS. El entorno
+# tiene que estar listo antes de importar los módulos del repositorio.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ['STORAGE_BACKEND'] = 'memory'
+os.environ['METRICS_ENABLED'] = 'false'
+os.environ.setdefault('TABLE_NAME_ARTISTS', 'test-Pt_artists')
+os.environ.setdefault('TABLE_NAME_TOKENS', 'test-Pt_tokens')
+os.environ.setdefault('TABLE_NAME_NGRAMS', 'test-Pt_artist_ngrams')
+
+import cache  # noqa: E402
+import storage_memory  # noqa: E402
+import token_utils  # noqa: E402
+
+
+# Cada prueba empieza con las tablas y las caches vacías
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    with storage_memory._lock:
+        storage_memory._artists.clear()
+        storage_memory._tokens.clear()
+        storage_memory._revoked.clear()
+    monkeypatch.setattr(cache, '_local_tier', None)
+    monkeypatch.setattr(cache, '_shared_tier', None)
+    monkeypatch.setattr(token_utils, '_revoked_cache', (0, frozenset()))
+    yield
+
+
+# Modo de tokens firmados con una llave de prueba
+@pytest.fixture
+def signed_tokens(monkeypatch):
+    monkeypatch.setattr(token_utils, 'TOKEN_MODE', 'signed')
+    monkeypatch.setattr(token_utils, 'SIGNING_KEYS', {'k1': 'secreto-de-prueba'})
+    monkeypatch.setattr(token_utils, 'SIGNING_KID', 'k1')
+
+
+# Registra un artista con registerArtist y devuelve su artist_id
+@pytest.fixture
+def register():
+    import registerArtist
+
+    def register(artist_id, name='the band', country='chile', password='secreto'):
+        event = {'body': {'artist_id': artist_id, 'name': name, 'country': country, 'password': password}}
+        response = registerArtist.lambda_handler(event, None)
+        assert response['statusCode'] == 200, response
+        return artist_id
+    return register
+
+
+# Inicia sesión con loginArtist y devuelve la respuesta (token y refresh_token)
+@pytest.fixture
+def login():
+    import loginArtist
+
+    def login(artist_id, password='secreto'):
+        response = loginArtist.lambda_handler({'body': {'artist_id': artist_id, 'password': password}}, None)
+        assert response['statusCode'] == 200, response
+        return response
+    return login
+
+
+# Recorre todas las páginas de getAllByCountry con 'body' y devuelve
+# (artist_ids en orden, cantidad de páginas)
+@pytest.fixture
+def country_pages():
+    import getAllByCountry
+
+    def country_pages(body):
+        users, pages, cursor = [], 0, None
+        while True:
+            response = getAllByCountry.lambda_handler({'body': {**body, 'cursor': cursor}}, None)
+            assert response['statusCode'] == 200, response
+            users += [user['artist_id'] for user in response['users']]
+            pages += 1
+            cursor = response['next_cursor']
+            if not cursor:
+                return users, pages
+    return country_pages
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+import yaml
+
+import changeName
+import storage
+from monolith import Monolith, ROOT
+from token_utils import authorize_request
+
+
+def _event(body, token, auth=None):
+    event = {'body': body, 'headers': {'Authorization': token}}
+    if auth is not None:
+        event['auth'] = auth
+    return event
+
+
+def test_authorizer_context_sets_the_artist(register, login):
+    register('a1')
+    token = login('a1')['token']
+
+    # Con contexto del authorizer no se vuelve a validar el token en proceso
+    artist_id, error = authorize_request(_event({}, 'otro-token', {'artist_id': 'a1'}), storage.tokens(), 'otro-token')
+    assert (artist_id, error) == ('a1', None)
+
+    artist_id, error = authorize_request(_event({'artist_id': 'a1'}, token, {'artist_id': 'a1'}), storage.tokens(), token)
+    assert (artist_id, error) == ('a1', None)
+
+
+def test_body_artist_must_match_the_authorizer(register, login):
+    register('a1')
+    register('a2')
+    token = login('a2')['token']
+
+    artist_id, error = authorize_request(_event({'artist_id': 'a1'}, token, {'artist_id': 'a2'}), storage.tokens(), token)
+    assert artist_id is None
+    assert error['statusCode'] == 403
+
+
+def test_direct_invocation_validates_the_token(register, login):
+    register('a1')
+    register('a2')
+    token = login('a1')['token']
+    tokens = storage.tokens()
+
+    assert authorize_request(_event({'artist_id': 'a1'}, token), tokens, token) == ('a1', None)
+    assert authorize_request(_event({}, token), tokens, token)[1]['statusCode'] == 400
+    # El token de un artista no sirve para otro
+    assert authorize_request(_event({'artist_id': 'a2'}, token), tokens, token)[1]['statusCode'] == 403
+    assert authorize_request(_event({'artist_id': 'a1'}, 'inventado'), tokens, 'inventado')[1]['statusCode'] == 403
+
+
+def test_handler_rejects_another_artists_token(register, login):
+    register('victim', name='original')
+    register('attacker')
+    token = login('attacker')['token']
+
+    response = changeName.lambda_handler(_event({'artist_id': 'victim', 'new_name': 'hacked'}, token), None)
+    assert response['statusCode'] == 403
+    assert storage.artists().get('victim')['name'] == 'original'
+
+    response = changeName.lambda_handler(_event({'new_name': 'hacked'}, token, {'artist_id': 'attacker'}), None)
+    assert response['statusCode'] == 200
+    assert storage.artists().get('attacker')['name'] == 'hacked'
+    assert storage.artists().get('victim')['name'] == 'original'
+
+
+# El request template serializa el body con $input.json('$'): una clave "auth" en el
+# body queda dentro de event['body'] y event['auth'] sale solo del authorizer
+def test_request_template_keeps_auth_out_of_the_body():
+    with open(os.path.join(ROOT, 'serverless.yml')) as f:
+        config = yaml.safe_load(f)
+    monolith = Monolith(config, 'test')
+    route = monolith.routes[('PATCH', '/artist/change-name')]
+
+    raw_body = '{"new_name": "hacked", "auth": {"artist_id": "victim"}}'
+    policy = {'principalId': 'attacker', 'context': {'artist_id': 'attacker'}}
+    event = monolith.build_event(route, {'authorization': 'token'}, {}, raw_body, policy)
+
+    assert event['auth']['artist_id'] == 'attacker'
+    assert event['body']['auth'] == {'artist_id': 'victim'}
+
+    # Un body que cierra el objeto y agrega "auth" no es JSON válido: API Gateway lo rechaza
+    raw_body = '{"new_name": "hacked"}, "auth": {"artist_id": "victim"}'
+    with pytest.raises(ValueError):
+        monolith.build_event(route, {'authorization': 'token'}, {}, raw_body, policy)
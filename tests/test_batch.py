@@ -0,0 +1,80 @@
+import pytest
+
+import batch_utils
+import getInfoBatch
+from batch_utils import batch_get
+
+
+# Cliente falso de BatchGetItem: devuelve como UnprocessedKeys las llaves de las
+# primeras 'unprocessed' respuestas a partir de la mitad de cada pedido
+class FakeDynamoDB:
+    def __init__(self, unprocessed=0):
+        self.unprocessed = unprocessed
+        self.requests = []
+
+    def batch_get_item(self, RequestItems):
+        self.requests.append(RequestItems)
+        request = RequestItems['artists']
+        keys = request['Keys']
+        if self.unprocessed:
+            self.unprocessed -= 1
+            done, pending = keys[:len(keys) // 2], keys[len(keys) // 2:]
+            return {
+                'Responses': {'artists': [dict(key) for key in done]},
+                'UnprocessedKeys': {'artists': {**request, 'Keys': pending}}
+            }
+        return {'Responses': {'artists': [dict(key) for key in keys]}}
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(batch_utils, 'backoff', lambda attempt: None)
+
+
+def _keys(count):
+    return [{'artist_id': f"a{i:03d}"} for i in range(count)]
+
+
+def test_unprocessed_keys_are_retried():
+    dynamodb = FakeDynamoDB(unprocessed=2)
+    items = batch_get(dynamodb, 'artists', _keys(8), projection=['artist_id', 'name'])
+
+    assert sorted(item['artist_id'] for item in items) == [f"a{i:03d}" for i in range(8)]
+    assert [len(request['artists']['Keys']) for request in dynamodb.requests] == [8, 4, 2]
+    # Los reintentos conservan la proyección
+    assert all(request['artists']['ProjectionExpression'] == '#p0, #p1' for request in dynamodb.requests)
+
+
+def test_keys_are_split_in_blocks_of_100():
+    dynamodb = FakeDynamoDB()
+    items = batch_get(dynamodb, 'artists', _keys(250))
+
+    assert len(items) == 250
+    assert [len(request['artists']['Keys']) for request in dynamodb.requests] == [100, 100, 50]
+
+
+def test_persistent_unprocessed_keys_fail():
+    dynamodb = FakeDynamoDB(unprocessed=batch_utils.MAX_RETRIES + 1)
+    with pytest.raises(RuntimeError):
+        batch_get(dynamodb, 'artists', _keys(200))
+
+
+def _batch(artist_ids):
+    return getInfoBatch.lambda_handler({'body': {'artist_ids': artist_ids}}, None)
+
+
+def test_info_batch(register):
+    register('a1', name='uno')
+    register('a2', name='dos')
+
+    response = _batch(['a2', 'nadie', 'a1', 'a2'])
+    assert response['statusCode'] == 200
+    assert set(response['artists']) == {'a1', 'a2'}
+    assert response['artists']['a1']['name'] == 'uno'
+    assert 'password' not in response['artists']['a1']
+    assert response['not_found'] == ['nadie']
+
+
+@pytest.mark.parametrize('artist_ids', [None, [], 'a1', [f"a{i}" for i in range(getInfoBatch.MAX_BATCH_IDS + 1)]])
+def test_invalid_info_batch_is_400(artist_ids):
+    assert _batch(artist_ids)['statusCode'] == 400
@@ -0,0 +1,84 @@
+import json
+
+import bulkImportArtists
+import storage
+
+
+def _catalog(tmp_path, rows):
+    path = tmp_path / 'catalogo.ndjson'
+    path.write_text(''.join(json.dumps(row) + '\n' for row in rows), encoding='utf-8')
+    return str(path)
+
+
+def _run(path):
+    return bulkImportArtists.run_import(path, f"{path}.checkpoint.ndjson", f"{path}.report.ndjson", 4)
+
+
+def _row(artist_id, name='the band'):
+    return {'artist_id': artist_id, 'name': name, 'country': 'chile', 'password': 'secreto'}
+
+
+def test_import_skips_duplicates_and_invalid_rows(tmp_path, register):
+    register('existente', name='otra banda')
+    rows = [_row(f"a{i:02d}", name=f"banda {i:02d}") for i in range(30)]
+    rows += [_row('a00'), _row('existente'), {'artist_id': 'sin-nombre'}]
+    path = _catalog(tmp_path, rows)
+
+    summary = _run(path)
+    assert summary == {'imported': 30, 'duplicate': 2, 'invalid': 1}
+    artists = storage.artists()
+    assert artists.get('a07')['name'] == 'banda 07'
+    # El artista ya registrado no se sobrescribe
+    assert artists.get('existente')['name'] == 'otra banda'
+    assert artists.search_names('banda 1', 20) == [f"a{i}" for i in range(10, 20)]
+
+
+# Una escritura propia sin checkpoint (p. ej. el proceso terminó antes de guardarlo)
+# se reconoce al reanudar y no se reclasifica como duplicado
+def test_resumed_import_recognizes_its_own_writes(tmp_path):
+    path = _catalog(tmp_path, [_row('a1'), _row('a2')])
+    assert _run(path) == {'imported': 2}
+
+    # Sin el checkpoint, los dos artistas se vuelven a intentar
+    (tmp_path / 'catalogo.ndjson.checkpoint.ndjson').unlink()
+    assert _run(path) == {'imported': 2}
+    # Con el checkpoint no queda nada pendiente
+    assert _run(path) == {}
+
+
+# El checkpoint crece con una línea por bloque y solo con los resultados de ese bloque
+def test_checkpoint_is_a_log_of_chunks(tmp_path):
+    rows = [_row(f"a{i:02d}", name=f"banda {i:02d}") for i in range(60)]
+    path = _catalog(tmp_path, rows)
+    assert _run(path) == {'imported': 60}
+
+    with open(f"{path}.checkpoint.ndjson", encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    assert sorted(entry['chunk'] for entry in entries) == [0, 1, 2]
+    assert all(entry['completed'] for entry in entries)
+    assert sorted(len(entry['outcomes']) for entry in entries) == [10, 25, 25]
+
+
+# Un bloque con errores conserva los resultados de sus artistas ya escritos
+def test_failed_chunk_keeps_its_outcomes(tmp_path, monkeypatch):
+    path = _catalog(tmp_path, [_row('a1'), _row('a2')])
+    create = type(storage.artists()).create
+
+    def failing_create(self, item):
+        if item['artist_id'] == 'a2':
+            raise RuntimeError('sin conexión')
+        create(self, item)
+    monkeypatch.setattr(type(storage.artists()), 'create', failing_create)
+    assert _run(path) == {'imported': 1, 'error': 1}
+
+    checkpoint = bulkImportArtists.Checkpoint(f"{path}.checkpoint.ndjson")
+    assert checkpoint.completed == set()
+    assert checkpoint.outcome(0, 'a1') == 'imported'
+    checkpoint.close()
+
+    monkeypatch.setattr(type(storage.artists()), 'create', create)
+    assert _run(path) == {'imported': 2}
+    checkpoint = bulkImportArtists.Checkpoint(f"{path}.checkpoint.ndjson")
+    assert checkpoint.completed == {0}
+    assert checkpoint.outcomes == {}
+    checkpoint.close()
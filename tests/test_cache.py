@@ -0,0 +1,119 @@
+import pytest
+
+import cache
+import changeName
+import getAllbyName
+import getInfoById
+import storage
+import storage_memory
+import updateArtist
+from artist_utils import LIST_FIELDS
+from etag_utils import VERSION_FIELDS
+
+
+# Los dos niveles: solo el del proceso, y además el compartido (LocalRedis)
+@pytest.fixture(params=['', 'local://'], autouse=True)
+def cache_url(request, monkeypatch):
+    monkeypatch.setattr(cache, 'ARTIST_CACHE_TTL', 30)
+    monkeypatch.setattr(cache, 'ARTIST_CACHE_URL', request.param)
+    return request.param
+
+
+def _info(artist_id):
+    return getInfoById.lambda_handler({'body': {'artist_id': artist_id}}, None)
+
+
+def _by_name(name):
+    response = getAllbyName.lambda_handler({'body': {'name': name}}, None)
+    if response['statusCode'] != 200:
+        return []
+    return [artist['artist_id'] for artist in response['body']['artists']]
+
+
+def test_reads_are_cached(register):
+    register('a1', name='uno')
+    assert _info('a1')['name'] == 'uno'
+
+    # Una escritura que no pasa por update_artist no invalida: se sirve la cache
+    storage.artists().put_many([{**storage.artists().get('a1'), 'name': 'otro'}])
+    assert _info('a1')['name'] == 'uno'
+
+
+def test_update_invalidates_profile_and_names(register, login):
+    register('a1', name='uno')
+    token = login('a1')['token']
+    assert _info('a1')['name'] == 'uno'
+    assert _by_name('uno') == ['a1']
+    assert _by_name('dos') == []
+
+    event = {'body': {'new_name': 'dos'}, 'headers': {'Authorization': token}, 'auth': {'artist_id': 'a1'}}
+    assert changeName.lambda_handler(event, None)['statusCode'] == 200
+
+    assert _info('a1')['name'] == 'dos'
+    assert _by_name('uno') == []
+    assert _by_name('dos') == ['a1']
+
+
+def test_register_invalidates_the_name(register):
+    register('a1', name='uno')
+    assert _by_name('uno') == ['a1']
+
+    register('a2', name='uno')
+    assert _by_name('uno') == ['a1', 'a2']
+
+
+def test_cached_profile_has_no_password(register):
+    register('a1', name='uno')
+    _info('a1')
+    assert 'password' not in cache.artists().get('a1')
+
+
+# Registra las lecturas que llegan al backend: (método, fields)
+@pytest.fixture
+def reads(monkeypatch):
+    calls = []
+    for method in ('get', 'batch_get', 'by_name'):
+        original = getattr(storage_memory.ArtistStore, method)
+
+        def spy(self, *args, _method=method, _original=original, **kwargs):
+            calls.append((_method, kwargs.get('fields')))
+            return _original(self, *args, **kwargs)
+        monkeypatch.setattr(storage_memory.ArtistStore, method, spy)
+    return calls
+
+
+def test_name_miss_reads_only_the_list_view(register, reads):
+    register('a1', name='uno')
+    reads.clear()
+
+    assert _by_name('uno') == ['a1']
+    assert reads == [('by_name', list(LIST_FIELDS))]
+    reads.clear()
+    assert _by_name('uno') == ['a1']
+    assert reads == []
+
+
+def test_projected_miss_is_a_projected_read(register, reads):
+    register('a1', name='uno')
+    reads.clear()
+
+    current = cache.artists().get('a1', fields=VERSION_FIELDS)
+    assert current == {'artist_id': 'a1', 'version': 1}
+    assert reads == [('get', VERSION_FIELDS)]
+
+    items = cache.artists().batch_get(['a1', 'nadie'], fields=['name'])
+    assert items == [{'name': 'uno'}]
+    assert reads[-1] == ('batch_get', ['artist_id', 'name'])
+
+
+def test_update_refreshes_name_rows(register, login):
+    register('a1', name='uno')
+    token = login('a1')['token']
+    rows = getAllbyName.lambda_handler({'body': {'name': 'uno'}}, None)['body']['artists']
+    assert rows[0]['version'] == 1
+
+    event = {'body': {'info': 'nueva'}, 'headers': {'Authorization': token}, 'auth': {'artist_id': 'a1'}}
+    assert updateArtist.lambda_handler(event, None)['statusCode'] == 200
+
+    rows = getAllbyName.lambda_handler({'body': {'name': 'uno'}}, None)['body']['artists']
+    assert rows[0]['version'] == 2
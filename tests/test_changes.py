@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import artist_changes
+import getChanges
+import storage
+from pagination import InvalidPageRequest, encode_cursor
+
+
+def test_changes_cursor_round_trip():
+    artists = storage.artists()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    expected = []
+    for i in range(40):
+        artist_id = f"a{i:02d}"
+        # Varios días, y escrituras con el mismo updated_at en distintos fragmentos
+        moment = start + timedelta(hours=7 * (i // 2))
+        artists.create({'artist_id': artist_id, 'name': 'n', 'country': 'chile', 'version': 1,
+                        **artist_changes.change_stamp(artist_id, moment)})
+        expected.append(artist_id)
+
+    now = start + timedelta(days=30)
+    position = artist_changes.parse_since('2025-12-31', now=now)
+    seen = []
+    while True:
+        items, position, has_more = artist_changes.changes_page(artists, position, 6, now=now)
+        seen += [item['artist_id'] for item in items]
+        position = artist_changes.parse_since(encode_cursor(position), now=now)
+        if not has_more:
+            break
+
+    assert seen == expected
+    # Sin cambios nuevos el cursor apunta a la misma posición
+    assert artist_changes.changes_page(artists, position, 6, now=now)[0] == []
+
+
+def _changes(since):
+    return getChanges.lambda_handler({'query': {'since': since}}, None)
+
+
+def _cursor(day, since=None):
+    return encode_cursor({'day': day, 'since': since or f"{day}T00:00:00.000000+00:00", 'keys': {}})
+
+
+@pytest.mark.parametrize('since', [
+    _cursor('2020-1', '2020-1'),
+    _cursor('2020-02-30', '2020-02-30T00:00:00.000000+00:00'),
+    _cursor('nope', 'nope'),
+    # 'since' de otro día que 'day'
+    _cursor(datetime.now(timezone.utc).date().isoformat(), '2020-01-01T00:00:00.000000+00:00'),
+    'no es un cursor',
+])
+def test_invalid_since_is_rejected(since):
+    assert _changes(since)['statusCode'] == 400
+
+
+def test_since_outside_retention_is_rejected():
+    assert _changes('2020-01-01')['statusCode'] == 400
+    assert _changes(_cursor('2020-01-01'))['statusCode'] == 400
+
+    recent = (datetime.now(timezone.utc) - timedelta(days=2)).date().isoformat()
+    response = _changes(recent)
+    assert response['statusCode'] == 200
+    assert response['changes'] == []
+
+
+# Días sin cambios: cada petición hace como máximo MAX_CHANGE_QUERIES consultas y el
+# cursor avanza hasta el primer día que falta leer
+def test_empty_days_are_bounded_per_request(monkeypatch):
+    artists = storage.artists()
+    queries = []
+    by_change_shard = type(artists).by_change_shard
+
+    def counting(self, shard_key, *args, **kwargs):
+        queries.append(shard_key)
+        return by_change_shard(self, shard_key, *args, **kwargs)
+    monkeypatch.setattr(type(artists), 'by_change_shard', counting)
+    monkeypatch.setattr(artist_changes, 'MAX_CHANGE_QUERIES', 2 * artist_changes.CHANGE_SHARDS)
+
+    now = datetime(2026, 1, 20, tzinfo=timezone.utc)
+    position = artist_changes.parse_since('2026-01-01', now=now)
+    items, position, has_more = artist_changes.changes_page(artists, position, 10, now=now)
+
+    assert items == []
+    assert has_more
+    assert position['day'] == '2026-01-03'
+    assert len(queries) == 2 * artist_changes.CHANGE_SHARDS
+
+
+# Los fragmentos se mezclan en orden de (updated_at, artist_id), también cuando
+# varias escrituras tienen el mismo updated_at
+def test_changes_merge_order():
+    artists = storage.artists()
+    moment = datetime(2026, 1, 5, 12, tzinfo=timezone.utc)
+    writes = [('b', 0), ('a', 0), ('d', 1), ('c', 1), ('e', 2)]
+    for artist_id, seconds in writes:
+        artists.create({'artist_id': artist_id, 'name': 'n', 'country': 'chile', 'version': 1,
+                        **artist_changes.change_stamp(artist_id, moment + timedelta(seconds=seconds))})
+
+    now = moment + timedelta(hours=1)
+    position = artist_changes.parse_since('2026-01-05', now=now)
+    items, _, has_more = artist_changes.changes_page(artists, position, 10, now=now)
+    assert [item['artist_id'] for item in items] == ['a', 'b', 'c', 'd', 'e']
+    assert not has_more
+
+
+def test_parse_since_requires_a_value():
+    with pytest.raises(InvalidPageRequest):
+        artist_changes.parse_since(None)
+
+
+# DynamoDB rechaza un between con el límite inferior mayor que el superior
+def test_since_after_until_does_not_query(monkeypatch):
+    def by_change_shard(self, shard_key, limit, since, until, start_key=None, fields=None):
+        assert since <= until, 'ValidationException'
+        return [], None
+    monkeypatch.setattr(type(storage.artists()), 'by_change_shard', by_change_shard)
+
+    for since in [datetime.now(timezone.utc).isoformat(), (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()]:
+        response = _changes(since)
+        assert response['statusCode'] == 200
+        assert response['changes'] == []
+        assert response['has_more'] is False
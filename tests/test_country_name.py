@@ -0,0 +1,74 @@
+import pytest
+
+import getAllByCountry
+
+NAMES = ['abba', 'ac dc', 'aerosmith', 'blur', 'bon jovi', 'cream', 'cure', 'devo', 'doors', 'eagles']
+
+
+@pytest.fixture
+def catalog(register):
+    register('otro', name='abba peru', country='peru')
+    return {register(f"a{i:02d}", name=name): name for i, name in enumerate(NAMES)}
+
+
+def _names(catalog, ids):
+    return [catalog[artist_id] for artist_id in ids]
+
+
+def _page(body):
+    return getAllByCountry.lambda_handler({'body': {'country': 'chile', **body}}, None)
+
+
+def test_sorted_country_pages(register, country_pages):
+    ids = [register(f"a{i:02d}", name=f"artist {i:02d}") for i in range(23)]
+
+    # Orden por nombre (CountryNameIndex): el cursor trae 'name'
+    users, _ = country_pages({'country': 'chile', 'limit': 4, 'sort': 'desc'})
+    assert users == ids[::-1]
+    users, _ = country_pages({'country': 'chile', 'limit': 5, 'sort': 'asc'})
+    assert users == ids
+
+
+def test_name_prefix(catalog, country_pages):
+    users, _ = country_pages({'country': 'chile', 'limit': 2, 'name_prefix': ' A'})
+    assert _names(catalog, users) == ['abba', 'ac dc', 'aerosmith']
+
+    users, _ = country_pages({'country': 'chile', 'limit': 2, 'name_prefix': 'cu', 'sort': 'desc'})
+    assert _names(catalog, users) == ['cure']
+
+
+@pytest.mark.parametrize('body, expected', [
+    ({'name_from': 'blur', 'name_to': 'cure'}, ['blur', 'bon jovi', 'cream', 'cure']),
+    ({'name_from': 'devo'}, ['devo', 'doors', 'eagles']),
+    ({'name_to': 'ac dc'}, ['abba', 'ac dc']),
+    ({'name_from': 'c', 'name_to': 'd', 'sort': 'desc'}, ['cure', 'cream']),
+])
+def test_name_range(catalog, country_pages, body, expected):
+    users, _ = country_pages({'country': 'chile', 'limit': 3, **body})
+    assert _names(catalog, users) == expected
+
+
+# Orden descendente en varias páginas: cada una sigue exactamente donde terminó la anterior
+def test_descending_pages(catalog, country_pages):
+    users, pages = country_pages({'country': 'chile', 'limit': 3, 'sort': 'desc'})
+    assert _names(catalog, users) == sorted(NAMES, reverse=True)
+    assert pages == 4
+
+
+@pytest.mark.parametrize('body', [
+    {'sort': 'up'},
+    {'name_prefix': 'a', 'name_from': 'b'},
+    {'name_from': 'z', 'name_to': 'a'},
+])
+def test_invalid_name_query_is_400(catalog, body):
+    assert _page(body)['statusCode'] == 400
+
+
+# Un cursor del listado sin orden no sirve para uno ordenado, ni al revés
+def test_cursor_belongs_to_its_order(catalog):
+    unsorted_cursor = _page({'limit': 2})['next_cursor']
+    assert _page({'limit': 2, 'sort': 'asc', 'cursor': unsorted_cursor})['statusCode'] == 400
+
+    sorted_cursor = _page({'limit': 2, 'sort': 'asc'})['next_cursor']
+    assert _page({'limit': 2, 'cursor': sorted_cursor})['statusCode'] == 400
+    assert _page({'limit': 2, 'sort': 'asc', 'cursor': sorted_cursor})['statusCode'] == 200
@@ -0,0 +1,81 @@
+import pytest
+
+import artist_utils
+import country_shards
+import getAllByCountry
+from pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    monkeypatch.setattr(country_shards, 'COUNTRY_SHARDS', 4)
+    monkeypatch.setattr(artist_utils, 'COUNTRY_SHARDS', 4)
+
+
+def _page(body):
+    return getAllByCountry.lambda_handler({'body': {'country': 'chile', **body}}, None)
+
+
+# artist_id del fragmento 'shard' (de 4)
+def _ids_in_shard(shard, count):
+    ids = (f"a{i:03d}" for i in range(1000))
+    return [artist_id for artist_id in ids if country_shards.shard_for(artist_id, 4) == shard][:count]
+
+
+def test_sharded_country_pages(register, sharded, country_pages):
+    ids = [register(f"a{i:02d}") for i in range(30)]
+
+    users, _ = country_pages({'country': 'chile', 'limit': 7})
+    assert sorted(users) == ids
+
+
+# Con fragmentos agotados, lo que falta para completar la página se pide a los
+# que todavía tienen artistas, y el cursor combinado solo guarda esos
+def test_exhausted_shards_fill_the_page(register, sharded):
+    large = [register(artist_id) for artist_id in _ids_in_shard(0, 10)]
+    small = [register(artist_id) for artist_id in _ids_in_shard(1, 1)]
+
+    first = _page({'limit': 6})
+    assert len(first['users']) == 6
+    shards = decode_cursor(first['next_cursor'])['shards']
+    assert list(shards) == ['0']
+
+    second = _page({'limit': 6, 'cursor': first['next_cursor']})
+    assert second['next_cursor'] is None
+    users = [user['artist_id'] for user in first['users'] + second['users']]
+    # Sin duplicados ni huecos al continuar desde el cursor combinado
+    assert len(users) == len(set(users))
+    assert sorted(users) == sorted(large + small)
+
+
+def test_unsharded_cursor_is_rejected(register, sharded, monkeypatch):
+    register('a1')
+    register('a2')
+    monkeypatch.setattr(country_shards, 'COUNTRY_SHARDS', 0)
+    cursor = _page({'limit': 1})['next_cursor']
+    monkeypatch.setattr(country_shards, 'COUNTRY_SHARDS', 4)
+
+    assert _page({'limit': 1, 'cursor': cursor})['statusCode'] == 400
+
+
+def test_sharded_cursor_is_rejected_without_shards(register, sharded, monkeypatch):
+    register('a1')
+    register('a2')
+    cursor = _page({'limit': 1})['next_cursor']
+    monkeypatch.setattr(country_shards, 'COUNTRY_SHARDS', 0)
+
+    assert _page({'limit': 1, 'cursor': cursor})['statusCode'] == 400
+
+
+@pytest.mark.parametrize('shards', [
+    {'x': None},
+    {'4': None},
+    {'-1': None},
+    {'0': 'clave'},
+    {},
+    ['0'],
+])
+def test_malformed_shard_cursor_is_rejected(register, sharded, shards):
+    register('a1')
+    cursor = encode_cursor({'country': 'chile', 'shards': shards})
+    assert _page({'cursor': cursor})['statusCode'] == 400
@@ -0,0 +1,114 @@
+import countryStats
+import getCountries
+import rebuildCountryStats
+import runtime
+from country_stats import COUNTRY_STATS_KEY, apply_deltas, country_deltas
+
+
+def _record(old_country=None, new_country=None):
+    images = {}
+    if old_country:
+        images['OldImage'] = {'artist_id': {'S': 'a'}, 'country': {'S': old_country}}
+    if new_country:
+        images['NewImage'] = {'artist_id': {'S': 'a'}, 'country': {'S': new_country}}
+    return {'dynamodb': images}
+
+
+# Tabla de estadísticas falsa: guarda las llamadas a update_item y put_item
+class StatsTable:
+    def __init__(self):
+        self.updates = []
+        self.puts = []
+
+    def update_item(self, **kwargs):
+        self.updates.append(kwargs)
+
+    def put_item(self, Item):
+        self.puts.append(Item)
+
+
+def test_deltas_net_out_within_a_batch():
+    records = [
+        _record(new_country='chile'),                      # alta
+        _record(new_country='chile'),
+        _record(old_country='chile', new_country='peru'),  # cambio de país
+        _record(old_country='peru'),                       # baja
+        _record(old_country='chile', new_country='chile'), # cambio sin mover el país
+        _record(new_country='peru'),
+        _record(old_country='peru'),
+    ]
+    # chile: +2 -1 = 1; peru: +1 -1 +1 -1 = 0 (no se escribe)
+    assert country_deltas(records) == {'chile': 1}
+
+
+def test_deltas_are_applied_with_one_update():
+    table = StatsTable()
+    apply_deltas(table, {'peru': -2, 'chile': 3})
+
+    assert len(table.updates) == 1
+    update = table.updates[0]
+    assert update['Key'] == COUNTRY_STATS_KEY
+    assert update['UpdateExpression'] == 'ADD #c0 :d0, #c1 :d1'
+    assert update['ExpressionAttributeNames'] == {'#c0': 'chile', '#c1': 'peru'}
+    assert update['ExpressionAttributeValues'] == {':d0': 3, ':d1': -2}
+
+    apply_deltas(table, {})
+    assert len(table.updates) == 1
+
+
+def test_stream_handler(monkeypatch):
+    table = StatsTable()
+    monkeypatch.setattr(runtime, 'table', lambda env_name: table)
+
+    event = {'Records': [_record(new_country='chile'), _record(old_country='chile')]}
+    assert countryStats.lambda_handler(event, None) == {'statusCode': 200, 'records': 2, 'countries': 0}
+    assert table.updates == []
+
+    countryStats.lambda_handler({'Records': [_record(new_country='chile')]}, None)
+    assert len(table.updates) == 1
+
+
+# Tabla de artistas falsa para el scan: una página por llamada
+class ArtistTable:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def scan(self, **kwargs):
+        start = kwargs.get('ExclusiveStartKey', {}).get('artist_id')
+        index = int(start) if start else 0
+        response = {'Items': [{'country': country} for country in self.pages[index]]}
+        if index + 1 < len(self.pages):
+            response['LastEvaluatedKey'] = {'artist_id': str(index + 1)}
+        return response
+
+
+class Context:
+    def get_remaining_time_in_millis(self):
+        return 1000
+
+
+# Sin tiempo devuelve los conteos parciales y el cursor; los contadores se guardan
+# solo al terminar el recorrido
+def test_rebuild_resumes_with_partial_counts(monkeypatch):
+    artists = ArtistTable([['chile', 'peru'], ['chile'], ['chile', None]])
+    stats = StatsTable()
+    tables = {'TABLE_NAME_ARTISTS': artists, 'TABLE_NAME_STATS': stats}
+    monkeypatch.setattr(runtime, 'table', lambda env_name: tables[env_name])
+
+    response = rebuildCountryStats.lambda_handler({}, Context())
+    assert (response['counts'], response['cursor']) == ({'chile': 1, 'peru': 1}, '1')
+    assert stats.puts == []
+
+    while response['cursor']:
+        response = rebuildCountryStats.lambda_handler(response, Context())
+    assert response['counts'] == {'chile': 3, 'peru': 1}
+    assert stats.puts == [{**COUNTRY_STATS_KEY, 'chile': 3, 'peru': 1}]
+
+
+def test_countries_endpoint(register):
+    register('a1', country='chile')
+    register('a2', country='chile')
+    register('a3', country='peru')
+
+    response = getCountries.lambda_handler({}, None)
+    assert response == {'statusCode': 200, 'countries': {'chile': 2, 'peru': 1}, 'total': 3}
@@ -0,0 +1,50 @@
+import pytest
+
+import getAllByCountry
+import getAllbyName
+import getInfoById
+import storage
+from artist_update import update_artist
+
+
+def _info(artist_id, etag=None):
+    headers = {'If-None-Match': etag} if etag else {}
+    return getInfoById.lambda_handler({'body': {'artist_id': artist_id}, 'headers': headers}, None)
+
+
+@pytest.mark.parametrize('header', ['{etag}', 'W/{etag}', '"otro", {etag}', '*'])
+def test_current_etag_is_304(register, header):
+    register('a1')
+    etag = _info('a1')['etag']
+
+    response = _info('a1', header.format(etag=etag))
+    assert response == {'statusCode': 304, 'etag': etag}
+
+
+def test_write_changes_the_etag(register):
+    register('a1')
+    etag = _info('a1')['etag']
+    update_artist(storage.artists(), 'a1', {'info': 'nueva'})
+
+    response = _info('a1', etag)
+    assert response['statusCode'] == 200
+    assert response['info'] == 'nueva'
+    assert response['etag'] != etag
+
+
+def test_list_etags(register):
+    register('a1', name='uno')
+    register('a2', name='uno')
+
+    by_name = getAllbyName.lambda_handler({'body': {'name': 'uno'}}, None)
+    headers = {'If-None-Match': by_name['etag']}
+    assert getAllbyName.lambda_handler({'body': {'name': 'uno'}, 'headers': headers}, None)['statusCode'] == 304
+    # Otros atributos pedidos son otra respuesta
+    assert getAllbyName.lambda_handler({'body': {'name': 'uno', 'fields': 'name'}, 'headers': headers}, None)['statusCode'] == 200
+
+    by_country = getAllByCountry.lambda_handler({'body': {'country': 'chile'}}, None)
+    headers = {'If-None-Match': by_country['etag']}
+    assert getAllByCountry.lambda_handler({'body': {'country': 'chile'}, 'headers': headers}, None)['statusCode'] == 304
+
+    update_artist(storage.artists(), 'a2', {'info': 'nueva'})
+    assert getAllByCountry.lambda_handler({'body': {'country': 'chile'}, 'headers': headers}, None)['statusCode'] == 200
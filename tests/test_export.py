@@ -0,0 +1,85 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import exportArtists
+
+SEGMENTS = 3
+
+
+# Tabla falsa con scan paralelo: el segmento de cada artista es su posición módulo
+# TotalSegments y las páginas tienen 'Limit' items. 'fail_at' hace fallar una
+# llamada (segmento, ExclusiveStartKey) una vez.
+class SegmentedTable:
+    def __init__(self, items):
+        self.items = items
+        self.fail_at = None
+
+    def scan(self, Segment, TotalSegments, Limit, ExclusiveStartKey=None, **kwargs):
+        if self.fail_at == (Segment, (ExclusiveStartKey or {}).get('artist_id')):
+            self.fail_at = None
+            raise RuntimeError('ProvisionedThroughputExceededException')
+        rows = [item for i, item in enumerate(self.items) if i % TotalSegments == Segment]
+        start = 0
+        if ExclusiveStartKey:
+            start = [row['artist_id'] for row in rows].index(ExclusiveStartKey['artist_id']) + 1
+        page = rows[start:start + Limit]
+        response = {'Items': [dict(row) for row in page], 'ConsumedCapacity': {'CapacityUnits': 1.0}}
+        if start + Limit < len(rows):
+            response['LastEvaluatedKey'] = {'artist_id': page[-1]['artist_id']}
+        return response
+
+
+@pytest.fixture
+def table(monkeypatch):
+    items = [{'artist_id': f"a{i:02d}", 'name': f"n{i}", 'password': 'hash', 'idempotency_key': 'k'}
+             for i in range(20)]
+    table = SegmentedTable(items)
+    monkeypatch.setattr(exportArtists.runtime, 'table', lambda env_name: table)
+    return table
+
+
+def _exported(destination):
+    rows = []
+    for file_name in sorted(os.listdir(destination)):
+        if file_name.endswith('.ndjson.gz'):
+            with gzip.open(os.path.join(destination, file_name), 'rt', encoding='utf-8') as f:
+                rows += [json.loads(line) for line in f]
+    return rows
+
+
+def _run(destination):
+    return exportArtists.run_export(str(destination), str(destination / 'export.checkpoint.json'), SEGMENTS, SEGMENTS, 2)
+
+
+def test_export_writes_every_artist_without_secrets(tmp_path, table):
+    summary = _run(tmp_path)
+
+    assert summary['items'] == 20
+    assert summary['failed_segments'] == []
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.ndjson.gz')]) == SEGMENTS
+    rows = _exported(tmp_path)
+    assert sorted(row['artist_id'] for row in rows) == [f"a{i:02d}" for i in range(20)]
+    assert all('password' not in row and 'idempotency_key' not in row for row in rows)
+
+
+# Un segmento que falla conserva su checkpoint; al reanudar continúa desde la última
+# página escrita, sin repetir ni perder artistas, y los segmentos terminados no se leen
+def test_failed_segment_resumes_from_its_checkpoint(tmp_path, table):
+    table.fail_at = (0, 'a09')
+    first = _run(tmp_path)
+    assert first['failed_segments'] == [0]
+
+    second = _run(tmp_path)
+    assert second['failed_segments'] == []
+    assert [report.get('skipped', False) for report in second['segments']] == [False, True, True]
+    rows = _exported(tmp_path)
+    assert sorted(row['artist_id'] for row in rows) == [f"a{i:02d}" for i in range(20)]
+
+
+def test_checkpoint_of_another_export_is_rejected(tmp_path, table):
+    _run(tmp_path)
+    with pytest.raises(SystemExit):
+        exportArtists.run_export(str(tmp_path), str(tmp_path / 'export.checkpoint.json'), SEGMENTS + 1, 1, 2)
@@ -0,0 +1,44 @@
+import logoutArtist
+import storage
+import token_utils
+from token_utils import authorize_request
+
+
+def _event(body, token):
+    return {'body': body, 'headers': {'Authorization': token}}
+
+
+def test_logout_invalidates_opaque_token(register, login):
+    register('a1')
+    session = login('a1')
+
+    response = logoutArtist.lambda_handler(_event({'artist_id': 'a1'}, session['token']), None)
+    assert response['statusCode'] == 200
+    assert authorize_request(_event({'artist_id': 'a1'}, session['token']), storage.tokens(), session['token'])[1]['statusCode'] == 403
+
+
+def test_logout_revokes_signed_token(register, login, signed_tokens, monkeypatch):
+    # Sin la cache de la lista de revocación (REVOCATION_CACHE_SECONDS por contenedor)
+    monkeypatch.setattr(token_utils, 'REVOCATION_CACHE_SECONDS', -1)
+    register('a1')
+    session = login('a1')
+    tokens = storage.tokens()
+    assert authorize_request(_event({'artist_id': 'a1'}, session['token']), tokens, session['token']) == ('a1', None)
+
+    response = logoutArtist.lambda_handler(_event({'artist_id': 'a1'}, session['token']), None)
+    assert response['statusCode'] == 200
+    assert authorize_request(_event({'artist_id': 'a1'}, session['token']), tokens, session['token'])[1]['statusCode'] == 403
+
+
+# Una firma con texto que no es ASCII es un token inválido, no un error interno
+def test_non_ascii_signature_is_403(register, login, signed_tokens):
+    import ValidateToken_A
+
+    register('a1')
+    payload = login('a1')['token'].split('.')[0]
+    token = f"{payload}.firmañ"
+
+    assert token_utils.verify_signed_token(token, 'a1') is None
+    assert ValidateToken_A.lambda_handler({'artist_id': 'a1', 'token': token}, None)['statusCode'] == 403
+    assert authorize_request(_event({'artist_id': 'a1'}, token), storage.tokens(), token)[1]['statusCode'] == 403
+    assert logoutArtist.lambda_handler(_event({'artist_id': 'a1'}, token), None)['statusCode'] == 403
@@ -0,0 +1,100 @@
+import json
+
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+
+import metrics
+from country_shards import fetch_parallel
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', True)
+    monkeypatch.setattr(metrics, 'METRICS_EMF', True)
+    monkeypatch.setattr(metrics, 'DEBUG_SAMPLE_RATE', 0)
+
+
+def _emf_lines(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if '_aws' in line]
+
+
+def test_request_emits_one_emf_line(enabled, capsys):
+    with metrics.request('getInfo', {}) as recorder:
+        with metrics.phase('auth'):
+            pass
+        metrics.count('CacheHits')
+        metrics.count('CacheHits', 2)
+        recorder.finish({'statusCode': 200})
+
+    [line] = _emf_lines(capsys)
+    assert line['Function'] == 'getInfo'
+    assert line['StatusCode'] == 200
+    assert line['CacheHits'] == 3
+    assert 'auth' in line['phases'] and 'AuthMs' in line
+    names = [metric['Name'] for metric in line['_aws']['CloudWatchMetrics'][0]['Metrics']]
+    assert {'LatencyMs', 'DynamoDBMs', 'DynamoDBCalls', 'CacheHits', 'AuthMs'} <= set(names)
+    # Fuera de una petición las fases y contadores no hacen nada
+    assert metrics.current() is None
+    assert metrics.last() is recorder
+
+
+def test_disabled_metrics_do_not_record(capsys):
+    with metrics.request('getInfo', {}) as recorder:
+        metrics.count('CacheHits')
+    assert recorder is None
+    assert _emf_lines(capsys) == []
+
+
+def test_sampled_requests_log_a_redacted_event(enabled, monkeypatch, capsys):
+    monkeypatch.setattr(metrics, 'DEBUG_SAMPLE_RATE', 1)
+    event = {'body': {'artist_id': 'a1', 'password': 'secreto'}, 'headers': {'Authorization': 'tok'}}
+    with metrics.request('loginArtist', event) as recorder:
+        recorder.finish({'statusCode': 200, 'token': 'x'})
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    debug = next(line for line in lines if 'debug' in line)
+    assert debug['event'] == {'body': {'artist_id': 'a1', 'password': '***'}, 'headers': {'Authorization': '***'}}
+    emf = next(line for line in lines if '_aws' in line)
+    assert emf['ResponseBytes'] > 0 and 'SerializeMs' in emf
+
+
+# Las consultas del pool de country_shards se cuentan en la petición que las originó
+def test_parallel_calls_count_in_the_request(enabled, capsys):
+    with metrics.request('getAllByCountry', {}) as recorder:
+        fetch_parallel(lambda n: metrics.count('CacheMisses', n), [(1,), (2,), (3,)])
+    assert recorder.counters == {'CacheMisses': 6}
+
+
+# Respuesta HTTP falsa de DynamoDB: los hooks de botocore se ejecutan completos
+class RawBody:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def test_dynamodb_calls_record_time_and_capacity(enabled, monkeypatch, capsys):
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    client = boto3.client('dynamodb', aws_access_key_id='x', aws_secret_access_key='x')
+    metrics.install(client)
+    requests = []
+
+    def send(request, **kwargs):
+        body = json.loads(request.body)
+        requests.append(body)
+        units = 1.0 if 'Item' in body else 0.5
+        payload = json.dumps({'ConsumedCapacity': {'TableName': 't', 'CapacityUnits': units}}).encode()
+        return AWSResponse(request.url, 200, {}, RawBody(payload))
+    client.meta.events.register('before-send.dynamodb.*', send)
+
+    with metrics.request('getInfo', {}) as recorder:
+        client.get_item(TableName='t', Key={'artist_id': {'S': 'a1'}})
+        client.put_item(TableName='t', Item={'artist_id': {'S': 'a1'}})
+
+    # Cada llamada pide su capacidad consumida
+    assert all(body['ReturnConsumedCapacity'] == 'TOTAL' for body in requests)
+    assert recorder.dynamodb_calls == 2
+    assert (recorder.rcu, recorder.wcu) == (0.5, 1.0)
+    assert {'dynamodb.GetItem', 'dynamodb.PutItem'} <= set(recorder.phases)
@@ -0,0 +1,103 @@
+import getAllbyName
+import name_index
+from name_index import name_grams, search_names, update_name_index
+
+
+# Tabla de trigramas falsa: guarda (gram, artist_id) -> name y pagina las consultas
+# en orden de artist_id como Table.query
+class NgramTable:
+    def __init__(self):
+        self.items = {}
+        self.queries = 0
+
+    def batch_writer(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def put_item(self, Item):
+        self.items[(Item['gram'], Item['artist_id'])] = Item['name']
+
+    def delete_item(self, Key):
+        self.items.pop((Key['gram'], Key['artist_id']), None)
+
+    def query(self, KeyConditionExpression, Limit, ExclusiveStartKey=None, **kwargs):
+        self.queries += 1
+        gram = KeyConditionExpression.get_expression()['values'][1]
+        rows = sorted(
+            (artist_id, name) for (g, artist_id), name in self.items.items()
+            if g == gram and (not ExclusiveStartKey or artist_id > ExclusiveStartKey['artist_id'])
+        )
+        page = [{'artist_id': artist_id, 'name': name} for artist_id, name in rows[:Limit]]
+        response = {'Items': page}
+        if len(rows) > Limit:
+            response['LastEvaluatedKey'] = {'gram': gram, 'artist_id': page[-1]['artist_id']}
+        return response
+
+
+def test_rename_updates_the_grams():
+    table = NgramTable()
+    update_name_index(table, 'a1', None, ' The Cure ')
+    assert {gram for gram, _ in table.items} == name_grams('the cure')
+
+    update_name_index(table, 'a1', 'the cure', 'the curse')
+    assert {gram for gram, _ in table.items} == name_grams('the curse')
+    assert set(table.items.values()) == {'the curse'}
+
+
+def test_search_confirms_the_substring():
+    table = NgramTable()
+    for artist_id, name in [('a3', 'the cure'), ('a1', 'cured'), ('a2', 'cu re'), ('a4', 'blur')]:
+        update_name_index(table, artist_id, None, name)
+
+    assert search_names(table, 'CURE', 10) == ['a1', 'a3']
+    assert search_names(table, 'cure', 1) == ['a1']
+    # Más corta que un trigrama: el índice no la resuelve
+    assert search_names(table, 'cu', 10) == []
+    assert search_names(table, 'zzz', 10) == []
+
+
+def test_search_stops_at_the_rarest_gram(monkeypatch):
+    monkeypatch.setattr(name_index, 'POSTINGS_PAGE_SIZE', 2)
+    table = NgramTable()
+    # 'abc' es común y 'bcd' aparece una sola vez
+    for n in range(20):
+        update_name_index(table, f"a{n:02d}", None, f"abc {n}")
+    update_name_index(table, 'b01', None, 'abcd')
+
+    assert search_names(table, 'abcd', 10) == ['b01']
+    assert table.queries == 2
+
+
+def test_search_cost_is_bounded(monkeypatch):
+    monkeypatch.setattr(name_index, 'POSTINGS_PAGE_SIZE', 2)
+    monkeypatch.setattr(name_index, 'MAX_POSTING_PAGES', 3)
+    table = NgramTable()
+    for n in range(20):
+        update_name_index(table, f"a{n:02d}", None, f"xabcd {n}")
+
+    # Ningún trigrama se termina ni junta el límite: se devuelve lo encontrado
+    found = search_names(table, 'abcd', 50)
+    assert table.queries == 3 * len(name_grams('abcd'))
+    assert found == [f"a{n:02d}" for n in range(6)]
+
+
+def test_get_by_name_falls_back_to_substring(register):
+    register('a2', name='the cure')
+    register('a1', name='cured')
+    register('a3', name='blur')
+
+    exact = getAllbyName.lambda_handler({'body': {'name': 'Blur'}}, None)
+    assert [item['artist_id'] for item in exact['body']['artists']] == ['a3']
+
+    partial = getAllbyName.lambda_handler({'body': {'name': 'cure'}}, None)
+    assert partial['statusCode'] == 200
+    assert [item['artist_id'] for item in partial['body']['artists']] == ['a1', 'a2']
+    assert all('password' not in item for item in partial['body']['artists'])
+
+    assert getAllbyName.lambda_handler({'body': {'name': 'zzz'}}, None)['statusCode'] == 404
+    assert getAllbyName.lambda_handler({'body': {}}, None)['statusCode'] == 400
@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+import pytest
+
+import getAllByCountry
+from pagination import InvalidPageRequest, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    key = {'artist_id': 'a1', 'country': 'chile', 'version': Decimal('3'), 'score': Decimal('1.5')}
+    assert decode_cursor(encode_cursor(key)) == key
+    assert encode_cursor(None) is None and decode_cursor(None) is None
+
+
+@pytest.mark.parametrize('cursor', ['%%%', encode_cursor({'a': 1})[:-2] + '!!', 'WzEsMl0='])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidPageRequest):
+        decode_cursor(cursor)
+
+
+def test_country_pages_cover_every_artist(register, country_pages):
+    ids = [register(f"a{i:02d}", name=f"artist {i:02d}") for i in range(23)]
+    register('otro', country='peru')
+
+    users, pages = country_pages({'country': 'chile', 'limit': 5})
+    assert sorted(users) == ids
+    assert pages == 5
+
+
+def test_cursor_belongs_to_its_query(register):
+    for i in range(3):
+        register(f"a{i}")
+    cursor = getAllByCountry.lambda_handler({'body': {'country': 'chile', 'limit': 1}}, None)['next_cursor']
+
+    for body in ({'country': 'peru'}, {'country': 'chile', 'sort': 'asc'}):
+        response = getAllByCountry.lambda_handler({'body': {**body, 'cursor': cursor}}, None)
+        assert response['statusCode'] == 400
@@ -0,0 +1,47 @@
+import pytest
+
+import registerArtist
+import storage
+import storage_memory
+
+
+def _register(idempotency_key, artist_id='a1', name='the band'):
+    event = {
+        'body': {'artist_id': artist_id, 'name': name, 'country': 'chile', 'password': 'secreto'},
+        'headers': {'Idempotency-Key': idempotency_key}
+    }
+    return registerArtist.lambda_handler(event, None)
+
+
+def test_retry_with_same_key_returns_the_original_result():
+    assert _register('k1')['statusCode'] == 200
+    assert _register('k1')['statusCode'] == 200
+    assert _register('k2')['statusCode'] == 400
+    assert storage.artists().get('a1')['version'] == 1
+
+
+# Si la indexación del nombre falla después de guardar el artista, el reintento
+# con la misma clave la completa
+def test_retry_rebuilds_the_name_index(monkeypatch):
+    names = {}
+
+    def update_name_index(self, artist_id, old_name, new_name):
+        if not names.get('fail_once'):
+            names['fail_once'] = True
+            raise RuntimeError('timeout')
+        names[artist_id] = new_name
+    monkeypatch.setattr(storage_memory.ArtistStore, 'update_name_index', update_name_index)
+
+    assert _register('k1')['statusCode'] == 500
+    assert 'a1' not in names
+
+    assert _register('k1')['statusCode'] == 200
+    assert names['a1'] == 'the band'
+
+
+@pytest.mark.parametrize('body', [
+    {'artist_id': 'a1', 'country': 'chile', 'password': 'secreto'},
+    {'artist_id': 'a1', 'name': 'x', 'country': 'chile 2', 'password': 'secreto'},
+])
+def test_invalid_registration_is_400(body):
+    assert registerArtist.lambda_handler({'body': body}, None)['statusCode'] == 400
@@ -0,0 +1,72 @@
+import threading
+
+import runtime
+
+
+# Cada hilo tiene su recurso de DynamoDB y sus tablas; dentro de un hilo se reutilizan
+def test_resources_are_per_thread(monkeypatch):
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+    monkeypatch.setattr(runtime, '_local', threading.local())
+
+    def resources():
+        return runtime.dynamodb(), runtime.table('TABLE_NAME_ARTISTS')
+
+    main = resources()
+    assert resources() == main
+
+    other = []
+    thread = threading.Thread(target=lambda: other.extend(resources()))
+    thread.start()
+    thread.join()
+    assert other[0] is not main[0]
+    assert other[1] is not main[1]
+    assert other[1].name == main[1].name
+
+
+# Tabla falsa con páginas de 2 artistas, como Table.scan con Limit
+class PagedTable:
+    def __init__(self, artist_ids):
+        self.artist_ids = artist_ids
+        self.calls = []
+
+    def scan(self, **kwargs):
+        self.calls.append(kwargs)
+        start = kwargs.get('ExclusiveStartKey', {}).get('artist_id')
+        index = self.artist_ids.index(start) + 1 if start else 0
+        page = self.artist_ids[index:index + 2]
+        response = {'Items': [{'artist_id': artist_id} for artist_id in page]}
+        if index + 2 < len(self.artist_ids):
+            response['LastEvaluatedKey'] = {'artist_id': page[-1]}
+        return response
+
+
+class Context:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+def test_resume_pages_runs_to_the_end():
+    table = PagedTable(['a', 'b', 'c', 'd', 'e'])
+    seen = []
+    fetch_page = runtime.artist_scan(table, ProjectionExpression='artist_id')
+
+    assert runtime.resume_pages(fetch_page, lambda items: seen.extend(items), None, Context(60000)) is None
+    assert [item['artist_id'] for item in seen] == ['a', 'b', 'c', 'd', 'e']
+    assert all(call['ProjectionExpression'] == 'artist_id' for call in table.calls)
+
+
+# Sin tiempo suficiente devuelve el cursor después de cada página, y continuar desde
+# él no repite ni salta artistas
+def test_resume_pages_returns_the_cursor_near_the_timeout():
+    table = PagedTable(['a', 'b', 'c', 'd', 'e'])
+    fetch_page = runtime.artist_scan(table)
+    seen = []
+
+    cursor = runtime.resume_pages(fetch_page, lambda items: seen.extend(items), None, Context(1000))
+    assert cursor == 'b'
+    while cursor:
+        cursor = runtime.resume_pages(fetch_page, lambda items: seen.extend(items), cursor, Context(1000))
+    assert [item['artist_id'] for item in seen] == ['a', 'b', 'c', 'd', 'e']
@@ -0,0 +1,121 @@
+import pytest
+
+import storage_memory
+import storage_sqlite
+from storage import ArtistRepository, ConditionFailed, TokenRepository
+
+
+# Los dos backends locales tienen que devolver lo mismo que DynamoDB
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path, monkeypatch):
+    if request.param == 'memory':
+        yield storage_memory
+        return
+    monkeypatch.setattr(storage_sqlite, 'SQLITE_PATH', str(tmp_path / 'storage.sqlite3'))
+    monkeypatch.setattr(storage_sqlite, '_connection', None)
+    yield storage_sqlite
+    storage_sqlite._connection.close()
+
+
+def _artist(artist_id, name, country='chile'):
+    return {'artist_id': artist_id, 'name': name, 'country': country, 'password': 'hash', 'version': 1}
+
+
+def test_create_and_update_conditions(backend):
+    artists = backend.ArtistStore()
+    artists.create(_artist('a1', 'blur'))
+
+    with pytest.raises(ConditionFailed) as failed:
+        artists.create(_artist('a1', 'otro'))
+    assert failed.value.item['name'] == 'blur'
+
+    old = artists.update('a1', {'name': 'oasis'}, password='hash', expected_version=1)
+    assert old['name'] == 'blur'
+    assert artists.get('a1', fields=['name', 'version']) == {'name': 'oasis', 'version': 2}
+    assert artists.by_name('oasis', fields=['artist_id']) == [{'artist_id': 'a1'}]
+    assert artists.by_name('blur') == []
+
+    with pytest.raises(ConditionFailed):
+        artists.update('a1', {'name': 'x'}, expected_version=1)
+    with pytest.raises(ConditionFailed):
+        artists.update('a1', {'name': 'x'}, password='otra')
+    with pytest.raises(ConditionFailed) as failed:
+        artists.update('a9', {'name': 'x'})
+    assert failed.value.item is None
+
+
+def test_country_pages_follow_the_index(backend):
+    artists = backend.ArtistStore()
+    artists.put_many([_artist(f"a{n}", f"n{n}") for n in range(5)] + [_artist('b1', 'x', country='peru')])
+
+    pages, start_key = [], None
+    while True:
+        items, start_key = artists.by_country('chile', 2, start_key, fields=['artist_id'])
+        pages.append([item['artist_id'] for item in items])
+        if not start_key:
+            break
+    assert pages == [['a0', 'a1'], ['a2', 'a3'], ['a4']]
+    assert artists.country_counts() == {'chile': 5, 'peru': 1}
+    assert sorted(item['artist_id'] for item in artists.batch_get(['a1', 'b1', 'zz'])) == ['a1', 'b1']
+
+
+def test_country_name_ranges(backend):
+    artists = backend.ArtistStore()
+    artists.put_many([_artist('a1', 'beta'), _artist('a2', 'alpha'), _artist('a3', 'beta'), _artist('a4', 'gamma')])
+
+    def names(**kwargs):
+        items, _ = artists.by_country_name('chile', 10, fields=['artist_id'], **kwargs)
+        return [item['artist_id'] for item in items]
+
+    assert names() == ['a2', 'a1', 'a3', 'a4']
+    assert names(descending=True) == ['a4', 'a3', 'a1', 'a2']
+    assert names(name_condition=('begins_with', 'be')) == ['a1', 'a3']
+    assert names(name_condition=('between', 'b', 'c')) == ['a1', 'a3']
+
+    items, start_key = artists.by_country_name('chile', 2)
+    assert start_key == {'artist_id': 'a1', 'country': 'chile', 'name': 'beta'}
+    items, start_key = artists.by_country_name('chile', 2, start_key)
+    assert [item['artist_id'] for item in items] == ['a3', 'a4']
+    assert start_key is None
+
+
+def test_name_search_and_suggestions(backend):
+    artists = backend.ArtistStore()
+    artists.put_many([_artist('a2', 'the cure'), _artist('a1', 'cured'), _artist('a3', 'blur')])
+
+    assert artists.search_names('CURE', 10) == ['a1', 'a2']
+    assert artists.search_names('cu', 10) == []
+    assert artists.suggest_names('cu', 10) == [{'name': 'cured', 'artist_id': 'a1'}]
+
+
+def test_token_rotation(backend):
+    tokens = backend.TokenStore()
+    tokens.put({'artist_id': 'a1', 'token': 't1', 'refresh_token': 'r1', 'token_expiry': 'e1', 'refresh_token_expiry': 'x'})
+
+    new_item = {'artist_id': 'a1', 'token': 't2', 'refresh_token': 'r2', 'token_expiry': 'e2', 'refresh_token_expiry': 'y'}
+    tokens.rotate('a1', 't1', 'r1', new_item, 123)
+    assert tokens.get('a1', 't1')['replaced_by'] == 't2'
+    assert tokens.sessions('a1') == [{'token': 't2', 'token_expiry': 'e2', 'refresh_token_expiry': 'y'}]
+
+    with pytest.raises(ConditionFailed):
+        tokens.rotate('a1', 't1', 'r1', {'artist_id': 'a1', 'token': 't3'}, 123)
+
+    tokens.add_revoked(['j1:1', 'j2:2'])
+    tokens.remove_revoked(['j1:1'])
+    assert tokens.revoked() == {'j2:2'}
+
+
+# Un backend incompleto falla al crearlo, no cuando una petición usa el método que falta
+def test_incomplete_backend_fails_on_creation():
+    Incomplete = type('Incomplete', (ArtistRepository,), {
+        name: getattr(storage_memory.ArtistStore, name)
+        for name in ArtistRepository.__abstractmethods__ - {'suggest_names'}
+    })
+
+    with pytest.raises(TypeError, match='suggest_names'):
+        Incomplete()
+    with pytest.raises(TypeError):
+        TokenRepository()
+    for backend in (storage_memory, storage_sqlite):
+        backend.ArtistStore()
+        backend.TokenStore()
@@ -0,0 +1,81 @@
+import pytest
+
+import changeName
+import suggestArtists
+from name_prefix import update_prefix_index
+
+
+def _suggest(prefix, limit=None):
+    query = {'prefix': prefix}
+    if limit is not None:
+        query['limit'] = limit
+    return suggestArtists.lambda_handler({'query': query}, None)
+
+
+def _names(response):
+    return [(item['name'], item['artist_id']) for item in response['suggestions']]
+
+
+def test_suggestions_are_sorted_and_limited(register):
+    register('a3', name='the cure')
+    register('a1', name='the beatles')
+    register('a2', name='the beatles')
+    register('a4', name='thin lizzy')
+    register('a5', name='blur')
+
+    response = _suggest(' The B')
+    assert response['statusCode'] == 200
+    assert response['prefix'] == 'the b'
+    assert _names(response) == [('the beatles', 'a1'), ('the beatles', 'a2')]
+
+    assert _names(_suggest('th', limit=3)) == [('the beatles', 'a1'), ('the beatles', 'a2'), ('the cure', 'a3')]
+    assert _suggest('zz')['suggestions'] == []
+
+
+@pytest.mark.parametrize('prefix, limit', [('t', None), ('', None), ('th', '0'), ('th', 'diez'), ('th', '51')])
+def test_invalid_suggest_is_400(prefix, limit):
+    assert _suggest(prefix, limit)['statusCode'] == 400
+
+
+def test_rename_moves_the_suggestion(register, login):
+    register('a1', name='blur')
+    token = login('a1')['token']
+    event = {'body': {'new_name': 'oasis'}, 'headers': {'Authorization': token}, 'auth': {'artist_id': 'a1'}}
+    assert changeName.lambda_handler(event, None)['statusCode'] == 200
+
+    assert _suggest('bl')['suggestions'] == []
+    assert _names(_suggest('oa')) == [('oasis', 'a1')]
+
+
+# Tabla de prefijos falsa: registra las escrituras
+class PrefixTable:
+    def __init__(self):
+        self.calls = []
+
+    def put_item(self, Item):
+        self.calls.append(('put', Item))
+
+    def delete_item(self, Key):
+        self.calls.append(('delete', Key))
+
+
+def test_prefix_index_rows():
+    table = PrefixTable()
+    update_prefix_index(table, 'a1', None, 'Blur')
+    update_prefix_index(table, 'a1', 'blur', 'Oasis')
+    # Sin cambio de nombre normalizado no se elimina el registro
+    update_prefix_index(table, 'a1', 'oasis', 'OASIS')
+
+    assert table.calls == [
+        ('put', {'bucket': 'bl', 'sort_key': 'blur#a1', 'name': 'blur', 'artist_id': 'a1'}),
+        ('delete', {'bucket': 'bl', 'sort_key': 'blur#a1'}),
+        ('put', {'bucket': 'oa', 'sort_key': 'oasis#a1', 'name': 'oasis', 'artist_id': 'a1'}),
+        ('put', {'bucket': 'oa', 'sort_key': 'oasis#a1', 'name': 'oasis', 'artist_id': 'a1'}),
+    ]
+
+
+# Los handlers que escriben los índices de nombres los inicializan en el warm-up
+@pytest.mark.parametrize('module', ['registerArtist', 'changeName', 'updateArtist'])
+def test_name_writers_warm_up_the_prefix_table(module):
+    handler = __import__(module).lambda_handler
+    assert {'TABLE_NAME_NGRAMS', 'TABLE_NAME_PREFIXES'} <= set(handler.env_tables)
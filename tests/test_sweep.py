@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import storage
+import sweepTokens
+from storage_memory import TokenStore
+
+
+def _session(artist_id, token, refresh_token_expiry, expires_at=None):
+    item = {'artist_id': artist_id, 'token': token, 'refresh_token': f"r-{token}",
+            'token_expiry': refresh_token_expiry.isoformat(), 'refresh_token_expiry': refresh_token_expiry.isoformat()}
+    if expires_at is not None:
+        item['expires_at'] = int(expires_at.timestamp())
+    storage.tokens().put(item)
+
+
+# expires_at decide cuando existe; los registros anteriores a ese atributo se
+# barren según refresh_token_expiry
+def test_expired_page_uses_expires_at_or_refresh_expiry():
+    now = datetime.now()
+    past, future = now - timedelta(hours=1), now + timedelta(hours=1)
+    _session('a1', 'vencido', past, expires_at=past)
+    _session('a1', 'vigente', future, expires_at=future)
+    # Registro reemplazado: expires_at es el fin del periodo de gracia
+    _session('a1', 'en-gracia', future, expires_at=past)
+    _session('a2', 'antiguo-vencido', past)
+    _session('a2', 'antiguo-vigente', future)
+
+    keys, scanned, _, cursor = storage.tokens().expired_page(now)
+    assert sorted(keys) == [('a1', 'en-gracia'), ('a1', 'vencido'), ('a2', 'antiguo-vencido')]
+    assert scanned == 5
+    assert cursor is None
+
+
+def test_sweep_deletes_expired_sessions():
+    now = datetime.now()
+    _session('a1', 'vencido', now - timedelta(days=1), expires_at=now - timedelta(days=1))
+    _session('a1', 'vigente', now + timedelta(days=1), expires_at=now + timedelta(days=1))
+
+    response = sweepTokens.lambda_handler({}, None)
+    assert response['statusCode'] == 200
+    assert response['cursor'] is None
+    assert (response['metrics']['deleted'], response['metrics']['pages']) == (1, 1)
+    assert [item['token'] for item in storage.tokens().sessions('a1')] == ['vigente']
+
+
+class Context:
+    def get_remaining_time_in_millis(self):
+        return 1000
+
+
+# Sin tiempo suficiente el barrido devuelve el cursor de la página siguiente, y la
+# próxima invocación continúa desde él
+def test_sweep_resumes_from_its_cursor(monkeypatch):
+    pages = {None: ([('a1', 't1')], 'p2'), 'p2': ([('a1', 't2')], None)}
+    cursors = []
+
+    def expired_page(self, now, start_key=None):
+        cursors.append(start_key)
+        keys, cursor = pages[start_key]
+        return keys, len(keys), 0.5, cursor
+    monkeypatch.setattr(TokenStore, 'expired_page', expired_page)
+    deleted = []
+    monkeypatch.setattr(TokenStore, 'delete_many', lambda self, keys: deleted.extend(keys))
+
+    first = sweepTokens.lambda_handler({}, Context())
+    assert first['cursor'] == 'p2'
+    second = sweepTokens.lambda_handler({'cursor': first['cursor']}, Context())
+    assert second['cursor'] is None
+    assert cursors == [None, 'p2']
+    assert deleted == [('a1', 't1'), ('a1', 't2')]
@@ -0,0 +1,171 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+
+import refreshToken
+import storage
+import token_utils
+from storage import ConditionFailed, TransactionConflict
+from token_utils import rotate_tokens, token_key_for, validate_token
+
+
+def _refresh(artist_id, session):
+    body = {'artist_id': artist_id, 'token': session['token'], 'refresh_token': session['refresh_token']}
+    return refreshToken.lambda_handler({'body': body}, None)
+
+
+def test_rotation_replaces_the_session(register, login):
+    register('a1')
+    session = login('a1')
+
+    rotated = _refresh('a1', session)
+    assert rotated['statusCode'] == 200
+    assert rotated['token'] != session['token']
+    assert rotated['refresh_token'] != session['refresh_token']
+
+    tokens = storage.tokens()
+    assert validate_token(tokens, 'a1', rotated['token'])['statusCode'] == 200
+    assert validate_token(tokens, 'a1', session['token'])['statusCode'] == 403
+    # La sesión reemplazada no cuenta para el límite de sesiones
+    assert [item['token'] for item in tokens.sessions('a1')] == [token_key_for('a1', rotated['token'])]
+
+
+def test_retried_rotation_converges(register, login):
+    register('a1')
+    session = login('a1')
+
+    first = _refresh('a1', session)
+    second = _refresh('a1', session)
+    assert second == first
+
+
+def test_concurrent_rotations_converge(register, login):
+    register('a1')
+    session = login('a1')
+    tokens = storage.tokens()
+    token_key = token_key_for('a1', session['token'])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(
+            lambda _: rotate_tokens(tokens, 'a1', token_key, session['refresh_token']),
+            range(16)
+        ))
+
+    assert all(result['statusCode'] == 200 for result in results)
+    assert len({(result['token'], result['refresh_token']) for result in results}) == 1
+    assert len(tokens.sessions('a1')) == 1
+
+
+def test_signed_rotations_converge(register, login, signed_tokens, monkeypatch):
+    monkeypatch.setattr(token_utils, 'REVOCATION_CACHE_SECONDS', -1)
+    register('a1')
+    session = login('a1')
+
+    first = _refresh('a1', session)
+    assert first['statusCode'] == 200
+    # Los tokens firmados se vuelven a emitir iguales para el reintento
+    assert _refresh('a1', session) == first
+    assert validate_token(storage.tokens(), 'a1', first['token'])['statusCode'] == 200
+    # El token firmado anterior queda revocado hasta su expiración
+    assert validate_token(storage.tokens(), 'a1', session['token'])['statusCode'] == 403
+
+
+def test_rotation_rejects_wrong_refresh_token(register, login):
+    register('a1')
+    session = login('a1')
+
+    response = _refresh('a1', {**session, 'refresh_token': 'otro'})
+    assert response['statusCode'] == 403
+    assert validate_token(storage.tokens(), 'a1', session['token'])['statusCode'] == 200
+
+
+def test_replay_after_grace_window_is_rejected(register, login, monkeypatch):
+    register('a1')
+    session = login('a1')
+    rotated = _refresh('a1', session)
+    assert rotated['statusCode'] == 200
+
+    # El registro reemplazado sigue en la tabla (el TTL no lo eliminó todavía)
+    later = time.time() + token_utils.REFRESH_GRACE_SECONDS + 1
+    monkeypatch.setattr(token_utils.time, 'time', lambda: later)
+    assert _refresh('a1', session)['statusCode'] == 403
+    assert validate_token(storage.tokens(), 'a1', rotated['token'])['statusCode'] == 200
+
+
+def test_replay_of_a_twice_rotated_session_is_rejected(register, login):
+    register('a1')
+    session = login('a1')
+    rotated = _refresh('a1', session)
+    assert _refresh('a1', rotated)['statusCode'] == 200
+
+    # El sucesor del registro original también fue reemplazado: su token ya no sirve
+    assert _refresh('a1', session)['statusCode'] == 403
+
+
+# La renovación que choca con otra en curso (TransactionConflict) espera, vuelve a
+# leer la sesión y devuelve el resultado de la ganadora
+def test_conflicting_rotation_converges(register, login, monkeypatch):
+    register('a1')
+    session = login('a1')
+    tokens = storage.tokens()
+    token_key = token_key_for('a1', session['token'])
+    monkeypatch.setattr(token_utils, 'backoff', lambda attempt: None)
+
+    rotate = type(tokens).rotate
+    winner = {}
+
+    def conflicting_rotate(self, artist_id, token, refresh_token, new_item, grace_expires_at):
+        # La otra transacción termina mientras esta se cancela
+        winner.update(new_item, token='ganadora', refresh_token='refresh-ganadora')
+        rotate(self, artist_id, token, refresh_token, dict(winner), grace_expires_at)
+        raise TransactionConflict()
+    monkeypatch.setattr(type(tokens), 'rotate', conflicting_rotate)
+
+    result = rotate_tokens(tokens, 'a1', token_key, session['refresh_token'])
+    assert result['statusCode'] == 200
+    assert (result['token'], result['refresh_token']) == ('ganadora', 'refresh-ganadora')
+
+
+def test_dynamodb_rotation_maps_cancellation_reasons(monkeypatch):
+    import storage_dynamodb
+
+    def cancel(*codes):
+        error = ClientError({
+            'Error': {'Code': 'TransactionCanceledException', 'Message': ''},
+            'CancellationReasons': [{'Code': code} for code in codes]
+        }, 'TransactWriteItems')
+
+        class Client:
+            def transact_write_items(self, **kwargs):
+                raise error
+
+        table = SimpleNamespace(name='tokens', meta=SimpleNamespace(client=Client()))
+        monkeypatch.setattr(storage_dynamodb.runtime, 'table', lambda env_name: table)
+        return storage_dynamodb.TokenStore()
+
+    new_item = {'artist_id': 'a1', 'token': 'nuevo'}
+    with pytest.raises(ConditionFailed):
+        cancel('ConditionalCheckFailed', 'None').rotate('a1', 't', 'r', new_item, 0)
+    with pytest.raises(TransactionConflict):
+        cancel('TransactionConflict', 'None').rotate('a1', 't', 'r', new_item, 0)
+    with pytest.raises(ClientError):
+        cancel('ThrottlingError', 'None').rotate('a1', 't', 'r', new_item, 0)
+
+
+# La sesión eliminada por el límite de sesiones deja de validar también con tokens
+# firmados, que no leen su registro
+def test_session_cap_revokes_evicted_signed_tokens(register, login, signed_tokens, monkeypatch):
+    monkeypatch.setattr(token_utils, 'REVOCATION_CACHE_SECONDS', -1)
+    monkeypatch.setattr(token_utils, 'MAX_SESSIONS_PER_ARTIST', 2)
+    register('a1')
+    oldest = login('a1')
+    login('a1')
+    newest = login('a1')
+
+    tokens = storage.tokens()
+    assert len(tokens.sessions('a1')) == 2
+    assert validate_token(tokens, 'a1', oldest['token'])['statusCode'] == 403
+    assert validate_token(tokens, 'a1', newest['token'])['statusCode'] == 200
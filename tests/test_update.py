@@ -0,0 +1,107 @@
+import pytest
+
+import storage
+import storage_memory
+import updateArtist
+from artist_update import UpdateError, update_artist
+
+
+def _status(call):
+    with pytest.raises(UpdateError) as error:
+        call()
+    return error.value.status_code
+
+
+def test_update_increments_version(register):
+    register('a1')
+    artists = storage.artists()
+
+    assert update_artist(artists, 'a1', {'info': 'nueva'}) == 2
+    assert update_artist(artists, 'a1', {'name': ' Otro Nombre '}, expected_version=2) == 3
+    item = artists.get('a1')
+    assert (item['info'], item['name'], item['version']) == ('nueva', 'otro nombre', 3)
+
+
+def test_missing_artist_is_404():
+    assert _status(lambda: update_artist(storage.artists(), 'nadie', {'info': 'x'})) == 404
+
+
+def test_stale_version_is_409(register):
+    register('a1')
+    artists = storage.artists()
+    update_artist(artists, 'a1', {'info': 'primera'})
+
+    assert _status(lambda: update_artist(artists, 'a1', {'info': 'segunda'}, expected_version=1)) == 409
+    assert artists.get('a1')['info'] == 'primera'
+
+
+def test_password_change_checks_current_password(register):
+    register('a1', password='secreto')
+    artists = storage.artists()
+
+    assert _status(lambda: update_artist(artists, 'a1', {'password': 'nueva'})) == 400
+    assert _status(lambda: update_artist(artists, 'a1', {'password': 'nueva'}, current_password='mal')) == 401
+    assert update_artist(artists, 'a1', {'password': 'nueva'}, current_password='secreto') == 2
+
+
+def test_invalid_changes_are_400(register):
+    register('a1')
+    artists = storage.artists()
+
+    assert _status(lambda: update_artist(artists, 'a1', {})) == 400
+    assert _status(lambda: update_artist(artists, 'a1', {'country': 'peru'})) == 400
+    assert _status(lambda: update_artist(artists, 'a1', {'info': 'x'}, expected_version='uno')) == 400
+
+
+def test_handler_maps_update_errors(register, login):
+    register('a1')
+    token = login('a1')['token']
+
+    def patch(body):
+        event = {'body': body, 'headers': {'Authorization': token}, 'auth': {'artist_id': 'a1'}}
+        return updateArtist.lambda_handler(event, None)
+
+    assert patch({'info': 'x'})['statusCode'] == 200
+    assert patch({'info': 'y', 'expected_version': 1})['statusCode'] == 409
+
+    # El artista se eliminó después de emitir el token
+    storage_memory._artists.clear()
+    assert patch({'info': 'z'})['statusCode'] == 404
+
+
+@pytest.mark.parametrize('changes', [
+    {'name': 5},
+    {'name': '   '},
+    {'info': ['x']},
+    {'photo': None},
+    {'info': {'texto': 'x'}},
+])
+def test_non_text_changes_are_400(register, changes):
+    register('a1')
+    assert _status(lambda: update_artist(storage.artists(), 'a1', changes)) == 400
+
+
+def test_non_text_password_is_400(register):
+    register('a1', password='secreto')
+    artists = storage.artists()
+    assert _status(lambda: update_artist(artists, 'a1', {'password': 123}, current_password='secreto')) == 400
+    assert artists.get('a1')['version'] == 1
+
+
+# Si falla la escritura del índice después del update, el reintento con el mismo
+# nombre la completa
+def test_retried_rename_reindexes(register, monkeypatch):
+    register('a1', name='viejo')
+    artists = storage.artists()
+    calls = []
+
+    def update_name_index(self, artist_id, old_name, new_name):
+        calls.append((artist_id, old_name, new_name))
+        if len(calls) == 1:
+            raise RuntimeError('índice no disponible')
+    monkeypatch.setattr(type(artists), 'update_name_index', update_name_index)
+
+    with pytest.raises(RuntimeError):
+        update_artist(artists, 'a1', {'name': 'nuevo'})
+    assert update_artist(artists, 'a1', {'name': 'nuevo'}) == 3
+    assert calls == [('a1', 'viejo', 'nuevo'), ('a1', 'nuevo', 'nuevo')]
@@ -0,0 +1,423 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import metrics
+from batch_utils import MAX_RETRIES, backoff
+from storage import ConditionFailed, TransactionConflict
+
+# Duración del Access Token renovado
+TOKEN_DURATION = timedelta(minutes=60)
+
+# Modo de emisión de Access Tokens: 'opaque' (uuid4 guardado en la tabla de tokens)
+# o 'signed' (HMAC verificable sin leer DynamoDB)
+TOKEN_MODE = os.environ.get('TOKEN_MODE', 'opaque')
+
+# Llaves de firma en formato JSON {"kid": "secreto", ...}. Para rotar una llave se
+# agrega la nueva, se cambia TOKEN_SIGNING_KID y la anterior se retira cuando ya no
+# quedan tokens firmados con ella que puedan renovarse.
+SIGNING_KEYS = json.loads(os.environ.get('TOKEN_SIGNING_KEYS') or '{}')
+SIGNING_KID = os.environ.get('TOKEN_SIGNING_KID')
+
+# Segundos que se reutiliza la lista de revocación leída
+REVOCATION_CACHE_SECONDS = int(os.environ.get('REVOCATION_CACHE_SECONDS', '60'))
+
+# Máximo de sesiones vivas por artista; al superarlo el login expulsa las más antiguas
+MAX_SESSIONS_PER_ARTIST = int(os.environ.get('MAX_SESSIONS_PER_ARTIST', '10'))
+
+# Segundos que se conserva el registro de una sesión renovada, para que las
+# renovaciones concurrentes con el mismo Refresh Token converjan en el mismo resultado
+REFRESH_GRACE_SECONDS = int(os.environ.get('REFRESH_GRACE_SECONDS', '300'))
+
+# Cache en memoria de la lista de revocación: (momento de carga, jtis revocados)
+_revoked_cache = (0, frozenset())
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _signature(kid, payload):
+    key = SIGNING_KEYS[kid].encode('utf-8')
+    return _b64encode(hmac.new(key, payload.encode('ascii'), hashlib.sha256).digest())
+
+
+def is_signed_token(token):
+    return '.' in token
+
+
+# Genera un token firmado "<payload>.<firma>" con artist_id, expiración, kid y un jti único
+def sign_token(artist_id, expiry, jti):
+    claims = {
+        'sub': artist_id,
+        'exp': int(expiry.timestamp()),
+        'kid': SIGNING_KID,
+        'jti': jti
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    return f"{payload}.{_signature(SIGNING_KID, payload)}"
+
+
+# Verifica la firma del token y devuelve sus claims, o None si no es válido.
+# No valida la expiración: eso lo decide quien llama.
+def verify_signed_token(token, artist_id):
+    # hmac.compare_digest no acepta texto que no sea ASCII
+    if not token.isascii():
+        return None
+
+    try:
+        payload, signature = token.split('.')
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+
+    if not isinstance(claims, dict):
+        return None
+
+    kid = claims.get('kid')
+    if kid not in SIGNING_KEYS:
+        return None
+
+    if not hmac.compare_digest(signature, _signature(kid, payload)):
+        return None
+
+    if claims.get('sub') != artist_id:
+        return None
+
+    return claims
+
+
+# Genera un nuevo Access Token según el modo configurado.
+# Devuelve (token, clave del registro en la tabla de tokens, expiración)
+def new_access_token(artist_id):
+    expiry = datetime.now() + TOKEN_DURATION
+    token_key = str(uuid.uuid4())
+
+    if TOKEN_MODE == 'signed':
+        return sign_token(artist_id, expiry, token_key), token_key, expiry
+
+    return token_key, token_key, expiry
+
+
+# Atributo TTL de la tabla de tokens (epoch en segundos): DynamoDB elimina el
+# registro cuando vence su Refresh Token
+def token_ttl(refresh_token_expiry):
+    return int(datetime.fromisoformat(refresh_token_expiry).timestamp())
+
+
+# Deja lugar para una sesión nueva: si el artista ya tiene MAX_SESSIONS_PER_ARTIST
+# sesiones, elimina las más antiguas (las de Refresh Token más próximo a vencer).
+# Como en end_session, los tokens firmados de las sesiones eliminadas que todavía
+# no expiraron se revocan: se validan sin leer su registro.
+def enforce_session_cap(tokens, artist_id):
+    sessions = tokens.sessions(artist_id)
+
+    excess = len(sessions) - MAX_SESSIONS_PER_ARTIST + 1
+    if excess <= 0:
+        return 0
+
+    sessions.sort(key=lambda session: session['refresh_token_expiry'])
+    evicted = sessions[:excess]
+    tokens.delete(artist_id, [session['token'] for session in evicted])
+
+    if TOKEN_MODE == 'signed':
+        for session in evicted:
+            expiry = int(datetime.fromisoformat(session['token_expiry']).timestamp())
+            if expiry > time.time():
+                revoke_token(tokens, {'jti': session['token'], 'exp': expiry})
+    return excess
+
+
+# Devuelve los jtis revocados, leyendo la tabla como máximo una vez cada
+# REVOCATION_CACHE_SECONDS por contenedor
+def revoked_jtis(tokens):
+    global _revoked_cache
+    loaded_at, jtis = _revoked_cache
+
+    if time.time() - loaded_at > REVOCATION_CACHE_SECONDS:
+        # Cada entrada tiene la forma "jti:exp" para poder purgar las ya expiradas
+        entries = tokens.revoked()
+        jtis = frozenset(entry.split(':')[0] for entry in entries)
+        _revoked_cache = (time.time(), jtis)
+
+    return jtis
+
+
+# Agrega un token firmado a la lista de revocación y purga las entradas ya expiradas
+def revoke_token(tokens, claims):
+    now = int(time.time())
+    expired = {entry for entry in tokens.revoked() if int(entry.split(':')[1]) < now}
+
+    tokens.add_revoked({f"{claims['jti']}:{claims['exp']}"})
+
+    if expired:
+        tokens.remove_revoked(expired)
+
+
+# Cierra la sesión de un token: elimina su registro (el Refresh Token deja de servir)
+# y, si es firmado y todavía no expiró, agrega su jti a la lista de revocación.
+# Devuelve False si la firma no es válida.
+def end_session(tokens, artist_id, token):
+    if not is_signed_token(token):
+        tokens.delete(artist_id, [token])
+        return True
+
+    claims = verify_signed_token(token, artist_id)
+    if claims is None:
+        return False
+
+    tokens.delete(artist_id, [claims['jti']])
+    if claims['exp'] > time.time():
+        revoke_token(tokens, claims)
+    return True
+
+
+# Valida el token de un artista contra la tabla de tokens. Es de solo lectura: si el
+# Access Token expiró responde 401 y el cliente debe renovarlo en /artist/refresh.
+def validate_token(tokens, artist_id, token):
+    if not artist_id or not token:
+        return {
+            'statusCode': 400,
+            'body': 'Faltan parámetros artist_id o token'
+        }
+
+    if is_signed_token(token):
+        return _validate_signed_token(tokens, artist_id, token)
+
+    # Buscar el token en la tabla de tokens
+    item = tokens.get(artist_id, token)
+
+    # Validar si el token existe y no fue reemplazado por una renovación
+    if not item or 'replaced_by' in item:
+        print(f"Token no encontrado para artist_id: {artist_id}")
+        return {
+            'statusCode': 403,
+            'body': 'Token no existe'
+        }
+
+    # Validar expiración del Access Token
+    if datetime.now() > datetime.fromisoformat(item['token_expiry']):
+        return {
+            'statusCode': 401,
+            'body': 'Token expirado'
+        }
+
+    # El token es válido
+    return {
+        'statusCode': 200,
+        'body': 'Token válido'
+    }
+
+
+# Los tokens firmados se validan solo con CPU; la tabla se consulta únicamente
+# para la lista de revocación (en cache)
+def _validate_signed_token(tokens, artist_id, token):
+    claims = verify_signed_token(token, artist_id)
+    if claims is None:
+        print(f"Firma de token inválida para artist_id: {artist_id}")
+        return {
+            'statusCode': 403,
+            'body': 'Token no existe'
+        }
+
+    if claims['jti'] in revoked_jtis(tokens):
+        return {
+            'statusCode': 403,
+            'body': 'Token revocado'
+        }
+
+    if time.time() > claims['exp']:
+        return {
+            'statusCode': 401,
+            'body': 'Token expirado'
+        }
+
+    return {
+        'statusCode': 200,
+        'body': 'Token válido'
+    }
+
+
+# Clave del registro de un token en la tabla: el propio token, o su jti si es firmado.
+# Devuelve None si la firma no es válida.
+def token_key_for(artist_id, token):
+    if is_signed_token(token):
+        claims = verify_signed_token(token, artist_id)
+        return claims['jti'] if claims else None
+    return token
+
+
+# Respuesta de una renovación a partir del registro nuevo. Los tokens firmados son
+# deterministas (mismo jti, expiración y kid), así que se pueden volver a emitir.
+def _rotation_result(artist_id, item):
+    token = item['token']
+    if TOKEN_MODE == 'signed':
+        token = sign_token(artist_id, datetime.fromisoformat(item['token_expiry']), item['token'])
+    return {
+        'statusCode': 200,
+        'artist_id': artist_id,
+        'token': token,
+        'refresh_token': item['refresh_token'],
+        'expires_in': item['token_expiry']
+    }
+
+
+# Renueva el Access Token y el Refresh Token de una sesión en una sola transacción:
+# el registro anterior queda marcado con 'replaced_by' (condición: que no estuviera
+# ya reemplazado y que el Refresh Token coincida) y se crea el registro nuevo. Si
+# varias peticiones renuevan la misma sesión a la vez, solo una transacción gana y
+# las demás devuelven el resultado de la ganadora. Una transacción que choca con
+# otra todavía en curso se reintenta con backoff, volviendo a leer la sesión.
+def rotate_tokens(tokens, artist_id, token_key, refresh_token):
+    item = tokens.get(artist_id, token_key, consistent=True)
+
+    if not item or item['refresh_token'] != refresh_token:
+        return _invalid_refresh()
+
+    if 'replaced_by' in item:
+        return _converged_result(tokens, artist_id, item)
+
+    refresh_token_expiry = item['refresh_token_expiry']
+    if datetime.now() > datetime.fromisoformat(refresh_token_expiry):
+        print("Refresh token expirado.")
+        return {
+            'statusCode': 403,
+            'body': 'Refresh Token expirado. Por favor, inicia sesión nuevamente.'
+        }
+
+    # Generar un nuevo Access Token y un nuevo Refresh Token (misma expiración absoluta)
+    _, new_token_key, new_token_expiry = new_access_token(artist_id)
+    new_item = {
+        'artist_id': artist_id,
+        'token': new_token_key,  # Nuevo token (o su jti) como Sort Key
+        'token_expiry': new_token_expiry.isoformat(),
+        'refresh_token': str(uuid.uuid4()),
+        'refresh_token_expiry': refresh_token_expiry,
+        'expires_at': token_ttl(refresh_token_expiry)
+    }
+
+    attempt = 0
+    while True:
+        try:
+            # El registro anterior se conserva unos minutos para que las renovaciones
+            # concurrentes encuentren el resultado
+            tokens.rotate(artist_id, token_key, refresh_token, new_item, int(time.time()) + REFRESH_GRACE_SECONDS)
+            break
+        except ConditionFailed:
+            # Otra renovación ganó la carrera: devolver su resultado
+            item = tokens.get(artist_id, token_key, consistent=True)
+            if not item or 'replaced_by' not in item:
+                raise
+            return _converged_result(tokens, artist_id, item)
+        except TransactionConflict:
+            # Otra renovación de la misma sesión todavía no termina: esperar y ver
+            # si ya dejó su resultado antes de reintentar
+            if attempt >= MAX_RETRIES:
+                raise
+            backoff(attempt)
+            attempt += 1
+            item = tokens.get(artist_id, token_key, consistent=True)
+            if not item or item['refresh_token'] != refresh_token:
+                return _invalid_refresh()
+            if 'replaced_by' in item:
+                return _converged_result(tokens, artist_id, item)
+
+    # Un token opaco reemplazado deja de ser válido por 'replaced_by'; uno firmado
+    # se valida sin leer su registro, así que se revoca hasta su expiración
+    if TOKEN_MODE == 'signed':
+        old_expiry = int(datetime.fromisoformat(item['token_expiry']).timestamp())
+        if old_expiry > time.time():
+            revoke_token(tokens, {'jti': token_key, 'exp': old_expiry})
+
+    return _rotation_result(artist_id, new_item)
+
+
+def _invalid_refresh():
+    return {
+        'statusCode': 403,
+        'body': 'Token o Refresh Token inválido'
+    }
+
+
+# Resultado de una sesión ya renovada: solo dentro de la ventana de gracia del
+# registro reemplazado ('expires_at'; el TTL de DynamoDB puede tardar en eliminarlo)
+# y si la sesión nueva no fue renovada a su vez. Fuera de eso el Refresh Token
+# anterior no debe recuperar la sesión vigente.
+def _converged_result(tokens, artist_id, item):
+    if int(item.get('expires_at', 0)) <= time.time():
+        return {
+            'statusCode': 403,
+            'body': 'La sesión ya fue renovada. Por favor, inicia sesión nuevamente.'
+        }
+
+    new_item = tokens.get(artist_id, item['replaced_by'], consistent=True)
+    if not new_item or 'replaced_by' in new_item:
+        return {
+            'statusCode': 403,
+            'body': 'La sesión ya fue renovada. Por favor, inicia sesión nuevamente.'
+        }
+    return _rotation_result(artist_id, new_item)
+
+
+# Valida el token de una petición protegida y traduce el resultado a la respuesta
+# de error del handler. Devuelve None si el token es válido.
+def authorize(tokens, artist_id, token):
+    with metrics.phase('auth'):
+        response = validate_token(tokens, artist_id, token)
+
+    if response['statusCode'] == 403:
+        return {
+            'statusCode': 403,
+            'message': 'Forbidden - Acceso No Autorizado'
+        }
+
+    if response['statusCode'] == 401:
+        return {
+            'statusCode': 401,
+            'message': 'Unauthorized - Token Expirado'
+        }
+
+    if response['statusCode'] != 200:
+        return {
+            'statusCode': response['statusCode'],
+            'message': response['body']
+        }
+
+    return None
+
+
+# Las rutas protegidas pasan por el authorizer de API Gateway, que deja el artist_id
+# autorizado en event['auth'] (el request template lo escribe después del body, que
+# se serializa con $input.json, así el cliente no puede reemplazarlo). Con ese
+# contexto el artist_id sale solo del authorizer; el del body es opcional y debe
+# coincidir. Sin contexto (invocación directa) se valida el token en proceso contra
+# el artist_id del body. Devuelve (artist_id, None) o (None, respuesta de error).
+def authorize_request(event, tokens, token):
+    claimed_id = (event.get('body') or {}).get('artist_id')
+    authorized_id = (event.get('auth') or {}).get('artist_id')
+
+    if authorized_id:
+        # El token fue validado para otro artista
+        if claimed_id and claimed_id != authorized_id:
+            return None, {
+                'statusCode': 403,
+                'message': 'Forbidden - Acceso No Autorizado'
+            }
+        return authorized_id, None
+
+    if not claimed_id:
+        return None, {
+            'statusCode': 400,
+            'message': 'Falta el parámetro artist_id'
+        }
+
+    return claimed_id, authorize(tokens, claimed_id, token)
@@ -0,0 +1,54 @@
+import runtime
+import storage
+from artist_update import UPDATABLE_FIELDS, UpdateError, update_artist
+from token_utils import authorize_request
+
+# Actualización parcial del perfil (PATCH): cualquier subconjunto de name, info,
+# photo y password se aplica con un único update_item condicional
+@runtime.handler('TABLE_NAME_ARTISTS', 'TABLE_NAME_TOKENS', 'TABLE_NAME_NGRAMS', 'TABLE_NAME_PREFIXES')
+def lambda_handler(event, context):
+    try:
+        # Obtener encabezados de la solicitud de manera segura
+        headers = event.get('headers', {})
+        token = headers.get('Authorization')
+
+        if not token:
+            return {
+                'statusCode': 400,
+                'message': 'Falta el encabezado Authorization'
+            }
+
+        body = event['body']
+
+        # Validar el token y obtener el artist_id autorizado (authorizer de API Gateway o en proceso)
+        artist_id, auth_error = authorize_request(event, storage.tokens(), token)
+        if auth_error:
+            return auth_error
+
+        changes = {field: body[field] for field in UPDATABLE_FIELDS if field in body}
+
+        try:
+            version = update_artist(
+                storage.artists(),
+                artist_id,
+                changes,
+                current_password=body.get('current_password'),
+                expected_version=body.get('expected_version')
+            )
+        except UpdateError as e:
+            return e.response()
+
+        return {
+            'statusCode': 200,
+            'message': 'Artista actualizado correctamente.',
+            'updated': sorted(changes),
+            'version': version
+        }
+
+    except Exception as e:
+        # Manejo de errores
+        print(f"Error al actualizar el artista: {e}")
+        return {
+            'statusCode': 500,
+            'message': 'Error interno del servidor.'
+        }